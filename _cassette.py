@@ -0,0 +1,195 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Record the HTTP requests of a test run, and replay them without a network.
+
+A cassette is a file with one json line per request: its method and url, the
+status code, headers and body of the response (or the error), and how long
+the request took. Binary bodies are stored compressed and base64 encoded.
+
+When a cassette is replayed, it is read into an index of (method, url) to
+the responses in the order they were recorded, so a url that was requested
+several times gets its responses back in the same order. Request bodies are
+not part of the key, as multipart boundaries change from run to run.
+A request that is not in the cassette raises CassetteMiss, a URLError, which
+the callers of Transport already handle as a network error.
+
+Replayed requests take no time, so the time a replayed run takes is the time
+spent in the tool itself, and RecordedLatency() is the time the network and
+device took when the cassette was recorded.
+"""
+
+import base64
+import collections
+import json
+import mimetools
+from StringIO import StringIO
+import threading
+import time
+import urllib2
+import zlib
+
+import _log
+
+
+class CassetteMiss(urllib2.URLError):
+  """A request was not recorded in the cassette being replayed."""
+
+
+class _Response(object):
+  """A response read from a cassette, like the one urllib2.urlopen returns."""
+
+  def __init__(self, code, headers, data):
+    self.code = code
+    self.headers = mimetools.Message(StringIO(headers or ''))
+    self.data = data
+
+  def getcode(self):
+    return self.code
+
+  def info(self):
+    return self.headers
+
+  def read(self):
+    return self.data
+
+  def close(self):
+    pass
+
+
+def _Encode(data):
+  try:
+    data.decode('utf-8')
+  except UnicodeDecodeError:
+    return 'z', base64.b64encode(zlib.compress(data))
+  return 't', data
+
+
+def _Decode(encoding, data):
+  if encoding == 'z':
+    return zlib.decompress(base64.b64decode(data))
+  return data.encode('utf-8')
+
+
+class Cassette(object):
+  """Record or replay the HTTP requests sent through Transport."""
+
+  def __init__(self, pathname, replay=False):
+    """Open a cassette.
+
+    Args:
+      pathname: string, path of the cassette file.
+      replay: boolean, True = replay the cassette, False = record a new one.
+    """
+    self.logger = _log.GetLogger('LogoCert')
+    self.pathname = pathname
+    self.replay = replay
+    self.lock = threading.Lock()
+    self.index = {}
+    self.latency = 0.0
+    self.count = 0
+    if replay:
+      self.f = None
+      self._ReadIndex()
+    else:
+      self.f = open(pathname, 'w')
+
+  def _ReadIndex(self):
+    entries = collections.defaultdict(collections.deque)
+    with open(self.pathname) as f:
+      for line in f:
+        entry = json.loads(line)
+        entries[(entry['method'], entry['url'])].append(entry)
+        self.latency += entry.get('seconds', 0)
+    self.index = dict(entries)
+    self.logger.info('Replaying %d requests from %s',
+                     sum([len(v) for v in self.index.itervalues()]),
+                     self.pathname)
+
+  def Open(self, request):
+    """Send a request, or replay its recorded response.
+
+    Args:
+      request: urllib2.Request object.
+    Returns:
+      response object, like urllib2.urlopen returns.
+    Raises:
+      urllib2.URLError: the request failed, or was not recorded.
+    """
+    key = (request.get_method(), request.get_full_url())
+    if self.replay:
+      return self._Replay(key)
+    start = time.time()
+    try:
+      r = urllib2.urlopen(request)
+    except urllib2.HTTPError as e:
+      self._Write(key, start, code=e.code, error=str(e.msg))
+      raise
+    except urllib2.URLError as e:
+      self._Write(key, start, error=str(e.reason))
+      raise
+    code = r.getcode()
+    headers = ''.join(r.info().headers)
+    data = r.read()
+    r.close()
+    self._Write(key, start, code=code, headers=headers, data=data)
+    return _Response(code, headers, data)
+
+  def _Write(self, key, start, code=None, headers=None, data=None,
+             error=None):
+    entry = {
+        'method': key[0],
+        'url': key[1],
+        'code': code,
+        'seconds': round(time.time() - start, 4),
+        }
+    if error is not None:
+      entry['error'] = error
+    else:
+      entry['headers'] = headers
+      entry['encoding'], entry['data'] = _Encode(data)
+    with self.lock:
+      self.f.write(json.dumps(entry, sort_keys=True) + '\n')
+      self.f.flush()
+      self.count += 1
+      self.latency += entry['seconds']
+
+  def _Replay(self, key):
+    with self.lock:
+      entries = self.index.get(key)
+      if not entries:
+        raise CassetteMiss('Not in cassette: %s %s' % key)
+      entry = entries.popleft()
+      self.count += 1
+    if 'error' in entry:
+      if entry['code']:
+        raise urllib2.HTTPError(key[1], entry['code'], entry['error'],
+                                mimetools.Message(StringIO('')), None)
+      raise urllib2.URLError(entry['error'])
+    return _Response(entry['code'], entry['headers'],
+                     _Decode(entry['encoding'], entry['data']))
+
+  def RecordedLatency(self):
+    """Return the seconds the recorded requests took on the network."""
+    return self.latency
+
+  def Close(self):
+    """Close the cassette, and log the requests it recorded or replayed."""
+    if self.f:
+      self.f.close()
+      self.f = None
+    self.logger.info('%s %d requests, %.2f seconds of network time.',
+                     'Replayed' if self.replay else 'Recorded', self.count,
+                     self.latency)
@@ -0,0 +1,173 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Check a corpus of saved CDDs against the Logo Cert CDD rules.
+
+A corpus is a directory of .json files, or a .jsonl file with one CDD per
+line. Each CDD is either a GCP printer response (as saved from the printer
+interface or simulate page) or a CDD already parsed by _cddparse.ParseCDD.
+The corpus is read as a stream, and the CDDs are parsed and checked in a pool
+of processes, so corpora of thousands of CDDs do not need to fit in memory.
+The certification ID is only checked to be present, as the one in _config.py
+belongs to the printer under test (see BatchRules).
+"""
+
+import json
+import multiprocessing
+import os
+
+from _cddparse import ParseCDD
+import _cddrules
+
+_validators = None
+
+
+def IterCorpus(source):
+  """Read the CDDs of a corpus one at a time.
+
+  Args:
+    source: string, path of a directory of .json files, or of a .jsonl file.
+  Yields:
+    tuples of (label, text), where label names the file (and line) of the CDD.
+  """
+  if os.path.isdir(source):
+    for root, dirs, files in os.walk(source):
+      dirs.sort()
+      for name in sorted(files):
+        if name.endswith('.json'):
+          pathname = os.path.join(root, name)
+          with open(pathname) as f:
+            yield pathname, f.read()
+  else:
+    with open(source) as f:
+      for n, line in enumerate(f, 1):
+        if line.strip():
+          yield '%s:%d' % (source, n), line
+
+
+def BatchRules():
+  """Return the CDD rules without the checks against the printer under test.
+
+  Constants holds the certification ID of the printer being certified, not of
+  the models of a corpus, so checks that compare to a Constants value (like
+  certificationId) are dropped. The other checks of those rules are kept.
+
+  Returns:
+    list of rule dictionaries, see _cddrules.RULES.
+  """
+  rules = []
+  for rule in _cddrules.RULES:
+    checks = [c for c in rule['checks']
+              if not (c[0] == 'equals' and isinstance(c[2], tuple))]
+    rules.append(dict(rule, checks=checks))
+  return rules
+
+
+def CheckCDD(item):
+  """Parse and check one CDD.
+
+  Args:
+    item: tuple of (label, text) from IterCorpus().
+  Returns:
+    tuple of (label, model, failed rule names, error).
+  """
+  label, text = item
+  try:
+    info = json.loads(text)
+  except ValueError:
+    return label, None, [], 'not json'
+  if not isinstance(info, dict):
+    return label, None, [], 'not a json object'
+  if 'caps' in info:
+    cdd = info
+  else:
+    cdd = ParseCDD(info)
+    if not cdd:
+      return label, None, [], 'no printer'
+  global _validators  # pylint: disable=global-statement
+  if _validators is None:
+    _validators = _cddrules.Compile(BatchRules())
+  # One malformed CDD must not stop the check of the whole corpus.
+  try:
+    results = _cddrules.Validate(cdd, _validators)
+  except (AttributeError, KeyError, TypeError, ValueError) as e:
+    return label, None, [], 'bad CDD: %s' % e
+  failed = sorted([k for k, v in results.iteritems() if not v.passed])
+  model = cdd.get('model') or cdd.get('name') or 'unknown'
+  if not isinstance(model, basestring):
+    model = json.dumps(model)
+  return label, model, failed, None
+
+
+def CheckCorpus(source, processes=None, chunksize=16):
+  """Check every CDD of a corpus.
+
+  Args:
+    source: string, path of a directory of .json files, or of a .jsonl file.
+    processes: integer, number of worker processes, default is one per CPU.
+    chunksize: integer, number of CDDs sent to a worker at a time.
+  Returns:
+    dictionary with keys:
+      models: dictionary of model name to a dictionary with the number of
+              'cdds' checked and 'failed', a dictionary of rule name to the
+              number of CDDs that failed it.
+      errors: list of (label, error) of CDDs that could not be read.
+      total: integer, number of CDDs read.
+  """
+  summary = {'models': {}, 'errors': [], 'total': 0}
+  pool = multiprocessing.Pool(processes)
+  try:
+    for label, model, failed, error in pool.imap_unordered(
+        CheckCDD, IterCorpus(source), chunksize):
+      summary['total'] += 1
+      if error:
+        summary['errors'].append((label, error))
+        continue
+      if model not in summary['models']:
+        summary['models'][model] = {'cdds': 0, 'failed': {}}
+      entry = summary['models'][model]
+      entry['cdds'] += 1
+      for rule in failed:
+        entry['failed'][rule] = entry['failed'].get(rule, 0) + 1
+  finally:
+    pool.close()
+    pool.join()
+  return summary
+
+
+def FormatSummary(summary):
+  """Format a corpus summary as a table.
+
+  Args:
+    summary: dictionary returned by CheckCorpus().
+  Returns:
+    string, one row per model with the number of CDDs checked, and the rules
+    its CDDs fail, with how many CDDs fail each rule.
+  """
+  rows = [('Model', 'CDDs', 'Failed rules')]
+  for model in sorted(summary['models']):
+    entry = summary['models'][model]
+    failed = ', '.join(['%s (%d)' % (rule, entry['failed'][rule])
+                        for rule in sorted(entry['failed'])])
+    rows.append((model, str(entry['cdds']), failed or '-'))
+  width = [max([len(r[i]) for r in rows]) for i in range(2)]
+  lines = ['%-*s  %*s  %s' % (width[0], r[0], width[1], r[1], r[2])
+           for r in rows]
+  lines.append('')
+  lines.append('%d CDDs, %d models, %d unreadable.' % (
+      summary['total'], len(summary['models']), len(summary['errors'])))
+  for label, error in summary['errors']:
+    lines.append('%s: %s' % (label, error))
+  return '\n'.join(lines)
@@ -0,0 +1,190 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Compare the capabilities of two CDDs, for example of two firmware versions.
+
+Options of a capability (like the sizes of media_size) are matched by their
+identifying fields instead of their position, so reordered lists are not
+reported, and lists with hundreds of entries are compared in linear time.
+"""
+
+import json
+
+# Fields that identify an option of a capability, in order of preference.
+KEY_FIELDS = ['vendor_id', 'type', 'name', 'custom_display_name',
+              'content_type', 'horizontal_dpi', 'vertical_dpi']
+
+# Symbols of the kinds of change in the report.
+SYMBOLS = {
+    'added': '+',
+    'removed': '-',
+    'changed': '~',
+    'default': '*',
+    }
+
+
+class Change(object):
+  """One difference between two CDDs."""
+
+  def __init__(self, kind, capability, item=None, old=None, new=None):
+    """Describe a change.
+
+    Args:
+      kind: string, one of added, removed, changed, default.
+      capability: string, name of the capability.
+      item: string, option or field of the capability, None = capability.
+      old: value before the change.
+      new: value after the change.
+    """
+    self.kind = kind
+    self.capability = capability
+    self.item = item
+    self.old = old
+    self.new = new
+
+  def __str__(self):
+    name = self.capability
+    if self.item is not None:
+      name = '%s %s' % (name, self.item)
+    if self.kind in ('changed', 'default'):
+      return '%s %s: %s -> %s' % (SYMBOLS[self.kind], name,
+                                  _Short(self.old), _Short(self.new))
+    return '%s %s' % (SYMBOLS[self.kind], name)
+
+
+def _Short(value):
+  if isinstance(value, basestring):
+    return value
+  return json.dumps(value, sort_keys=True)
+
+
+def OptionKey(option):
+  """Return the key that identifies an option across CDDs.
+
+  Args:
+    option: dictionary, one option of a capability.
+  Returns:
+    string, the identifying fields of the option, or the whole option
+    (without is_default) if it has none of them.
+  """
+  if not isinstance(option, dict):
+    return _Short(option)
+  fields = ['%s' % option[k] for k in KEY_FIELDS if k in option]
+  if fields:
+    return '/'.join(fields)
+  return _Short(dict([(k, v) for k, v in option.iteritems()
+                      if k != 'is_default']))
+
+
+def _Default(options):
+  for option in options:
+    if isinstance(option, dict) and option.get('is_default'):
+      return OptionKey(option)
+  return None
+
+
+def _DiffOptions(capability, old, new):
+  """Compare two lists of options, matched by OptionKey()."""
+  changes = []
+  old_keyed = dict([(OptionKey(o), o) for o in old])
+  new_keyed = dict([(OptionKey(o), o) for o in new])
+  for key in sorted(set(old_keyed) - set(new_keyed)):
+    changes.append(Change('removed', capability, key))
+  for key in sorted(set(new_keyed) - set(old_keyed)):
+    changes.append(Change('added', capability, key))
+  for key in sorted(set(old_keyed) & set(new_keyed)):
+    changes.extend(_DiffFields(capability, key, old_keyed[key],
+                               new_keyed[key], ignore=['is_default']))
+  old_default = _Default(old)
+  new_default = _Default(new)
+  if old_default != new_default:
+    changes.append(Change('default', capability, 'default', old_default,
+                          new_default))
+  return changes
+
+
+def _DiffFields(capability, item, old, new, ignore=()):
+  """Compare the fields of two dictionaries, or two values."""
+  if not (isinstance(old, dict) and isinstance(new, dict)):
+    if old != new:
+      return [Change('changed', capability, item, old, new)]
+    return []
+  changes = []
+  for field in sorted(set(old) | set(new)):
+    if field in ignore:
+      continue
+    name = field if item is None else '%s.%s' % (item, field)
+    if field not in new:
+      changes.append(Change('removed', capability, name))
+    elif field not in old:
+      changes.append(Change('added', capability, name))
+    elif old[field] != new[field]:
+      changes.append(Change('changed', capability, name, old[field],
+                            new[field]))
+  return changes
+
+
+def DiffCaps(old, new):
+  """Compare the capabilities of two parsed CDDs.
+
+  Args:
+    old: dictionary, parsed CDD (see _cddparse.ParseCDD) before.
+    new: dictionary, parsed CDD after.
+  Returns:
+    list of Change objects.
+  """
+  old_caps = old.get('caps', {})
+  new_caps = new.get('caps', {})
+  changes = []
+  for capability in sorted(set(old_caps) | set(new_caps)):
+    if capability not in new_caps:
+      changes.append(Change('removed', capability))
+      continue
+    if capability not in old_caps:
+      changes.append(Change('added', capability))
+      continue
+    a = old_caps[capability]
+    b = new_caps[capability]
+    if a == b:
+      continue
+    if isinstance(a, list) and isinstance(b, list):
+      changes.extend(_DiffOptions(capability, a, b))
+    elif (isinstance(a, dict) and isinstance(b, dict) and
+          isinstance(a.get('option'), list) and
+          isinstance(b.get('option'), list)):
+      changes.extend(_DiffOptions(capability, a['option'], b['option']))
+      changes.extend(_DiffFields(capability, None, a, b, ignore=['option']))
+    else:
+      changes.extend(_DiffFields(capability, None, a, b))
+  return changes
+
+
+def FormatDiff(changes):
+  """Format changes as a compact report, one line per change.
+
+  Args:
+    changes: list of Change objects from DiffCaps().
+  Returns:
+    string, the report.
+  """
+  if not changes:
+    return 'No capability changes.'
+  lines = [str(c) for c in changes]
+  counts = {}
+  for c in changes:
+    counts[c.kind] = counts.get(c.kind, 0) + 1
+  lines.append('')
+  lines.append(', '.join(['%d %s' % (counts[k], k) for k in sorted(counts)]))
+  return '\n'.join(lines)
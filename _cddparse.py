@@ -0,0 +1,59 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Parse the printer description of the GCP printer interface into a CDD.
+
+This module does not need Chrome or selenium, so the offline CDD tools
+(cddtool.py) can use it.
+"""
+
+import json
+
+import _log
+
+
+def ParseCDD(info):
+  """Parse a printer description into a logical dictionary.
+
+  Args:
+    info: string or dictionary, GCP printer interface response with a list of
+          printers, like the simulate page shows.
+  Returns:
+    dictionary with the printer fields, and its capabilities under 'caps', or
+    None if info has no printer.
+  """
+  logger = _log.GetLogger('LogoCert')
+  if isinstance(info, basestring):
+    try:
+      info = json.loads(info)
+    except ValueError:
+      logger.error('Printer description is not json.')
+      return None
+  if not isinstance(info, dict) or not info.get('printers'):
+    logger.error('Could not find printers in cdd.')
+    return None
+  printer = info['printers']
+  printer = printer[0] if isinstance(printer, list) else None
+  if not isinstance(printer, dict):
+    logger.error('Printer in cdd is not a dictionary.')
+    return None
+  cdd = {}
+  for k in printer:
+    if k != 'capabilities':
+      cdd[k] = printer[k]
+  caps = printer.get('capabilities')
+  caps = caps.get('printer') if isinstance(caps, dict) else None
+  cdd['caps'] = dict(caps) if isinstance(caps, dict) else {}
+  return cdd
@@ -0,0 +1,228 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Rules a printer CDD must follow for Logo Certification.
+
+The rules are declared in RULES, and compiled once into validator functions.
+Validate() runs every validator over a parsed CDD (see _cddparse.ParseCDD)
+and returns one result per rule, which the Printer suite tests log and assert.
+It does not use Chrome or the network, so it can check stored CDDs as well.
+
+Each rule has a name, a list of checks, and the notes to log when all checks
+pass. A check is a tuple of (kind, path, argument, notes if it fails), where
+path is a dotted path into the CDD, like caps.media_size, and kind is one of:
+  present: path exists.
+  absent: path does not exist.
+  minlen: value at path has at least argument entries.
+  contains: value at path is a list with an item where item[key] == value,
+            with argument as (key, value).
+  equals: value at path equals argument. A Constants key as (section, key),
+          like ('PRINTER', 'CERTID'), is looked up when the rules compile.
+Notes are formatted with value (value at the path of the first check), and
+expected (the argument of the check).
+"""
+
+from _config import Constants
+
+RULES = [
+    {'name': 'local_settings',
+     'checks': [
+         ('present', 'local_settings', None,
+          'local_settings not found in printer CDD.'),
+         ('present', 'local_settings.current', None,
+          'No current settings found in local_settings.'),
+         ],
+     'notes': 'Local settings: %(value)s'},
+    {'name': 'caps',
+     'checks': [
+         ('present', 'caps', None, 'No capabilities found in printer CDD.'),
+         ('minlen', 'caps', 10,
+          'Capabilities does not have required entries.'),
+         ],
+     'notes': None},
+    {'name': 'uuid',
+     'checks': [
+         ('present', 'uuid', None, 'uuid not found in printer CDD.'),
+         ('minlen', 'uuid', 1, 'uuid is not a valid value.'),
+         ],
+     'notes': 'UUID: %(value)s'},
+    {'name': 'defaultDisplayName',
+     'checks': [
+         ('present', 'defaultDisplayName', None,
+          'defaultDisplayName not found in printer CDD'),
+         ],
+     'notes': None},
+    {'name': 'supported_content_type',
+     'checks': [
+         ('present', 'caps.supported_content_type', None,
+          'supported_content_type missing from printer capabilities.'),
+         ('contains', 'caps.supported_content_type',
+          ('content_type', 'image/pwg-raster'),
+          'image/pwg-raster not found in supported content types.\n'
+          'Found: %(value)s'),
+         ],
+     'notes': 'Supported content types: %(value)s'},
+    {'name': 'pwg_raster_config',
+     'checks': [
+         ('present', 'caps.pwg_raster_config', None,
+          'pwg_raster_config parameter not found in printer cdd.'),
+         ],
+     'notes': 'pwg_raster_config: %(value)s'},
+    {'name': 'capsHash',
+     'checks': [
+         ('present', 'capsHash', None,
+          'capsHash not found in printer capabilities.'),
+         ],
+     'notes': 'capsHash found in printer cdd.'},
+    {'name': 'certificationId',
+     'checks': [
+         ('present', 'certificationId', None,
+          'certificationId not found in printer capabilities.'),
+         ('equals', 'certificationId', ('PRINTER', 'CERTID'),
+          'Certification ID: %(value)s, expected %(expected)s'),
+         ],
+     'notes': 'Certification ID: %(value)s'},
+    {'name': 'resolvedIssues',
+     'checks': [
+         ('present', 'resolvedIssues', None,
+          'resolvedIssues not found in printer capabilities.'),
+         ],
+     'notes': 'resolvedIssues found in printer capabilities.'},
+    ]
+
+# Capabilities a printer must have.
+for _cap in ['input_tray_unit', 'output_bin_unit', 'marker', 'cover', 'color',
+             'duplex', 'copies', 'dpi', 'media_size', 'collate']:
+  RULES.append({
+      'name': _cap,
+      'checks': [('present', 'caps.%s' % _cap, None,
+                  '%s not found in printer capabilities.' % _cap)],
+      'notes': '%s: %%(value)s' % _cap})
+
+# Capabilities the printer must leave to the client.
+for _cap in ['page_orientation', 'margins', 'fit_to_page', 'page_range',
+             'reverse_order']:
+  RULES.append({
+      'name': _cap,
+      'checks': [('absent', 'caps.%s' % _cap, None,
+                  '%s found in printer capabilities.' % _cap)],
+      'notes': '%s not found in printer capabilities.' % _cap})
+
+_MISSING = object()
+
+_compiled = None
+
+
+class RuleResult(object):
+  """The result of one rule."""
+
+  def __init__(self, name, passed, notes, value=None):
+    self.name = name
+    self.passed = passed
+    self.notes = notes
+    self.value = value
+
+  def __repr__(self):
+    return 'RuleResult(%s, %s)' % (self.name, self.passed)
+
+
+def _Getter(path):
+  """Compile a dotted path into a function that reads it from a CDD."""
+  keys = path.split('.')
+
+  def Get(cdd):
+    value = cdd
+    for key in keys:
+      if not isinstance(value, dict) or key not in value:
+        return _MISSING
+      value = value[key]
+    return value
+
+  return Get
+
+
+def _Test(kind, argument):
+  """Compile a check kind into a function of the value at its path."""
+  if kind == 'present':
+    return lambda v: v is not _MISSING
+  if kind == 'absent':
+    return lambda v: v is _MISSING
+  if kind == 'minlen':
+    return lambda v: (isinstance(v, (basestring, list, dict)) and
+                      len(v) >= argument)
+  if kind == 'contains':
+    key, expected = argument
+    return lambda v: (isinstance(v, list) and
+                      any([isinstance(i, dict) and i.get(key) == expected
+                           for i in v]))
+  if kind == 'equals':
+    return lambda v: v == argument
+  raise ValueError('Unknown CDD check: %s' % kind)
+
+
+def Compile(rules=None):
+  """Compile rules into validators.
+
+  Args:
+    rules: list of rule dictionaries, default is RULES.
+  Returns:
+    list of tuples (name, checks, notes), where each check is a tuple of
+    (get, test, expected, notes).
+  Raises:
+    ValueError: if a rule has an unknown check kind.
+  """
+  validators = []
+  for rule in rules or RULES:
+    checks = []
+    for kind, path, argument, notes in rule['checks']:
+      if kind == 'equals' and isinstance(argument, tuple):
+        section, key = argument
+        argument = getattr(Constants, section)[key]
+      checks.append((_Getter(path), _Test(kind, argument), argument, notes))
+    validators.append((rule['name'], checks, rule['notes']))
+  return validators
+
+
+def Validate(cdd, validators=None):
+  """Check a CDD against every rule.
+
+  Args:
+    cdd: dictionary, parsed CDD (see _cddparse.ParseCDD).
+    validators: list of validators from Compile(), default is RULES compiled
+                on first use.
+  Returns:
+    dictionary of RuleResult objects, keyed by rule name.
+  """
+  global _compiled  # pylint: disable=global-statement
+  if validators is None:
+    if _compiled is None:
+      _compiled = Compile()
+    validators = _compiled
+  results = {}
+  for name, checks, notes in validators:
+    value = checks[0][0](cdd)
+    if value is _MISSING:
+      value = None
+    result = RuleResult(name, True, None, value)
+    for get, test, expected, fail_notes in checks:
+      if not test(get(cdd)):
+        result.passed = False
+        result.notes = fail_notes % {'value': value, 'expected': expected}
+        break
+    else:
+      if notes:
+        result.notes = notes % {'value': value, 'expected': None}
+    results[name] = result
+  return results
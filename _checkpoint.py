@@ -0,0 +1,137 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Save the state of a test run after every test, so it can be resumed.
+
+A checkpoint holds the tests that finished (logged a result), their results,
+the device under test and the OAuth2 tokens. A run started with --resume
+reads it, leaves out the finished tests, and only sets up what the remaining
+suites need.
+"""
+
+import os
+import threading
+import time
+
+from _common import ReadJsonFile
+from _common import WriteJsonFile
+from _config import Constants
+import _log
+
+
+class Checkpoint(object):
+  """Run state, saved to a json file after every test."""
+
+  def __init__(self, pathname):
+    """Start an empty checkpoint.
+
+    Args:
+      pathname: string, json file of the checkpoint.
+    """
+    self.logger = _log.GetLogger('LogoCert')
+    self.pathname = pathname
+    self.completed = []
+    self.results = []
+    self.device = {}
+    self.tokens = {}
+    self.lock = threading.Lock()
+
+  def Load(self):
+    """Read a saved checkpoint.
+
+    Returns:
+      boolean: True = checkpoint read, False = no saved checkpoint, or one
+      that could not be read.
+    """
+    data = ReadJsonFile(self.pathname)
+    if not isinstance(data, dict):
+      if os.path.isfile(self.pathname):
+        self.logger.warning('Checkpoint %s could not be read, running all '
+                            'tests again.', self.pathname)
+      return False
+    with self.lock:
+      self.completed = data.get('completed', [])
+      self.results = data.get('results', [])
+      self.device = data.get('device', {})
+      self.tokens = data.get('tokens', {})
+    return True
+
+  def Save(self):
+    """Write the checkpoint to its json file.
+
+    Returns:
+      boolean: True = saved, False = errors.
+    """
+    with self.lock:
+      data = {
+          'completed': list(self.completed),
+          'results': list(self.results),
+          'device': self.device,
+          'tokens': self.tokens,
+          'time': time.time(),
+          }
+    if WriteJsonFile(self.pathname, data):
+      return True
+    self.logger.error('Could not save checkpoint %s, --resume will run all '
+                      'tests again.', self.pathname)
+    return False
+
+  def Completed(self):
+    """Return the set of finished test names, like Privet.testPrivetInfoAPI."""
+    with self.lock:
+      return set(self.completed)
+
+  def Complete(self, test, results, device, token_manager):
+    """Record a finished test and the current run state, and save.
+
+    Args:
+      test: string, name of the test, like Privet.testPrivetInfoAPI.
+      results: list of result dictionaries (see _results.ResultStore).
+      device: Device object under test.
+      token_manager: _oauth2.TokenManager of the run.
+    """
+    with self.lock:
+      if test not in self.completed:
+        self.completed.append(test)
+      self.results = list(results)
+      self.device = {
+          'id': getattr(device, 'id', None),
+          'name': device.name,
+          'privet_port': device.port,
+          'printer_id': device.details.get('Printer ID'),
+          }
+      self.tokens = {
+          'access_token': Constants.AUTH.get('ACCESS'),
+          'refresh_token': Constants.AUTH.get('REFRESH'),
+          'expires_at': token_manager.expires_at,
+          }
+    self.Save()
+
+  def RestoreTokens(self, token_manager):
+    """Use the saved tokens if they are newer than the ones already loaded.
+
+    Args:
+      token_manager: _oauth2.TokenManager of the run.
+    Returns:
+      boolean: True = tokens restored, False = no newer saved tokens.
+    """
+    if (not self.tokens.get('refresh_token') or
+        self.tokens.get('expires_at', 0) <= token_manager.expires_at):
+      return False
+    Constants.AUTH['REFRESH'] = self.tokens['refresh_token']
+    if self.tokens.get('access_token'):
+      Constants.AUTH['ACCESS'] = self.tokens['access_token']
+      token_manager.expires_at = self.tokens['expires_at']
+    return True
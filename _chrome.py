@@ -24,22 +24,109 @@ import time
 from _common import Retry
 from _config import Constants
 import _log
+from _ticket import PrintTicket
 
 from selenium.common.exceptions import NoSuchWindowException
+from selenium.common.exceptions import WebDriverException
+
+# Apply a list of print ticket settings to the web print dialog, and read back
+# the value of each setting. arguments[0] is PrintTicket.WebDialogSettings().
+# The number of copies the dialog shows after the clicks is returned as well,
+# as <option>_count, so it is never clicked past the requested count.
+# The dialog uses Closure widgets, which react to mouse events rather than to
+# setting values directly.
+_APPLY_TICKET_SCRIPT = """
+var settings = arguments[0];
+var results = {};
+var click = ['mouseover', 'mousedown', 'mouseup', 'click'];
+function fire(el, types) {
+  for (var i = 0; i < types.length; i++) {
+    var e = document.createEvent('MouseEvents');
+    e.initMouseEvent(types[i], true, true, window, 1, 0, 0, 0, 0, false,
+                     false, false, false, 0, null);
+    el.dispatchEvent(e);
+  }
+}
+function checked(el) {
+  return el.getAttribute('aria-checked') == 'true';
+}
+for (var i = 0; i < settings.length; i++) {
+  var s = settings[i];
+  var cap = document.querySelector(
+      '.cp-capabilities-capabilities-' + s.option + '-container');
+  var ok = false;
+  if (s.kind == 'copies') {
+    var plus = document.querySelector('.cp-capabilities-copies-plusButton');
+    if (plus) {
+      for (var j = 1; j < s.value; j++) {
+        fire(plus, click);
+      }
+      var input = plus.parentNode.querySelector('input');
+      // Without an input field, the clicks are the best we can verify.
+      var count = input ? parseInt(input.value, 10) : s.value;
+      results[s.option + '_count'] = isNaN(count) ? null : count;
+      ok = count == s.value;
+    }
+  } else if (cap && s.kind == 'select') {
+    var button = cap.querySelector('.jfk-select');
+    if (button) {
+      fire(button, click);
+      var items = document.querySelectorAll(
+          '.goog-menu-vertical .goog-menuitem-content');
+      for (var j = 0; j < items.length; j++) {
+        if (items[j].offsetParent !== null &&
+            items[j].textContent.indexOf(s.value) != -1) {
+          fire(items[j].parentNode, click);
+          break;
+        }
+      }
+      ok = button.textContent.indexOf(s.value) != -1;
+    }
+  } else if (cap && s.kind == 'checkbox') {
+    var box = cap.querySelector('.jfk-checkbox');
+    if (box) {
+      if (checked(box) != s.value) {
+        fire(box, click);
+      }
+      ok = checked(box) == s.value;
+    }
+  } else if (cap && s.kind == 'range') {
+    var radio = cap.querySelector('.jfk-radiobutton');
+    var text = cap.querySelector('.cp-capabilities-pagerange-range-textbox');
+    if (radio && text) {
+      if (!checked(radio)) {
+        fire(radio, click);
+      }
+      text.value = s.value;
+      var events = ['input', 'keyup', 'change'];
+      for (var j = 0; j < events.length; j++) {
+        var e = document.createEvent('HTMLEvents');
+        e.initEvent(events[j], true, true);
+        text.dispatchEvent(e);
+      }
+      ok = text.value == s.value;
+    }
+  }
+  results[s.option] = ok;
+}
+return results;
+"""
 
 
 class Chrome(object):
   """The Page Object for Chrome."""
 
-  def __init__(self, chromedriver):
+  def __init__(self, chromedriver, demo=False):
     """Set the resources that will be used for the life of this page object.
 
     Args:
       chromedriver: initialized webdriver object using Chrome.
+      demo: boolean, True = pause so a viewer can see selected print options.
     """
     self.logger = _log.GetLogger('LogoCert')
 
     self.cd = chromedriver
+    self.demo = demo
     self.chrome_version = 'Unknown'
     self.platform = 'Unknown'
 
@@ -505,7 +592,7 @@ class Chrome(object):
 
   def PrintFile(self, printer_name, filename, collate=False, color=None,
                 copies=None, dpi=None, duplex=None, layout=None, pagefit=None,
-                pagerange=None, reverse=False, size=None):
+                pagerange=None, reverse=False, size=None, ticket=None):
     """Print a file using the Cloud Print management page.
 
     Args:
@@ -522,9 +609,15 @@ class Chrome(object):
       pagerange: string, range of pages to print.
       reverse: boolean, True = reverse order, False = regular order.
       size: string, paper size to use.
+      ticket: PrintTicket object, used instead of the individual options.
     Returns:
       boolean: True = file printed, False = file not printed.
     """
+    if not ticket:
+      ticket = PrintTicket(collate=collate, color=color, copies=copies,
+                           dpi=dpi, duplex=duplex, layout=layout,
+                           pagefit=pagefit, pagerange=pagerange,
+                           reverse=reverse, size=size)
     self.cd.driver.get(Constants.GCP['MGT'])
 
     print_button = self.cd.FindName('cp-button-print')
@@ -538,32 +631,17 @@ class Chrome(object):
     printer_found = self.SelectPrinter(printer_name)
 
     if printer_found:
-      if collate:
-        self.SetCheckBox('collate', collate)
-      if color:
-        self.SetOption('color', color)
-      if copies:
-        self.SetCopies(copies=copies)
-      if dpi:
-        self.SetOption('dpi', dpi)
-      if duplex:
-        self.SetOption('duplex', duplex)
-      if layout:
-        self.SetOption('orientation', layout)
-      if pagefit:
-        self.SetOption('fittopage', pagefit)
-      if pagerange:
-        self.SetRange(pagerange)
-      if reverse:
-        self.SetCheckBox('reverse-order', reverse)
-      if size:
-        self.SetOption('media-size', size)
+      if not self.ApplyPrintTicket(ticket):
+        self.logger.error('Print options not set, not printing %s.',
+                          filename)
+        return False
 
       dialog_print_button = self.cd.FindName('print')
       if not dialog_print_button:
         return False
-      # Give the user time to see the selected option.
-      time.sleep(2)
+      if self.demo:
+        # Give the user time to see the selected option.
+        time.sleep(2)
       if not self.cd.ClickElement(dialog_print_button):
         return False
     else:
@@ -572,6 +650,52 @@ class Chrome(object):
 
     return True
 
+  def ApplyPrintTicket(self, ticket):
+    """Set all options of a print ticket in the web print dialog.
+
+    Args:
+      ticket: PrintTicket object.
+    Returns:
+      boolean: True = all options set, False = some options not set.
+    All options are set and verified by one script. Options the script could
+    not verify are set again, one at a time, using the web elements.
+    """
+    settings = ticket.WebDialogSettings()
+    if not settings:
+      return True
+    try:
+      results = self.cd.driver.execute_script(_APPLY_TICKET_SCRIPT, settings)
+    except WebDriverException as e:
+      self.logger.warning('Error applying print ticket with script.\n%s', e)
+      results = {}
+
+    applied = True
+    for setting in settings:
+      if results.get(setting['option']):
+        continue
+      self.logger.warning('Setting %s to %s one element at a time.',
+                          setting['option'], setting['value'])
+      if setting['kind'] == 'select':
+        done = self.SetOption(setting['option'], setting['value'])
+      elif setting['kind'] == 'checkbox':
+        done = self.SetCheckBox(setting['option'], setting['value'])
+      elif setting['kind'] == 'copies':
+        # The script may have clicked already, so only click the difference.
+        count = results.get('%s_count' % setting['option'])
+        if count is None:
+          done = self.SetCopies(copies=setting['value'])
+        elif count < setting['value']:
+          done = self.SetCopies(copies=setting['value'] - count + 1)
+        else:
+          done = False
+      else:
+        done = self.SetRange(setting['value'])
+      if not done:
+        self.logger.error('Error setting %s to %s', setting['option'],
+                          setting['value'])
+        applied = False
+    return applied
+
   def UploadFile(self, filename):
     """Upload a file to print.
 
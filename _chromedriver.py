@@ -40,23 +40,41 @@ from selenium.webdriver.support.ui import WebDriverWait
 class ChromeDriver(object):
   """Provides webdriver functionality for Chrome."""
 
-  def __init__(self, user_data_dir, timeout):
+  def __init__(self, user_data_dir, timeout, headless=False,
+               chrome_logging=False, profiler=None):
     """Initialize chromedriver for use by all other modules.
 
     Args:
       user_data_dir: string, directory for chrome data.
       timeout: integer, number of seconds to wait for web pages to load.
+      headless: boolean, True = run Chrome without a visible window.
+      chrome_logging: boolean, True = enable verbose Chrome logging.
+      profiler: CommandProfiler object to record WebDriver commands with.
     """
     self.timeout = timeout
+    self.user_data_dir = user_data_dir
+    self.headless = headless
+    self.chrome_logging = chrome_logging
+    self.profiler = profiler
     data_dir = os.path.join(os.getcwd(), user_data_dir)
     self.logger = _log.GetLogger('LogoCert')
     options = Options()
     data_dir_option = '--user-data-dir=%s' % data_dir
     options.add_argument(data_dir_option)
-    options.add_argument('--enable-logging')
-    options.add_argument('--v=1')
+    if chrome_logging:
+      options.add_argument('--enable-logging')
+      options.add_argument('--v=1')
+    if headless:
+      options.add_argument('--headless')
+      options.add_argument('--disable-gpu')
+      # Headless Chrome defaults to a small window, which hides some of the
+      # management page elements.
+      options.add_argument('--window-size=1280,1024')
     options.add_argument('--lang=en')
+    self.logger.debug('Starting Chrome, headless: %s', headless)
     self.driver = webdriver.Chrome(chrome_options=options)
+    if profiler:
+      profiler.Instrument(self.driver)
     self.action_chain = ActionChains(self.driver)
 
     self.window = {}
@@ -31,6 +31,30 @@ from _common import Retry
 from _config import Constants
 import _log
 
+from selenium.common.exceptions import WebDriverException
+
+# Read every job of the management page jobs list in one call.
+_JOBS_SCRIPT = """
+var jobs = [];
+var items = document.getElementsByClassName('cp-dashboard-listitem');
+for (var i = 0; i < items.length; i++) {
+  var name = items[i].getElementsByClassName('cp-job-name')[0];
+  if (!name) {
+    continue;
+  }
+  var status = items[i].getElementsByClassName('cp-status-msg')[0];
+  jobs.push({
+    'name': name.textContent.trim(),
+    'id': items[i].id || items[i].getAttribute('data-id'),
+    'status': status ? status.textContent.trim() : null,
+    'selected': items[i].className.indexOf(
+        'cp-dashboard-listitem-selected') >= 0,
+    'element': name
+  });
+}
+return jobs;
+"""
+
 
 class CloudPrintMgr(object):
   """An object to interact with our management pages."""
@@ -38,6 +62,10 @@ class CloudPrintMgr(object):
   def __init__(self, chromedriver):
     self.logger = _log.GetLogger('LogoCert')
     self.cd = chromedriver
+    # Jobs on the management page, in page order, and when they were read.
+    self.jobs = []
+    self.jobs_time = 0
+    self.jobs_url = None
 
   def SelectPrinter(self, printer_name):
     """Select a registered printer from the management page.
@@ -461,6 +489,63 @@ class CloudPrintMgr(object):
 
     return False
 
+  def RefreshJobs(self, reload_page=False):
+    """Read the jobs list of the management page into the job index.
+
+    Args:
+      reload_page: boolean, True = load the management page first.
+    Returns:
+      boolean: True = jobs list read, False = errors reading jobs list.
+    The page is also loaded if Chrome is on another page, or if the index is
+    older than Constants.JOBS['INDEXTTL'], so the page shows recent job status.
+    Otherwise the jobs list is read from the page that is already loaded.
+    """
+    stale = time.time() - self.jobs_time > Constants.JOBS['INDEXTTL']
+    if (reload_page or stale or not self.jobs_url or
+        self.cd.driver.current_url != self.jobs_url):
+      self.cd.driver.get(Constants.GCP['MGT'])
+      reload_page = True
+    try:
+      jobs = self.cd.driver.execute_script(_JOBS_SCRIPT)
+    except WebDriverException as e:
+      self.logger.error('Error reading jobs list.\n%s', e)
+      return False
+    if not jobs and not reload_page:
+      # Some views of the management page have the same url, but no jobs.
+      return self.RefreshJobs(reload_page=True)
+    added = len(set([j['name'] for j in jobs]) -
+                set([j['name'] for j in self.jobs]))
+    self.logger.debug('Job index: %d jobs, %d new.', len(jobs), added)
+    self.jobs = jobs
+    self.jobs_url = self.cd.driver.current_url
+    if reload_page:
+      self.jobs_time = time.time()
+    return True
+
+  def FindJob(self, job_name, refresh=False):
+    """Find a job in the job index.
+
+    Args:
+      job_name: string, name (or unique partial name) of print job.
+      refresh: boolean, True = read the jobs list again first.
+    Returns:
+      dictionary with name, id, status, selected and element of the job, or
+      None if the job is not listed.
+    The index is read again if the job is not found in it, in case the job
+    is newer than the index.
+    """
+    if refresh or not self.jobs:
+      if not self.RefreshJobs():
+        return None
+    for attempt in range(2):
+      exact = [j for j in self.jobs if j['name'] == job_name]
+      partial = [j for j in self.jobs if job_name in j['name']]
+      if exact or partial:
+        return (exact or partial)[0]
+      if attempt == 0 and (refresh or not self.RefreshJobs()):
+        break
+    return None
+
   @Retry(3)
   def SelectJob(self, job_name):
     """Select a job from the management page.
@@ -470,21 +555,23 @@ class CloudPrintMgr(object):
     Returns:
       boolean: True = job selected, False = job not selected.
     """
-    self.cd.driver.get(Constants.GCP['MGT'])
-
+    job = self.FindJob(job_name)
+    if not job:
+      return False
     # If job already selected return true.
-    selected = self.cd.FindClass('cp-dashboard-listitem-selected')
-    if selected:
-      jobs = self.cd.FindClasses('cp-job-name', obj=selected)
-      for j in jobs:
-        if job_name in j.text:
-          return True
-    jobs = self.cd.FindClasses('cp-job-name')
-    for j in jobs:
-      if job_name in j.text:
-        if self.cd.ClickElement(j):
-          return True
-    return False
+    if job['selected']:
+      return True
+    try:
+      clicked = self.cd.ClickElement(job['element'])
+    except WebDriverException:
+      # The page changed since the index was read (the element is stale or
+      # covered by a dialog), so load it again.
+      self.RefreshJobs(reload_page=True)
+      return False
+    if clicked:
+      for j in self.jobs:
+        j['selected'] = j is job
+    return clicked
 
   @Retry(3)
   def DeleteJob(self, job_name):
@@ -499,6 +586,8 @@ class CloudPrintMgr(object):
       delete_button = self.cd.FindName('cp-button-delete')
       if delete_button:
         if self.cd.ClickElement(delete_button):
+          # Load the page again on the next lookup, the job list changed.
+          self.jobs_time = 0
           return True
         else:
           self.logger.error('Error clicking delete button.')
@@ -539,18 +628,10 @@ class CloudPrintMgr(object):
     Returns:
       string, status of job.
     """
-    if self.SelectJob(job_name):
-      selected = self.cd.FindClass('cp-dashboard-listitem-selected')
-      if selected:
-        status = self.cd.FindClass('cp-status-msg', obj=selected)
-        if status:
-          return status.text
-        else:
-          return None
-      else:
-        return None
-    else:
-      return None
+    job = self.FindJob(job_name, refresh=True)
+    if job:
+      return job['status']
+    return None
 
   @Retry(3, return_type='Value')
   def GetJobDetailsStateMsg(self, job_name):
@@ -20,10 +20,15 @@ classes and modules in the Logo Certification Package.
 """
 
 import base64
+import functools
 import json
 import math
 import mimetypes
 import os
+import random
+from StringIO import StringIO
+import tempfile
+import threading
 import time
 
 from _config import Constants
@@ -31,6 +36,11 @@ import _log
 
 logger = _log.GetLogger('LogoCert')
 
+# Deadline of the retried call running in each thread, and retry counters.
+_retry_state = threading.local()
+_retry_stats = {}
+_retry_lock = threading.Lock()
+
 
 def Cancel():
   """Allow for user input to cancel a pending operations.
@@ -110,29 +120,148 @@ def EncodeMultiPart(fields=None, files=None, ftype='application/xml'):
   return Constants.CRLF.join(lines)
 
 
-def Extract(dict_in, dict_out):
-  """Extract all the keys and values from a nested dictionary.
+class MultiPartStream(object):
+  """A file-like HTTP multipart body that streams files from disk.
+
+  Unlike EncodeMultiPart, files are not read into memory. The object can be
+  passed as the data of a urllib2 request, together with a Content-Length
+  header of self.length, and httplib will read it in blocks while sending.
+  """
+
+  def __init__(self, fields=None, files=None):
+    """Build the parts of the multipart body.
+
+    Args:
+      fields: list of tuples containing name and value of parameters.
+      files: list of tuples containing param name, pathname and content type.
+    """
+    self.parts = []
+    self.length = 0
+    if fields:
+      for (key, value) in fields:
+        if isinstance(value, unicode):
+          value = value.encode('utf-8')
+        self._AddString(Constants.CRLF.join([
+            '--' + Constants.BOUNDARY,
+            'Content-Disposition: form-data; name="%s"' % key,
+            '',
+            value,
+            '']))
+    if files:
+      for (key, pathname, ftype) in files:
+        filename = os.path.basename(pathname)
+        if isinstance(filename, unicode):
+          filename = filename.encode('utf-8')
+        self._AddString(Constants.CRLF.join([
+            '--' + Constants.BOUNDARY,
+            'Content-Disposition: form-data; name="%s"; filename="%s"' % (
+                key, filename),
+            'Content-Type: %s' % ftype,
+            '',
+            '']))
+        self.parts.append(pathname)
+        self.length += os.path.getsize(pathname)
+        self._AddString(Constants.CRLF)
+    self._AddString('--' + Constants.BOUNDARY + '--' + Constants.CRLF)
+    self.content_type = 'multipart/form-data; boundary=%s' % Constants.BOUNDARY
+    self.current = None
+    self.index = 0
+
+  def _AddString(self, data):
+    # Strings are stored in a list, to tell them apart from file pathnames.
+    self.parts.append([data])
+    self.length += len(data)
+
+  def read(self, size=-1):  # pylint: disable=invalid-name
+    """Read up to size bytes of the multipart body.
+
+    Args:
+      size: integer, maximum bytes to read, -1 = read everything.
+    Returns:
+      string, the next block of data, empty when the body is finished.
+    """
+    blocks = []
+    while size < 0 or size > 0:
+      if not self.current:
+        if self.index >= len(self.parts):
+          break
+        part = self.parts[self.index]
+        self.index += 1
+        if isinstance(part, list):
+          self.current = StringIO(part[0])
+        else:
+          self.current = open(part, 'rb')
+      block = self.current.read(size)
+      if not block:
+        self.current.close()
+        self.current = None
+        continue
+      blocks.append(block)
+      if size > 0:
+        size -= len(block)
+    return ''.join(blocks)
+
+  def close(self):  # pylint: disable=invalid-name
+    if self.current:
+      self.current.close()
+      self.current = None
+
+
+def IterFlatten(data, prefix=None):
+  """Walk a nested structure of dictionaries and lists, without recursion.
 
   Args:
-    dict_in: dictionary of unknown size and levels.
-    dict_out: dictionary to be created.
+    data: dictionary or list of unknown size and levels.
+    prefix: string, path to put in front of every key path.
+  Yields:
+    tuples of (path, value) for every leaf value, where path joins the keys
+    and list indexes with dots, for example printers.0.capabilities.printer.
+    Empty dictionaries and lists are leaf values, so no data is lost.
   """
-  if isinstance(dict_in, dict):
-    keys = dict_in.keys()
-    print keys
-    for key, value in dict_in.iteritems():
-      if isinstance(value, dict):
-        Extract(value, dict_out)
-      elif isinstance(dict_in, list):
-        for i in dict_in:
-          Extract(i, dict_out)
+  # Each stack entry is (path, value). Children are pushed in reverse, so
+  # they are yielded in their original order.
+  stack = [(prefix, data)]
+  while stack:
+    path, value = stack.pop()
+    if isinstance(value, dict) and value:
+      children = value.iteritems()
+    elif isinstance(value, list) and value:
+      children = enumerate(value)
+    else:
+      if path is not None:
+        yield path, value
+      continue
+    items = []
+    for key, child in children:
+      if path is None:
+        items.append(('%s' % key, child))
       else:
-        dict_out[key] = value
-  else:
-    type(dict_in)
+        items.append(('%s.%s' % (path, key), child))
+    items.reverse()
+    stack.extend(items)
+
 
+def Extract(dict_in, dict_out=None, lazy=False):
+  """Extract all the keys and values from a nested dictionary.
+
+  Args:
+    dict_in: dictionary (or list) of unknown size and levels.
+    dict_out: dictionary to add the flattened key paths and values to.
+    lazy: boolean, True = return a generator of (path, value) tuples instead.
+  Returns:
+    dict_out (a new dictionary if dict_out is None), with one entry per leaf
+    value keyed by its dotted path (see IterFlatten), or a generator if lazy.
+  """
+  if lazy:
+    return IterFlatten(dict_in)
+  if dict_out is None:
+    dict_out = {}
+  dict_out.update(IterFlatten(dict_in))
+  return dict_out
 
-def Retry(attempts, delay=3, backoff=2, return_type='Boolean'):
+
+def Retry(attempts, delay=3, backoff=2, return_type='Boolean',
+          deadline=None, jitter=None):
   """Retries a function or method until it returns True or attempts is reached.
 
   Args:
@@ -140,10 +269,19 @@ def Retry(attempts, delay=3, backoff=2, return_type='Boolean'):
     delay: integer, the amount of time to wait between attempts.
     backoff: integer, how much time to lengthen the delay between attempts.
     return_type: string, type of return function has. Boolean or Value.
+    deadline: integer, seconds all attempts may take, including the delays.
+              Default is Constants.RETRY['DEADLINE'].
+    jitter: float, fraction of each delay to randomly leave out, so retries
+            of parallel callers do not line up. Default is
+            Constants.RETRY['JITTER'].
   Returns:
     return value of decorated function.
   Raises:
     ValueError: if the value passed in is not valid.
+  A retried function that calls other retried functions shares its deadline
+  with them, so nested retries can not add up to more than the outer deadline.
+  The number of calls, retries, failures and time spent of each retried
+  function are kept, see RetryStats().
   """
   if backoff <= 1:
     raise ValueError('backoff must be greater than 1')
@@ -155,31 +293,100 @@ def Retry(attempts, delay=3, backoff=2, return_type='Boolean'):
   if delay <= 0:
     raise ValueError('delay must be greater than 0')
 
+  if deadline is None:
+    deadline = Constants.RETRY['DEADLINE']
+  if jitter is None:
+    jitter = Constants.RETRY['JITTER']
+  if not 0 <= jitter < 1:
+    raise ValueError('jitter must be 0 or greater, and less than 1')
+
   def DecoratedRetry(f):
     """The decorated retry function."""
+    @functools.wraps(f)
     def FunctionRetry(*args, **kwargs):
       """Retry function, accepting arguments from decorated function."""
       mattempts, mdelay = attempts, delay  # Make them mutable.
+      start = time.time()
+      # An enclosing retried call may already have a shorter deadline.
+      outer = getattr(_retry_state, 'deadline', None)
+      end = start + deadline
+      if outer is not None:
+        end = min(end, outer)
+      _retry_state.deadline = end
+      retries = 0
+      try:
+        rv = f(*args, **kwargs)
+        while mattempts > 0:
+          if return_type == 'Boolean':
+            if rv is True:
+              break
+          else:
+            if rv is not None:
+              break
+
+          sleep = mdelay * (1 - random.uniform(0, jitter))
+          if time.time() + sleep >= end:
+            break
+          mattempts -= 1
+          retries += 1
+          time.sleep(sleep)
+          mdelay *= backoff
+
+          rv = f(*args, **kwargs)
+      finally:
+        _retry_state.deadline = outer
+
+      if return_type == 'Boolean':
+        failed = rv is not True
+      else:
+        failed = rv is None
+      _RecordRetry(_RetryName(f, args), retries, failed, time.time() - start)
+      return rv  # Success, or ran out of attempts or time.
 
-      rv = f(*args, **kwargs)
-      while mattempts > 0:
-        if return_type == 'Boolean':
-          if rv is True:
-            return rv
-        else:
-          if rv is not None:
-            return rv
+    return FunctionRetry
+  return DecoratedRetry
 
-        mattempts -= 1
-        time.sleep(mdelay)
-        mdelay *= backoff
 
-        rv = f(*args, **kwargs)
+def _RetryName(f, args):
+  """Name a retried function, with the class name if it is a method."""
+  if args and getattr(args[0], f.__name__, None) is not None:
+    return '%s.%s' % (args[0].__class__.__name__, f.__name__)
+  return f.__name__
 
-      return rv  # Ran out of attempts.
 
-    return FunctionRetry
-  return DecoratedRetry
+def _RecordRetry(name, retries, failed, seconds):
+  with _retry_lock:
+    if name not in _retry_stats:
+      _retry_stats[name] = {'calls': 0, 'retries': 0, 'failures': 0,
+                            'seconds': 0.0}
+    stats = _retry_stats[name]
+    stats['calls'] += 1
+    stats['retries'] += retries
+    if failed:
+      stats['failures'] += 1
+    stats['seconds'] += seconds
+
+
+def RetryStats():
+  """Return the counters of retried functions.
+
+  Returns:
+    list of tuples (name, stats), sorted by most time spent. stats is a
+    dictionary with calls, retries, failures and seconds.
+  """
+  with _retry_lock:
+    stats = [(k, dict(v)) for k, v in _retry_stats.iteritems()]
+  stats.sort(key=lambda x: x[1]['seconds'], reverse=True)
+  return stats
+
+
+def LogRetryStats():
+  """Log the counters of retried functions that needed a retry."""
+  for name, stats in RetryStats():
+    if stats['retries'] or stats['failures']:
+      logger.info('%s: %d calls, %d retries, %d failures, %.1fs', name,
+                  stats['calls'], stats['retries'], stats['failures'],
+                  stats['seconds'])
 
 
 def ReadFile(pathname):
@@ -227,16 +434,18 @@ def ReadJsonFile(pathname):
   Args:
     pathname: string, pathname of a file.
   Returns:
-    string, contents of the file.
+    string, contents of the file, or None if it is missing or not json.
   """
   if os.path.isfile(pathname):
     try:
-      s = json.load(open(pathname))
-      return s
+      with open(pathname) as f:
+        return json.load(f)
     except IOError as e:
       logger.error('Error reading %s\n%s', pathname, e)
       return None
-    return None
+    except ValueError as e:
+      logger.warning('Ignoring %s, it is not valid json: %s', pathname, e)
+      return None
   return None
 
 
@@ -248,11 +457,21 @@ def WriteJsonFile(file_name, data):
     data: string, contents to write to file.
   Returns:
     boolean: True = success, False = errors.
+  The data is written to a temporary file that is then renamed over the file,
+  so readers (and a run stopped in the middle of a write) never see a
+  partially written file.
   """
+  directory, name = os.path.split(os.path.abspath(file_name))
+  partial = None
   try:
-    json.dump(data, open(file_name, 'wb'))
-  except IOError as e:
+    fd, partial = tempfile.mkstemp(prefix=name + '.', dir=directory)
+    with os.fdopen(fd, 'wb') as f:
+      json.dump(data, f)
+    os.rename(partial, file_name)
+  except (IOError, OSError) as e:
     logger.error('Error writing %s\n%s', file_name, e)
+    if partial and os.path.exists(partial):
+      os.remove(partial)
     return False
 
   return True
@@ -23,6 +23,35 @@ import mimetools
 import os
 
 
+class ImagePaths(dict):
+  """Image file names, read as paths in Constants.IMAGE_DIR.
+
+  The paths are joined when they are read, so changing IMAGE_DIR (for
+  example in a printer config) moves all images.
+  """
+
+  def __getitem__(self, key):
+    return os.path.join(os.path.abspath(Constants.IMAGE_DIR),
+                        dict.__getitem__(self, key))
+
+  def get(self, key, default=None):  # pylint: disable=invalid-name
+    return self[key] if key in self else default
+
+  def itervalues(self):  # pylint: disable=invalid-name
+    for key in self:
+      yield self[key]
+
+  def iteritems(self):  # pylint: disable=invalid-name
+    for key in self:
+      yield key, self[key]
+
+  def values(self):  # pylint: disable=invalid-name
+    return list(self.itervalues())
+
+  def items(self):  # pylint: disable=invalid-name
+    return list(self.iteritems())
+
+
 class Constants(object):
   """A classs that holds constants for the Logo Certification tool."""
 
@@ -30,6 +59,8 @@ class Constants(object):
 
   AUTH = {
       'CRED_FILE': 'credentials.txt',
+      # Refresh the access token when it expires within MARGIN seconds.
+      'MARGIN': 300,
       'REDIRECT': 'urn:ietf:wg:oauth:2.0:oob',
       'SCOPE': ('https://www.googleapis.com/auth/cloudprint '
                 'https://spreadsheets.google.com/feeds/'),
@@ -63,10 +94,14 @@ class Constants(object):
                              # false if the printer has no paper tray.
       }
 
+  # Printer CDDs saved by printer id and capabilities hash.
+  CDD_CACHE = 'cddcache.json'
+
   # Carriage return.
   CRLF = '\r\n'
 
   GCP = {
+      'API': 'https://www.google.com/cloudprint',
       'LEARN': 'http://www.google.com/cloudprint/learn/',
       'MGT': 'https://www.google.com/cloudprint',
       'PRINTERS': 'https://www.google.com/cloudprint#printers',
@@ -89,60 +124,72 @@ class Constants(object):
                 'mail id with an embedded image',
       }
 
-  image_dir = os.path.join(os.getcwd(), 'images')
-  IMAGES = {
-      'GIF1': os.path.join(image_dir, '6MB.gif'),
-      'GIF2': os.path.join(image_dir, 'img_0012.gif'),
-      'GIF3': os.path.join(image_dir, 'poster.gif'),
-      'GIF4': os.path.join(image_dir, 'Google-Glass.gif'),
-      'HTML1': os.path.join(image_dir, 'ChromeOSPowerManagementSpec.html'),
-      'JPG1': os.path.join(image_dir, 'b&w-test.jpg'),
-      'JPG2': os.path.join(image_dir, 'colorkey.jpg'),
-      'JPG3': os.path.join(image_dir, 'GoogleArt.jpg'),
-      'JPG4': os.path.join(image_dir, 'GoogleCampus.jpg'),
-      'JPG5': os.path.join(image_dir, 'google-car.jpg'),
-      'JPG6': os.path.join(image_dir, 'GoogleGlass.jpg'),
-      'JPG7': os.path.join(image_dir, 'GoogleGlass2.jpg'),
-      'JPG8': os.path.join(image_dir, 'landscape-test.jpg'),
-      'JPG9': os.path.join(image_dir, 'largeref.jpg'),
-      'JPG10': os.path.join(image_dir, 'max_test_big.jpg'),
-      'JPG11': os.path.join(image_dir, 'multitarget5.jpg'),
-      'JPG12': os.path.join(image_dir, 'brin.jpg'),
-      'JPG13': os.path.join(image_dir, 'stepchart.jpg'),
-      'JPG14': os.path.join(image_dir, 'testprint.jpeg'),
-      'PDF1': os.path.join(image_dir, 'a3color.pdf'),
-      'PDF1.2': os.path.join(image_dir, 'PDF1.2.pdf'),
-      'PDF1.3': os.path.join(image_dir, 'PDF1.3.pdf'),
-      'PDF1.4': os.path.join(image_dir, 'PDF1.4.pdf'),
-      'PDF1.5': os.path.join(image_dir, 'PDF1.5.pdf'),
-      'PDF1.6': os.path.join(image_dir, 'PDF1.6.pdf'),
-      'PDF1.7': os.path.join(image_dir, 'PDF1.7.pdf'),
-      'PDF2': os.path.join(image_dir, 'boardingpass.pdf'),
-      'PDF3': os.path.join(image_dir, 'letter_p.pdf'),
-      'PDF4': os.path.join(image_dir, 'lorem.pdf'),
-      'PDF5': os.path.join(image_dir, 'malformatted.pdf'),
-      'PDF6': os.path.join(image_dir, 'margin-test.pdf'),
-      'PDF7': os.path.join(image_dir, 'noise.pdf'),
-      'PDF8': os.path.join(image_dir, 'pickrpt.pdf'),
-      'PDF9': os.path.join(image_dir, 'printtest.pdf'),
-      'PDF10': os.path.join(image_dir, 'rosemary.pdf'),
-      'PDF11': os.path.join(image_dir, 'Satake_AE_web.pdf'),
-      'PDF12': os.path.join(image_dir, 'ticket.pdf'),
-      'PDF13': os.path.join(image_dir, 'version4pdf.pdf'),
-      'PDF14': os.path.join(image_dir, 'YourTickets.pdf'),
-      'PNG1': os.path.join(image_dir, 'A4testpage.png'),
-      'PNG2': os.path.join(image_dir, 'dna_overview.png'),
-      'PNG3': os.path.join(image_dir, 'gcpbeta.png'),
-      'PNG4': os.path.join(image_dir, 'google_logo.png'),
-      'PNG5': os.path.join(image_dir, 'printtest.png'),
-      'PNG6': os.path.join(image_dir, 'printtest2.png'),
-      'PNG7': os.path.join(image_dir, 'testpage.png'),
-      'PNG8': os.path.join(image_dir, 'larrypage.png'),
-      'PNG9': os.path.join(image_dir, 'mandlebulb_3d_test.png'),
-      'SVG1': os.path.join(image_dir, 'DoNotDisturb.svg'),
-      'SVG2': os.path.join(image_dir, 'Example.svg'),
-      'TIFF1': os.path.join(image_dir, 'gcpreglink.tif'),
-      'TIFF2': os.path.join(image_dir, 'marbles.tif'),
+  # Directory of the test images, relative to the working directory.
+  IMAGE_DIR = 'images'
+
+  # File names of the test images. They are read as paths in IMAGE_DIR.
+  IMAGES = ImagePaths({
+      'GIF1': '6MB.gif',
+      'GIF2': 'img_0012.gif',
+      'GIF3': 'poster.gif',
+      'GIF4': 'Google-Glass.gif',
+      'HTML1': 'ChromeOSPowerManagementSpec.html',
+      'JPG1': 'b&w-test.jpg',
+      'JPG2': 'colorkey.jpg',
+      'JPG3': 'GoogleArt.jpg',
+      'JPG4': 'GoogleCampus.jpg',
+      'JPG5': 'google-car.jpg',
+      'JPG6': 'GoogleGlass.jpg',
+      'JPG7': 'GoogleGlass2.jpg',
+      'JPG8': 'landscape-test.jpg',
+      'JPG9': 'largeref.jpg',
+      'JPG10': 'max_test_big.jpg',
+      'JPG11': 'multitarget5.jpg',
+      'JPG12': 'brin.jpg',
+      'JPG13': 'stepchart.jpg',
+      'JPG14': 'testprint.jpeg',
+      'PDF1': 'a3color.pdf',
+      'PDF1.2': 'PDF1.2.pdf',
+      'PDF1.3': 'PDF1.3.pdf',
+      'PDF1.4': 'PDF1.4.pdf',
+      'PDF1.5': 'PDF1.5.pdf',
+      'PDF1.6': 'PDF1.6.pdf',
+      'PDF1.7': 'PDF1.7.pdf',
+      'PDF2': 'boardingpass.pdf',
+      'PDF3': 'letter_p.pdf',
+      'PDF4': 'lorem.pdf',
+      'PDF5': 'malformatted.pdf',
+      'PDF6': 'margin-test.pdf',
+      'PDF7': 'noise.pdf',
+      'PDF8': 'pickrpt.pdf',
+      'PDF9': 'printtest.pdf',
+      'PDF10': 'rosemary.pdf',
+      'PDF11': 'Satake_AE_web.pdf',
+      'PDF12': 'ticket.pdf',
+      'PDF13': 'version4pdf.pdf',
+      'PDF14': 'YourTickets.pdf',
+      'PNG1': 'A4testpage.png',
+      'PNG2': 'dna_overview.png',
+      'PNG3': 'gcpbeta.png',
+      'PNG4': 'google_logo.png',
+      'PNG5': 'printtest.png',
+      'PNG6': 'printtest2.png',
+      'PNG7': 'testpage.png',
+      'PNG8': 'larrypage.png',
+      'PNG9': 'mandlebulb_3d_test.png',
+      'SVG1': 'DoNotDisturb.svg',
+      'SVG2': 'Example.svg',
+      'TIFF1': 'gcpreglink.tif',
+      'TIFF2': 'marbles.tif',
+      })
+
+  # Seconds between polls of print job status, to wait for a job to change,
+  # and before the management page is loaded again to refresh the job index.
+  JOBS = {
+      'INDEXTTL': 10,
+      'MAXPOLL': 15,
+      'POLL': 1,
+      'TIMEOUT': 300,
       }
 
   LOGFILES = '/tmp/logocert/'
@@ -161,6 +208,17 @@ class Constants(object):
       'STATUS': '<Released, Internal, ProtoType, Unknown>',
       }
 
+  # Directory of the test images rendered into PWG raster (see _renditions).
+  RENDITIONS = 'renditions'
+
+  # Defaults of the Retry decorator. DEADLINE is the most seconds a retried
+  # call (and the retried calls it makes) may take, JITTER the largest
+  # fraction of each delay that is randomly left out.
+  RETRY = {
+      'DEADLINE': 60,
+      'JITTER': 0.5,
+      }
+
   TEST = {
       'NAME': 'LogoCertification_Results',
       'RESULTS': ['Test Case ID', 'Test Case Name', 'Status', 'Notes'],
@@ -20,11 +20,13 @@ attributes of a device. Before the device attributes are fully populated,
 the methods GetDeviceDetails and GetDeviceCDD must be run.
 """
 
-import json
-
+from _cddparse import ParseCDD
 from _cloudprintmgr import CloudPrintMgr
 from _common import Extract
+from _common import ReadJsonFile
+from _common import WriteJsonFile
 from _config import Constants
+from _gcpapi import CloudPrintApi
 from _jsonparser import JsonParser
 import _log
 from _privet import Privet
@@ -60,17 +62,29 @@ class Device(object):
     self.details = {}
     self.error_state = False
     self.cdd = {}
+    self.caps_hash = None
     self.info = None
+    self.printer_info = {}
 
     self.url = 'http://%s:%s' % (self.ipv4, self.port)
     self.logger.info('Device URL: %s', self.url)
     self.transport = Transport()
     self.jparser = JsonParser()
+    self.gcpapi = CloudPrintApi()
     self.headers = None
     self.privet = Privet()
     self.privet_url = self.privet.SetPrivetUrls(self.ipv4, self.port)
     self.GetPrivetInfo()
 
+  def SetChromeDriver(self, chromedriver):
+    """Use a new chromedriver object, for example after Chrome restarts.
+
+    Args:
+      chromedriver: an initialized chromedriver object.
+    """
+    self.cd = chromedriver
+    self.cloudprintmgr = CloudPrintMgr(chromedriver)
+
   def GetPrivetInfo(self):
     self.privet_info = {}
     response = self.transport.HTTPReq(self.privet_url['info'],
@@ -109,6 +123,45 @@ class Device(object):
   def GetDeviceCDD(self, device_id):
     """Get device cdd and populate device object with the details.
 
+    Args:
+      device_id: string, Cloud Print device id.
+    Returns:
+      boolean: True = cdd details populated, False = cdd details not populated.
+    The CDD is read from the GCP printer interface, and kept in memory and in
+    the file Constants.CDD_CACHE keyed by printer id and capabilities hash.
+    It is only fetched again when the printer reports a new capabilities hash.
+    The simulate page is used if the GCP interfaces can not be reached.
+    """
+    caps_hash = self.gcpapi.GetCapsHash(device_id)
+    if self.cdd.get('id') == device_id and caps_hash in (None, self.caps_hash):
+      self.logger.debug('Using CDD already read, capsHash %s', self.caps_hash)
+      return True
+    if caps_hash:
+      key = '%s:%s' % (device_id, caps_hash)
+      # A missing or unreadable cache is a cache miss.
+      cache = ReadJsonFile(Constants.CDD_CACHE)
+      if not isinstance(cache, dict):
+        cache = {}
+      if key in cache:
+        self.logger.info('Using cached CDD of %s', device_id)
+        self.cdd = cache[key]
+        self.caps_hash = caps_hash
+        return True
+      info = self.gcpapi.GetPrinter(device_id)
+      if info:
+        cdd = ParseCDD(info)
+        if cdd:
+          self.cdd = cdd
+          self.caps_hash = cdd.get('capsHash', caps_hash)
+          cache['%s:%s' % (device_id, self.caps_hash)] = cdd
+          WriteJsonFile(Constants.CDD_CACHE, cache)
+          return True
+    self.logger.info('Reading CDD from the simulate page.')
+    return self.GetDeviceCDDFromPage(device_id)
+
+  def GetDeviceCDDFromPage(self, device_id):
+    """Get device cdd from the simulate page, and populate the device object.
+
     Args:
       device_id: string, Cloud Print device id.
     Returns:
@@ -138,23 +191,14 @@ class Device(object):
       boolean: True = CDD parsed, False = CDD not parsed.
     """
 
-    cdd = {}
-    if self.info:
-      cdd = json.loads(self.info)
-    else:
+    if not self.info:
       self.logger.warning('Device info is empty.')
       return False
-    if 'printers' in cdd:
-      for k in cdd['printers'][0]:
-        if k == 'capabilities':
-          self.cdd['caps'] = {}
-        else:
-          self.cdd[k] = cdd['printers'][0][k]
-    else:
-      self.logger.error('Could not find printers in cdd.')
+    cdd = ParseCDD(self.info)
+    if not cdd:
       return False
-    for k in cdd['printers'][0]['capabilities']['printer']:
-      self.cdd['caps'][k] = cdd['printers'][0]['capabilities']['printer'][k]
+    self.cdd.update(cdd)
+    self.caps_hash = cdd.get('capsHash')
     return True
 
   def CancelRegistration(self):
@@ -271,8 +315,7 @@ class Device(object):
       boolean: True = success, False = errors.
     """
     if self.id:
-      delete_url = '%s/delete?printerid=%s' % (Constants.AUTH['URL']['GCP'],
-                                               self.id)
+      delete_url = '%s/delete?printerid=%s' % (Constants.GCP['API'], self.id)
       response = self.transport.HTTPReq(delete_url, auth_token=auth_token,
                                         data='')
     else:
@@ -295,18 +338,21 @@ class Device(object):
       auth_token: string, auth token of device owner.
     Returns:
       boolean: True = success, False = errors.
+    The response is stored flattened in self.printer_info, keyed by dotted
+    paths like printers.0.capabilities.printer.color.option.1.type.
     """
     if self.id:
-      printer_url = '%s/printer?printerid=%s&usecdd=True' % (
-          Constants.AUTH['URL']['GCP'], self.id)
+      printer_url = '%s/printer?printerid=%s&use_cdd=true' % (
+          Constants.GCP['API'], self.id)
       response = self.transport.HTTPReq(printer_url, auth_token=auth_token)
     else:
       self.logger.warning('Cannot get printer info, device not registered.')
       return False
 
     info = self.jparser.Read(response['data'])
-    Extract(info, self.info)
-    for k, v in self.info.iteritems():
-      self.logger.debug('%s: %s', k, v)
-      self.logger.debug('=============================================')
+    if not info['json']:
+      return False
+    self.printer_info = Extract(info)
+    for k in sorted(self.printer_info):
+      self.logger.debug('%s: %s', k, self.printer_info[k])
     return True
@@ -0,0 +1,241 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Access the Google Cloud Print service interfaces directly.
+
+This is faster than driving the management page with ChromeDriver, and gives
+exact control over the print ticket. Requests are authorized with the OAuth2
+access token in Constants.AUTH['ACCESS'], and are sent to Constants.GCP['API'],
+which can point to a local stand-in of the service (see _gcpstub.py).
+
+The interfaces are described here:
+https://developers.google.com/cloud-print/docs/appInterfaces
+"""
+
+import json
+from multiprocessing.pool import ThreadPool
+import mimetypes
+import os
+import re
+import threading
+import time
+import urllib
+
+from _common import MultiPartStream
+from _config import Constants
+from _jsonparser import JsonParser
+import _log
+from _transport import Transport
+
+
+class CloudPrintApi(object):
+  """Send requests to the Cloud Print service interfaces."""
+
+  def __init__(self):
+    self.logger = _log.GetLogger('LogoCert')
+    self.transport = Transport()
+    self.jparser = JsonParser()
+
+  def _Headers(self):
+    # Read the token on each request, as it is refreshed during long runs.
+    return {'Authorization': 'Bearer %s' % Constants.AUTH['ACCESS']}
+
+  def _Url(self, interface):
+    return '%s/%s' % (Constants.GCP['API'], interface)
+
+  def _Read(self, response, interface):
+    """Decode a json response and check it reports success.
+
+    Args:
+      response: dictionary, response from Transport.
+      interface: string, name of the interface, for logging.
+    Returns:
+      dictionary of the decoded response, or None if the request failed.
+    """
+    if response['code'] != 200:
+      self.logger.error('%s request failed, return code: %s', interface,
+                        response['code'])
+      return None
+    info = self.jparser.Read(response['data'])
+    if not info['json']:
+      self.logger.error('%s response is not json.', interface)
+      return None
+    if not info.get('success'):
+      self.logger.error('%s request failed: %s', interface,
+                        info.get('message'))
+      return None
+    return info
+
+  def Submit(self, printer_id, pathname, ticket, title=None, caps=None):
+    """Submit a print job, streaming the file to the service.
+
+    Args:
+      printer_id: string, Cloud Print printer id.
+      pathname: string, pathname of file to print.
+      ticket: PrintTicket object.
+      title: string, title of job, default is the file name.
+      caps: dictionary, printer capabilities from the CDD.
+    Returns:
+      dictionary of the submitted job, or None if the job was not submitted.
+    """
+    if not os.path.isfile(pathname):
+      self.logger.error('File to print not found: %s', pathname)
+      return None
+    content_type = (mimetypes.guess_type(pathname)[0] or
+                    'application/octet-stream')
+    cjt = ticket.CJT(caps)
+    self.logger.debug('Submitting %s with ticket: %s', pathname, cjt)
+    fields = [('printerid', printer_id),
+              ('title', title or os.path.basename(pathname)),
+              ('ticket', json.dumps(cjt)),
+              ('contentType', content_type),
+             ]
+    body = MultiPartStream(fields=fields,
+                           files=[('content', pathname, content_type)])
+    response = self.transport.SendStream(self._Url('submit'), body,
+                                         body.length, body.content_type,
+                                         headers=self._Headers())
+    info = self._Read(response, 'submit')
+    if not info:
+      return None
+    return info.get('job')
+
+  def GetPrinter(self, printer_id):
+    """Get a printer, with its capabilities in CDD format.
+
+    Args:
+      printer_id: string, Cloud Print printer id.
+    Returns:
+      dictionary, the decoded response with a list of printers, or None if the
+      request failed.
+    """
+    url = '%s?%s' % (self._Url('printer'),
+                     urllib.urlencode({'printerid': printer_id,
+                                       'use_cdd': 'true'}))
+    response = self.transport.HTTPReq(url, headers=self._Headers())
+    return self._Read(response, 'printer')
+
+  def GetCapsHash(self, printer_id):
+    """Get the hash of the capabilities of a printer, without the capabilities.
+
+    Args:
+      printer_id: string, Cloud Print printer id.
+    Returns:
+      string, the capabilities hash, or None if the printer was not found.
+    The hash changes when the printer updates its capabilities, so it tells
+    if a saved CDD is still current.
+    """
+    url = '%s?%s' % (self._Url('search'),
+                     urllib.urlencode({'connection_status': 'ALL'}))
+    response = self.transport.HTTPReq(url, headers=self._Headers())
+    info = self._Read(response, 'search')
+    if not info:
+      return None
+    for printer in info.get('printers', []):
+      if printer.get('id') == printer_id:
+        return printer.get('capsHash')
+    return None
+
+  def GetJobs(self, printer_id=None, query=None):
+    """List print jobs.
+
+    Args:
+      printer_id: string, only list jobs of this printer.
+      query: string, only list jobs with query in the title.
+    Returns:
+      list of job dictionaries, or None if the request failed.
+    """
+    params = {}
+    if printer_id:
+      params['printerid'] = printer_id
+    if query:
+      params['q'] = query
+    url = self._Url('jobs')
+    if params:
+      url = '%s?%s' % (url, urllib.urlencode(params))
+    response = self.transport.HTTPReq(url, headers=self._Headers())
+    info = self._Read(response, 'jobs')
+    if not info:
+      return None
+    return info.get('jobs', [])
+
+  def DeleteJob(self, job_id, transport=None):
+    """Delete a print job.
+
+    Args:
+      job_id: string, id of the job.
+      transport: Transport object to send the request with, so that threads
+                 do not share one.
+    Returns:
+      boolean: True = job deleted, False = errors deleting job.
+    """
+    transport = transport or self.transport
+    response = transport.HTTPReq(self._Url('deletejob'),
+                                 data={'jobid': job_id},
+                                 headers=self._Headers())
+    return self._Read(response, 'deletejob') is not None
+
+  def PurgeJobs(self, older_than=None, pattern=None, dry_run=False,
+                batch=10):
+    """Delete old jobs, or jobs whose title matches a pattern.
+
+    Args:
+      older_than: float, delete jobs created more than this many hours ago.
+      pattern: string, regular expression to search for in job titles.
+      dry_run: boolean, True = only list the jobs that would be deleted.
+      batch: integer, number of jobs to delete in parallel.
+    Returns:
+      list of jobs deleted (or to delete, in a dry run), or None on errors.
+    If both older_than and pattern are set, jobs must match both. At least one
+    must be set, this method never deletes all jobs.
+    """
+    if older_than is None and not pattern:
+      self.logger.error('Purge needs an age or a title pattern.')
+      return None
+    jobs = self.GetJobs()
+    if jobs is None:
+      return None
+    matches = []
+    oldest = (time.time() - (older_than or 0) * 3600) * 1000
+    for job in jobs:
+      if older_than is not None and int(job.get('createTime', 0)) > oldest:
+        continue
+      if pattern and not re.search(pattern, job.get('title', '')):
+        continue
+      matches.append(job)
+    if dry_run:
+      for job in matches:
+        self.logger.info('Would delete job %s: %s', job['id'], job['title'])
+      self.logger.info('Dry run, %d of %d jobs would be deleted.',
+                       len(matches), len(jobs))
+      return matches
+
+    local = threading.local()
+
+    def Delete(job):
+      if not hasattr(local, 'transport'):
+        local.transport = Transport()
+      return self.DeleteJob(job['id'], transport=local.transport)
+
+    pool = ThreadPool(max(1, min(batch, len(matches))))
+    try:
+      results = pool.map(Delete, matches)
+    finally:
+      pool.close()
+      pool.join()
+    deleted = [job for job, ok in zip(matches, results) if ok]
+    self.logger.info('Deleted %d of %d jobs, %d errors.', len(deleted),
+                     len(jobs), len(matches) - len(deleted))
+    return deleted
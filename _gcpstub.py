@@ -0,0 +1,301 @@
+#!/usr/bin/python
+
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+A local stand-in for the Google Cloud Print service interfaces.
+
+Use this to exercise _gcpapi.py without a Cloud Print account or printer. It
+accepts the same requests as the service and keeps print jobs in memory. Jobs
+move from QUEUED to IN_PROGRESS to DONE over time, one page per page_seconds,
+as if a printer were printing them.
+Start it from the command line:
+
+./_gcpstub.py --port 8088
+
+and point the tool at it with --gcpapi http://localhost:8088/cloudprint, or
+start it from python with GCPStub().Start().
+"""
+
+import BaseHTTPServer
+import cgi
+import hashlib
+import json
+import optparse
+import re
+import SocketServer
+import threading
+import time
+import urlparse
+import uuid
+
+import _log
+
+
+class _Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+  daemon_threads = True
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+  """Route requests to the interfaces of the stub."""
+
+  def log_message(self, fmt, *args):  # pylint: disable=arguments-differ
+    self.server.stub.logger.debug('GCP stub: ' + fmt, *args)
+
+  def _Reply(self, code, data):
+    body = json.dumps(data)
+    self.send_response(code)
+    self.send_header('Content-Type', 'application/json')
+    self.send_header('Content-Length', '%d' % len(body))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def _Params(self):
+    """Return the query and form parameters as a dictionary of strings."""
+    url = urlparse.urlparse(self.path)
+    params = {}
+    for k, v in urlparse.parse_qs(url.query).iteritems():
+      params[k] = v[0]
+    if self.command == 'POST':
+      form = cgi.FieldStorage(
+          fp=self.rfile, headers=self.headers,
+          environ={'REQUEST_METHOD': 'POST',
+                   'CONTENT_TYPE': self.headers.get('Content-Type', '')})
+      if form.list:
+        for k in form.keys():
+          params[k] = form[k].value
+    return url.path, params
+
+  def _Handle(self):
+    stub = self.server.stub
+    if not self.headers.get('Authorization', '').startswith('Bearer '):
+      self._Reply(403, {'success': False, 'message': 'Not authorized.'})
+      return
+    path, params = self._Params()
+    interface = path.rstrip('/').split('/')[-1]
+    handler = stub.interfaces.get(interface)
+    if not handler:
+      self._Reply(404, {'success': False,
+                        'message': 'Unknown interface %s' % interface})
+      return
+    self._Reply(200, handler(params))
+
+  do_GET = _Handle  # pylint: disable=invalid-name
+  do_POST = _Handle  # pylint: disable=invalid-name
+
+
+class GCPStub(object):
+  """Serve a subset of the Cloud Print interfaces from memory."""
+
+  def __init__(self, port=0, queue_seconds=2, page_seconds=1):
+    """Create the stub server.
+
+    Args:
+      port: integer, tcp port to listen on, 0 = pick a free port.
+      queue_seconds: float, seconds a job stays queued.
+      page_seconds: float, seconds to print each page of a job.
+    """
+    self.logger = _log.GetLogger('LogoCert')
+    self.server = _Server(('localhost', port), _Handler)
+    self.server.stub = self
+    self.port = self.server.server_address[1]
+    self.url = 'http://localhost:%d/cloudprint' % self.port
+    self.lock = threading.Lock()
+    self.jobs = {}
+    self.printers = {}
+    self.queue_seconds = queue_seconds
+    self.page_seconds = page_seconds
+    self.interfaces = {
+        'deletejob': self.DeleteJob,
+        'jobs': self.Jobs,
+        'printer': self.Printer,
+        'search': self.Search,
+        'submit': self.Submit,
+        }
+    self.thread = None
+
+  def Start(self):
+    """Serve requests in a background thread.
+
+    Returns:
+      string, base url of the stub interfaces.
+    """
+    self.thread = threading.Thread(target=self.server.serve_forever)
+    self.thread.daemon = True
+    self.thread.start()
+    self.logger.info('GCP stub serving on %s', self.url)
+    return self.url
+
+  def Stop(self):
+    self.server.shutdown()
+    self.server.server_close()
+
+  def AddPrinter(self, printer_id, name, caps):
+    """Register a printer with the stub.
+
+    Args:
+      printer_id: string, Cloud Print printer id.
+      name: string, name of printer.
+      caps: dictionary, printer capabilities (the printer section of a CDD).
+    """
+    caps_hash = hashlib.md5(json.dumps(caps, sort_keys=True)).hexdigest()
+    with self.lock:
+      self.printers[printer_id] = {
+          'id': printer_id,
+          'name': name,
+          'displayName': name,
+          'connectionStatus': 'ONLINE',
+          'capsHash': caps_hash,
+          'capabilities': {'version': '1.0', 'printer': caps},
+          }
+
+  def Printer(self, params):
+    """Return a printer with its capabilities.
+
+    Args:
+      params: dictionary of request parameters.
+    Returns:
+      dictionary, the response to send.
+    """
+    with self.lock:
+      printer = self.printers.get(params.get('printerid'))
+      if not printer:
+        return {'success': False, 'message': 'Printer not found.'}
+      return {'success': True, 'printers': [dict(printer)]}
+
+  def Search(self, params):
+    """List printers, without their capabilities.
+
+    Args:
+      params: dictionary of request parameters.
+    Returns:
+      dictionary, the response to send.
+    """
+    printers = []
+    with self.lock:
+      for printer in self.printers.itervalues():
+        if 'q' in params and params['q'] not in printer['name']:
+          continue
+        printer = dict(printer)
+        del printer['capabilities']
+        printers.append(printer)
+    return {'success': True, 'printers': printers}
+
+  def Submit(self, params):
+    """Add a print job.
+
+    Args:
+      params: dictionary of request parameters.
+    Returns:
+      dictionary, the response to send.
+    """
+    for k in ['printerid', 'title', 'content']:
+      if k not in params:
+        return {'success': False, 'message': 'Missing parameter: %s' % k}
+    if 'ticket' in params:
+      try:
+        json.loads(params['ticket'])
+      except ValueError:
+        return {'success': False, 'message': 'Ticket is not valid json.'}
+    now = '%d' % (time.time() * 1000)
+    pages = 1
+    if params['content'].startswith('%PDF'):
+      pages = len(re.findall(r'/Type\s*/Page[^s]', params['content'])) or 1
+    job = {
+        'id': uuid.uuid4().hex,
+        'printerid': params['printerid'],
+        'title': params['title'],
+        'contentType': params.get('contentType', 'application/octet-stream'),
+        'ticket': params.get('ticket', '{}'),
+        'fileSize': '%d' % len(params['content']),
+        'createTime': now,
+        'updateTime': now,
+        'status': 'QUEUED',
+        'numberOfPages': pages,
+        }
+    with self.lock:
+      self.jobs[job['id']] = job
+    self.logger.info('GCP stub added job %s: %s', job['id'], job['title'])
+    return {'success': True, 'message': 'Print job added.', 'job': job}
+
+  def DeleteJob(self, params):
+    """Delete a job.
+
+    Args:
+      params: dictionary of request parameters.
+    Returns:
+      dictionary, the response to send.
+    """
+    with self.lock:
+      if self.jobs.pop(params.get('jobid'), None) is None:
+        return {'success': False, 'message': 'Job not found.'}
+    return {'success': True, 'message': 'Print job deleted successfully.'}
+
+  def Jobs(self, params):
+    """List jobs, with their state updated to the current time.
+
+    Args:
+      params: dictionary of request parameters.
+    Returns:
+      dictionary, the response to send.
+    """
+    jobs = []
+    with self.lock:
+      for job in self.jobs.itervalues():
+        if 'printerid' in params and job['printerid'] != params['printerid']:
+          continue
+        if 'q' in params and params['q'] not in job['title']:
+          continue
+        self._Progress(job)
+        jobs.append(dict(job))
+    return {'success': True, 'jobs': jobs}
+
+  def _Progress(self, job):
+    """Move a job along, as if the printer had been printing it."""
+    elapsed = time.time() - int(job['createTime']) / 1000.0
+    printing = elapsed - self.queue_seconds
+    if printing < 0:
+      status = 'QUEUED'
+      printed = 0
+    else:
+      printed = min(int(printing / self.page_seconds), job['numberOfPages'])
+      if printed < job['numberOfPages']:
+        status = 'IN_PROGRESS'
+      else:
+        status = 'DONE'
+    if status != job['status']:
+      job['status'] = status
+      job['updateTime'] = '%d' % (time.time() * 1000)
+    job['semanticState'] = {'version': '1.0',
+                            'state': {'type': status},
+                            'pages_printed': printed}
+
+
+def main():
+  parser = optparse.OptionParser()
+  parser.add_option('--port',
+                    help='Port to listen on [default: %default]',
+                    default=8088,
+                    type='int',
+                    dest='port')
+  options, unused_args = parser.parse_args()
+  _log.GetLogger('LogoCert', stdout=True)
+  stub = GCPStub(port=options.port)
+  print 'Serving Cloud Print stub on %s' % stub.url
+  stub.server.serve_forever()
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,221 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Watch the state of a print job until the printer reports progress.
+
+A JobWatcher polls a job source with an increasing delay, up to a deadline,
+and returns as soon as the job changes state (QUEUED, IN_PROGRESS, DONE or
+ERROR) or reports more pages printed. Two job sources are provided: the Cloud
+Print management page, and the Cloud Print jobs interface.
+"""
+
+import time
+
+from _config import Constants
+import _log
+
+# Job states, in the order a job normally goes through them.
+QUEUED = 'QUEUED'
+IN_PROGRESS = 'IN_PROGRESS'
+DONE = 'DONE'
+ERROR = 'ERROR'
+
+# Job status text on the management page.
+MGT_STATES = {
+    'Queued': QUEUED,
+    'In progress': IN_PROGRESS,
+    'Printed': DONE,
+    'Error': ERROR,
+    }
+
+# State types of the Cloud Job State (semanticState of the jobs interface,
+# semantic_state of Privet jobstate), the Privet job states, and the job
+# status of the jobs interface, as job states.
+JOB_STATES = {
+    'DRAFT': QUEUED,
+    'HELD': QUEUED,
+    'QUEUED': QUEUED,
+    'SUBMITTED': QUEUED,
+    'IN_PROGRESS': IN_PROGRESS,
+    'STOPPED': ERROR,
+    'DONE': DONE,
+    'ABORTED': ERROR,
+    'ERROR': ERROR,
+    'draft': QUEUED,
+    'queued': QUEUED,
+    'in_progress': IN_PROGRESS,
+    'stopped': ERROR,
+    'done': DONE,
+    'aborted': ERROR,
+    }
+
+
+class JobStatus(object):
+  """The state of a print job at one point in time."""
+
+  def __init__(self, state=None, pages=None):
+    """Hold the job state.
+
+    Args:
+      state: string, one of QUEUED, IN_PROGRESS, DONE, ERROR, or None if the
+             job was not found.
+      pages: integer, pages printed, or None if not known.
+    """
+    self.state = state
+    self.pages = pages
+
+  def __eq__(self, other):
+    return (self.state, self.pages) == (other.state, other.pages)
+
+  def __ne__(self, other):
+    return not self == other
+
+  def __repr__(self):
+    return 'JobStatus(%s, pages=%s)' % (self.state, self.pages)
+
+
+class MgtPageJobSource(object):
+  """Read job status from the Cloud Print management page."""
+
+  def __init__(self, gcpmgr):
+    """Use a CloudPrintMgr page object.
+
+    Args:
+      gcpmgr: CloudPrintMgr object.
+    """
+    self.gcpmgr = gcpmgr
+
+  def GetStatus(self, job_name):
+    """Get the status of a job.
+
+    Args:
+      job_name: string, name (or unique partial name) of print job.
+    Returns:
+      JobStatus object.
+    The pages printed are only shown on the job details, after the job is done.
+    """
+    text = self.gcpmgr.GetJobStatus(job_name)
+    if text is None:
+      return JobStatus()
+    state = MGT_STATES.get(text.strip(), text.strip())
+    pages = None
+    if state == DONE:
+      pages = self.gcpmgr.GetPagesPrinted(job_name)
+    return JobStatus(state, pages)
+
+
+class ApiJobSource(object):
+  """Read job status from the Cloud Print jobs interface."""
+
+  def __init__(self, gcpapi, printer_id):
+    """Use a CloudPrintApi object.
+
+    Args:
+      gcpapi: CloudPrintApi object.
+      printer_id: string, Cloud Print printer id.
+    """
+    self.gcpapi = gcpapi
+    self.printer_id = printer_id
+
+  def GetStatus(self, job_name):
+    """Get the status of the newest job that matches job_name.
+
+    Args:
+      job_name: string, name (or unique partial name) of print job.
+    Returns:
+      JobStatus object.
+    """
+    jobs = self.gcpapi.GetJobs(self.printer_id, query=job_name)
+    if not jobs:
+      return JobStatus()
+    job = max(jobs, key=lambda j: int(j.get('createTime', 0)))
+    state = job.get('semanticState', {}).get('state', {}).get('type')
+    state = state or job.get('status')
+    state = JOB_STATES.get(state, state)
+    pages = job.get('semanticState', {}).get('pages_printed')
+    if pages is None and state == DONE:
+      pages = job.get('numberOfPages')
+    if pages is not None:
+      pages = int(pages)
+    return JobStatus(state, pages)
+
+
+class JobWatcher(object):
+  """Poll a job source until a print job changes."""
+
+  def __init__(self, source, delay=None, max_delay=None):
+    """Set the job source and poll intervals.
+
+    Args:
+      source: object with a GetStatus(job_name) method, like MgtPageJobSource.
+      delay: float, seconds to wait after the first poll.
+      max_delay: float, longest wait between polls.
+    """
+    self.logger = _log.GetLogger('LogoCert')
+    self.source = source
+    self.delay = delay or Constants.JOBS['POLL']
+    self.max_delay = max_delay or Constants.JOBS['MAXPOLL']
+
+  def WaitForChange(self, job_name, last=None, timeout=None):
+    """Wait until a job reports a new state or more pages printed.
+
+    Args:
+      job_name: string, name (or unique partial name) of print job.
+      last: JobStatus object last seen, None = wait for any status.
+      timeout: integer, seconds to wait before giving up.
+    Returns:
+      JobStatus object, the new status, or the last status read if the
+      deadline passed without a change.
+    """
+    if timeout is None:
+      timeout = Constants.JOBS['TIMEOUT']
+    deadline = time.time() + timeout
+    delay = self.delay
+    while True:
+      status = self.source.GetStatus(job_name)
+      if status.state and (last is None or status != last):
+        self.logger.debug('Job %s: %s', job_name, status)
+        return status
+      remaining = deadline - time.time()
+      if remaining <= 0:
+        self.logger.info('Job %s did not change within the deadline: %s',
+                         job_name, status)
+        return status
+      time.sleep(min(delay, remaining))
+      delay = min(delay * 2, self.max_delay)
+
+  def WaitForState(self, job_name, states, timeout=None):
+    """Wait until a job reaches one of states.
+
+    Args:
+      job_name: string, name (or unique partial name) of print job.
+      states: list of job states to wait for.
+      timeout: integer, seconds to wait before giving up.
+    Returns:
+      JobStatus object, the status the job was last seen in.
+    A job that is DONE does not change any more, so DONE also ends the wait,
+    even if it is not in states.
+    """
+    if timeout is None:
+      timeout = Constants.JOBS['TIMEOUT']
+    deadline = time.time() + timeout
+    status = None
+    while True:
+      status = self.WaitForChange(job_name, status,
+                                  timeout=max(deadline - time.time(), 0))
+      if status.state in states or status.state == DONE:
+        return status
+      if time.time() >= deadline:
+        return status
@@ -0,0 +1,291 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Send many local print jobs at once, to find where a printer stops keeping up.
+
+A LoadGenerator prints a number of jobs, drawn from a weighted mix of the
+test images, with a number of worker threads, each with its own LocalPrint
+client (see _localprint.py). While the jobs run, a monitor thread reads the
+Privet info of the printer, and records the changes of its device_state and
+how many jobs the workers were sending or waiting on at each read.
+
+The report holds every job with its timings, latency percentiles, the
+queue depth samples and device_state changes, and the HTTP codes and Privet
+errors of every request, from which the rejection and 503 rates are taken.
+"""
+
+import random
+import threading
+import time
+
+from _config import Constants
+from _jobwatcher import ERROR
+from _jsonparser import JsonParser
+from _localprint import LocalPrint
+import _log
+from _transport import Transport
+
+# Test images printed when no mix is given.
+DEFAULT_MIX = {'PDF9': 1, 'PNG1': 1, 'JPG1': 1}
+
+# Latencies reported for each percentile.
+PERCENTILES = [50, 90, 95, 99]
+
+
+def ParseMix(spec):
+  """Parse a document mix.
+
+  Args:
+    spec: string, comma separated Constants.IMAGES keys with an optional
+          weight, like "PDF9:3,JPG1".
+  Returns:
+    dictionary of image key to weight.
+  Raises:
+    ValueError: if an image is unknown or a weight is not a positive integer.
+  """
+  mix = {}
+  for part in spec.split(','):
+    part = part.strip()
+    if not part:
+      continue
+    key, _, weight = part.partition(':')
+    if key not in Constants.IMAGES:
+      raise ValueError('Unknown test image: %s' % key)
+    if weight and (not weight.isdigit() or not int(weight)):
+      raise ValueError('Weight of %s is not a positive integer: %s' %
+                       (key, weight))
+    mix[key] = int(weight or 1)
+  if not mix:
+    raise ValueError('Document mix is empty.')
+  return mix
+
+
+def DrawJobs(mix, count, seed=None):
+  """Draw the documents of count jobs from a mix.
+
+  Args:
+    mix: dictionary of image key to weight.
+    count: integer, number of jobs.
+    seed: integer, seed of the random draw, None = a different draw each run.
+  Returns:
+    list of image keys, one per job.
+  """
+  pool = []
+  for key in sorted(mix):
+    pool.extend([key] * mix[key])
+  draw = random.Random(seed)
+  return [draw.choice(pool) for _ in range(count)]
+
+
+def Percentiles(values):
+  """Return min, max and PERCENTILES of a list of numbers, None if empty."""
+  values = sorted([v for v in values if v is not None])
+  if not values:
+    return None
+  stats = {'min': values[0], 'max': values[-1], 'count': len(values)}
+  for p in PERCENTILES:
+    stats['p%d' % p] = values[min(len(values) - 1, len(values) * p // 100)]
+  return stats
+
+
+class LoadGenerator(object):
+  """Print jobs concurrently, and watch how the printer copes."""
+
+  def __init__(self, privet_url, headers, concurrency=4, wait=True,
+               interval=1.0, timeout=None):
+    """Set the printer and the load.
+
+    Args:
+      privet_url: dictionary of Privet urls, see Privet.SetPrivetUrls.
+      headers: dictionary, the X-Privet-Token header of the printer.
+      concurrency: integer, number of jobs sent at the same time.
+      wait: boolean, True = each worker waits for its job to be done before
+            sending the next, False = only until the printer takes it.
+      interval: float, seconds between reads of the Privet info.
+      timeout: integer, seconds to wait for each job to be done.
+    """
+    self.logger = _log.GetLogger('LogoCert')
+    self.privet_url = privet_url
+    self.headers = headers
+    self.concurrency = concurrency
+    self.wait = wait
+    self.interval = interval
+    self.timeout = timeout or Constants.JOBS['TIMEOUT']
+    self.lock = threading.Lock()
+    self.done = threading.Event()
+    self.outstanding = 0
+    self.start = None
+    self.jobs = []
+    self.samples = []
+    self.states = []
+
+  def _Elapsed(self):
+    return round(time.time() - self.start, 3)
+
+  def _Worker(self, client, queue):
+    while True:
+      with self.lock:
+        if not queue:
+          return
+        number, image = queue.pop(0)
+        self.outstanding += 1
+      sent = self._Elapsed()
+      job = None
+      try:
+        job = client.Print(Constants.IMAGES[image], wait=self.wait,
+                           job_name='load%d_%s' % (number, image),
+                           timeout=self.timeout)
+      except Exception as e:  # pylint: disable=broad-except
+        self.logger.error('Job %d (%s) failed: %s', number, image, e)
+        job = {'job_id': None, 'bytes': 0, 'state': None, 'error': str(e),
+               'submit_seconds': None, 'done_seconds': None}
+      finally:
+        with self.lock:
+          self.outstanding -= 1
+          if job is not None:
+            job.update({'number': number, 'image': image, 'sent': sent})
+            self.jobs.append(job)
+
+  def _Monitor(self):
+    transport = Transport()
+    jparser = JsonParser()
+    last = None
+    while True:
+      try:
+        response = transport.HTTPReq(self.privet_url['info'],
+                                     cloudprint=False, headers=self.headers)
+        if response['code'] == 200:
+          info = jparser.Read(response['data'])
+          state = info.get('device_state') if info['json'] else None
+        else:
+          state = 'http_%s' % response['code']
+      except Exception as e:  # pylint: disable=broad-except
+        self.logger.warning('Could not read the Privet info: %s', e)
+        state = 'error'
+      now = self._Elapsed()
+      with self.lock:
+        self.samples.append({'time': now, 'outstanding': self.outstanding,
+                             'device_state': state})
+      if state != last:
+        self.logger.info('Printer device_state at %.1fs: %s', now, state)
+        self.states.append({'time': now, 'device_state': state})
+        last = state
+      if self.done.wait(self.interval):
+        return
+
+  def Run(self, images):
+    """Print one job per image, and report how the printer handled them.
+
+    Args:
+      images: list of Constants.IMAGES keys, see DrawJobs.
+    Returns:
+      dictionary, the report (see Report).
+    """
+    queue = list(enumerate(images, 1))
+    clients = [LocalPrint(self.privet_url, self.headers,
+                          transport=Transport())
+               for _ in range(min(self.concurrency, len(queue)) or 1)]
+    self.start = time.time()
+    self.done.clear()
+    monitor = threading.Thread(target=self._Monitor)
+    monitor.daemon = True
+    monitor.start()
+    workers = [threading.Thread(target=self._Worker, args=(client, queue))
+               for client in clients]
+    for worker in workers:
+      worker.daemon = True
+      worker.start()
+    for worker in workers:
+      worker.join()
+    seconds = time.time() - self.start
+    self.done.set()
+    monitor.join()
+    return self.Report(clients, seconds)
+
+  def Report(self, clients, seconds):
+    """Summarize a run.
+
+    Args:
+      clients: list of the LocalPrint objects of the workers.
+      seconds: float, how long the run took.
+    Returns:
+      dictionary with the jobs, latency percentiles, queue depth samples,
+      device_state changes, request counts by HTTP code and Privet error,
+      and the rejection and 503 rates.
+    """
+    codes = {}
+    errors = {}
+    for client in clients:
+      for (api, code), count in client.codes.iteritems():
+        key = '%s %s' % (api, code)
+        codes[key] = codes.get(key, 0) + count
+      for (api, error), count in client.errors.iteritems():
+        key = '%s %s' % (api, error)
+        errors[key] = errors.get(key, 0) + count
+    requests = sum(codes.itervalues())
+    unavailable = sum([n for k, n in codes.iteritems() if k.endswith(' 503')])
+    jobs = sorted(self.jobs, key=lambda j: j['number'])
+    failed = [j for j in jobs if j['error'] or j['state'] == ERROR]
+    return {
+        'jobs': jobs,
+        'concurrency': self.concurrency,
+        'seconds': round(seconds, 3),
+        'bytes': sum([j['bytes'] for j in jobs]),
+        'failed': len(failed),
+        'rejection_rate': float(len(failed)) / len(jobs) if jobs else 0.0,
+        'requests': requests,
+        'unavailable_rate': (float(unavailable) / requests if requests
+                             else 0.0),
+        'codes': codes,
+        'errors': errors,
+        'latency': {
+            'submit': Percentiles([j['submit_seconds'] for j in jobs]),
+            'done': Percentiles([j['done_seconds'] for j in jobs]),
+            },
+        'max_outstanding': max([s['outstanding'] for s in self.samples] or
+                               [0]),
+        'samples': self.samples,
+        'device_states': self.states,
+        }
+
+
+def FormatReport(report):
+  """Format a LoadGenerator report as text."""
+  lines = ['%d jobs, %d at a time, in %.1f seconds, %d bytes sent.' % (
+      len(report['jobs']), report['concurrency'], report['seconds'],
+      report['bytes'])]
+  if report['seconds']:
+    lines.append('%.1f jobs per minute, %.0f bytes per second.' % (
+        60 * len(report['jobs']) / report['seconds'],
+        report['bytes'] / report['seconds']))
+  lines.append('Failed jobs: %d (%.1f%%), HTTP 503: %.1f%% of %d requests.' %
+               (report['failed'], 100 * report['rejection_rate'],
+                100 * report['unavailable_rate'], report['requests']))
+  for name in ('submit', 'done'):
+    stats = report['latency'][name]
+    if stats:
+      lines.append('%s latency: min %.2fs, %s, max %.2fs' % (
+          name.capitalize(), stats['min'],
+          ', '.join(['p%d %.2fs' % (p, stats['p%d' % p])
+                     for p in PERCENTILES]), stats['max']))
+  lines.append('Most jobs outstanding: %d' % report['max_outstanding'])
+  lines.append('device_state: %s' % ', '.join(
+      ['%s at %.1fs' % (s['device_state'], s['time'])
+       for s in report['device_states']]))
+  for key in sorted(report['codes']):
+    lines.append('  %s: %d' % (key, report['codes'][key]))
+  for key in sorted(report['errors']):
+    lines.append('  %s: %d' % (key, report['errors'][key]))
+  return '\n'.join(lines)
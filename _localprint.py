@@ -0,0 +1,324 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Print straight to a printer with the Privet local printing API.
+
+A local print job is created with a CJT (createjob), then the document is
+streamed to the printer in chunks (submitdoc), then the job state is polled
+with a JobWatcher until the printer reports it done (jobstate). Printers
+without createjob (that answer it with HTTP 404) take submitdoc on its own.
+
+Every job is timed, and LocalPrint.Print returns the timings with the job:
+
+  createjob_seconds: createjob request.
+  first_byte_seconds: start of the job to the first document byte sent.
+  upload_seconds: first to last document byte sent.
+  throughput: document bytes sent per second of upload.
+  response_seconds: last document byte sent to the submitdoc response.
+  submit_seconds: start of the job to the submitdoc response.
+  done_seconds: start of the job to the printer reporting it done, which is
+                only as precise as the jobstate polls.
+"""
+
+import collections
+import json
+import mimetypes
+import os
+import threading
+import time
+import urllib
+
+from _config import Constants
+from _jobwatcher import DONE
+from _jobwatcher import ERROR
+from _jobwatcher import JOB_STATES
+from _jobwatcher import JobStatus
+from _jobwatcher import JobWatcher
+from _jobwatcher import QUEUED
+from _jsonparser import JsonParser
+import _log
+from _transport import Transport
+
+# Bytes of the document sent at a time.
+CHUNK = 65536
+
+
+class _TimedReader(object):
+  """A file-like object that times and counts the bytes read from a file."""
+
+  def __init__(self, f, chunk):
+    self.f = f
+    self.chunk = chunk
+    self.bytes = 0
+    self.first = None
+    self.last = None
+
+  def read(self, size=-1):  # pylint: disable=invalid-name
+    data = self.f.read(self.chunk if size < 0 else min(size, self.chunk))
+    now = time.time()
+    if data:
+      if self.first is None:
+        self.first = now
+      self.bytes += len(data)
+    self.last = now
+    return data
+
+  def close(self):  # pylint: disable=invalid-name
+    self.f.close()
+
+
+class PrivetJobSource(object):
+  """Read job status from the Privet jobstate interface of a printer."""
+
+  def __init__(self, client):
+    """Use a LocalPrint object.
+
+    Args:
+      client: LocalPrint object.
+    """
+    self.client = client
+
+  def GetStatus(self, job_id):
+    """Get the status of a local print job.
+
+    Args:
+      job_id: string, Privet job id.
+    Returns:
+      JobStatus object.
+    """
+    info = self.client.JobState(job_id)
+    if not info:
+      return JobStatus()
+    state = info.get('semantic_state', {}).get('state', {}).get('type')
+    state = JOB_STATES.get(state or info.get('state'), state)
+    pages = info.get('semantic_state', {}).get('pages_printed')
+    if pages is None:
+      pages = info.get('pages_printed')
+    if pages is not None:
+      pages = int(pages)
+    return JobStatus(state, pages)
+
+
+class LocalPrint(object):
+  """Send print jobs to a printer with the Privet local printing API."""
+
+  def __init__(self, privet_url, headers, transport=None, chunk=None):
+    """Set the printer to print to.
+
+    Args:
+      privet_url: dictionary of Privet urls, see Privet.SetPrivetUrls.
+      headers: dictionary, the X-Privet-Token header of the printer.
+      transport: Transport object, default is a new one.
+      chunk: integer, bytes of the document sent at a time.
+    """
+    self.logger = _log.GetLogger('LogoCert')
+    self.privet_url = privet_url
+    self.headers = headers
+    self.transport = transport or Transport()
+    self.jparser = JsonParser()
+    self.chunk = chunk or CHUNK
+    # Counts of (api, HTTP code) and (api, Privet error) of every request.
+    self.codes = collections.Counter()
+    self.errors = collections.Counter()
+    self.lock = threading.Lock()
+    # False once the printer answers createjob with HTTP 404.
+    self.createjob = True
+
+  def _Read(self, response, api):
+    """Decode a json response of the printer.
+
+    Args:
+      response: dictionary, response from Transport.
+      api: string, name of the Privet api, for logging.
+    Returns:
+      dictionary of the decoded response, or None if the request failed. A
+      Privet error is returned, with the error key set.
+    """
+    with self.lock:
+      self.codes[(api, response['code'])] += 1
+    if response['code'] != 200:
+      self.logger.error('Privet %s failed, return code: %s', api,
+                        response['code'])
+      return None
+    info = self.jparser.Read(response['data'])
+    if not info['json']:
+      self.logger.error('Privet %s response is not json.', api)
+      return None
+    if 'error' in info:
+      with self.lock:
+        self.errors[(api, info['error'])] += 1
+      self.logger.warning('Privet %s error: %s %s', api, info['error'],
+                          info.get('description', ''))
+    return info
+
+  def _Busy(self, info, deadline):
+    """Wait as asked if the printer is busy, and return True to try again."""
+    if not info or info.get('error') != 'printer_busy':
+      return False
+    wait = float(info.get('timeout', Constants.JOBS['POLL']))
+    if time.time() + wait > deadline:
+      return False
+    self.logger.info('Printer busy, trying again in %.1f seconds.', wait)
+    time.sleep(wait)
+    return True
+
+  def CreateJob(self, cjt, deadline=None):
+    """Create a local print job.
+
+    Args:
+      cjt: dictionary, Cloud Job Ticket (see PrintTicket.CJT).
+      deadline: float, time to stop trying when the printer is busy.
+    Returns:
+      dictionary of the createjob response, or None if the request failed.
+      If the printer has no createjob, self.createjob is set to False.
+    """
+    deadline = deadline or time.time() + Constants.JOBS['TIMEOUT']
+    while True:
+      headers = dict(self.headers, **{'Content-Type': 'application/json'})
+      response = self.transport.HTTPReq(self.privet_url['createjob'],
+                                        cloudprint=False, headers=headers,
+                                        printdata=json.dumps(cjt))
+      if response['code'] == 404:
+        self.createjob = False
+      info = self._Read(response, 'createjob')
+      if not self._Busy(info, deadline):
+        return info
+
+  def SubmitDoc(self, pathname, content_type=None, job_id=None,
+                job_name=None, deadline=None):
+    """Stream a document to the printer.
+
+    Args:
+      pathname: string, pathname of file to print.
+      content_type: string, mime type of the file, default is from its name.
+      job_id: string, job id from CreateJob, None = print without a job.
+      job_name: string, name of the job, default is the file name.
+      deadline: float, time to stop trying when the printer is busy.
+    Returns:
+      tuple of (dictionary of the submitdoc response or None if the request
+      failed, _TimedReader the document was read with).
+    """
+    deadline = deadline or time.time() + Constants.JOBS['TIMEOUT']
+    content_type = (content_type or mimetypes.guess_type(pathname)[0] or
+                    'application/octet-stream')
+    query = [('client_name', 'GCPLogoCert'),
+             ('user_name', Constants.USER['EMAIL']),
+             ('job_name', job_name or os.path.basename(pathname))]
+    if job_id:
+      query.insert(0, ('job_id', job_id))
+    url = '%s?%s' % (self.privet_url['submitdoc'], urllib.urlencode(query))
+    while True:
+      reader = _TimedReader(open(pathname, 'rb'), self.chunk)
+      try:
+        response = self.transport.SendStream(url, reader,
+                                             os.path.getsize(pathname),
+                                             content_type,
+                                             headers=self.headers)
+      finally:
+        reader.close()
+      info = self._Read(response, 'submitdoc')
+      if not self._Busy(info, deadline):
+        return info, reader
+
+  def JobState(self, job_id):
+    """Read the state of a local print job.
+
+    Args:
+      job_id: string, Privet job id.
+    Returns:
+      dictionary of the jobstate response, or None if the request failed.
+    """
+    url = '%s?%s' % (self.privet_url['jobstate'],
+                     urllib.urlencode({'job_id': job_id}))
+    response = self.transport.HTTPReq(url, cloudprint=False,
+                                      headers=self.headers)
+    return self._Read(response, 'jobstate')
+
+  def Print(self, pathname, ticket=None, caps=None, content_type=None,
+            job_name=None, wait=True, timeout=None):
+    """Print a file, and time each step of the job.
+
+    Args:
+      pathname: string, pathname of file to print.
+      ticket: PrintTicket object, None = printer defaults.
+      caps: dictionary, printer capabilities from the CDD.
+      content_type: string, mime type of the file, default is from its name.
+      job_name: string, name of the job, default is the file name.
+      wait: boolean, True = poll jobstate until the job is done.
+      timeout: integer, seconds to wait for the job to be done.
+    Returns:
+      dictionary with the keys job_id, bytes, state, error, and the timings
+      described at the top of this module (None if not measured).
+    """
+    timeout = timeout or Constants.JOBS['TIMEOUT']
+    start = time.time()
+    deadline = start + timeout
+    job = {'job_id': None, 'bytes': 0, 'state': None, 'error': None,
+           'createjob_seconds': None, 'first_byte_seconds': None,
+           'upload_seconds': None, 'throughput': None,
+           'response_seconds': None, 'submit_seconds': None,
+           'done_seconds': None}
+    cjt = ticket.CJT(caps) if ticket else {'version': '1.0', 'print': {}}
+    if self.createjob:
+      info = self.CreateJob(cjt, deadline)
+      job['createjob_seconds'] = time.time() - start
+      if info and 'error' not in info:
+        job['job_id'] = info.get('job_id')
+      elif self.createjob:
+        job['error'] = info['error'] if info else 'createjob failed'
+        return job
+    if not self.createjob:
+      # Printers without createjob take submitdoc on its own.
+      self.logger.info('Printing without createjob.')
+    info, reader = self.SubmitDoc(pathname, content_type, job['job_id'],
+                                  job_name, deadline)
+    submitted = time.time()
+    job['submit_seconds'] = submitted - start
+    job['bytes'] = reader.bytes
+    if reader.first is not None:
+      job['first_byte_seconds'] = reader.first - start
+      job['upload_seconds'] = reader.last - reader.first
+      job['response_seconds'] = submitted - reader.last
+      if job['upload_seconds'] > 0:
+        job['throughput'] = reader.bytes / job['upload_seconds']
+    if not info or 'error' in info:
+      job['error'] = info['error'] if info else 'submitdoc failed'
+      return job
+    job['job_id'] = info.get('job_id', job['job_id'])
+    job['state'] = QUEUED
+    if wait and job['job_id']:
+      watcher = JobWatcher(PrivetJobSource(self))
+      status = watcher.WaitForState(job['job_id'], [DONE, ERROR],
+                                    timeout=max(deadline - time.time(), 0))
+      job['state'] = status.state
+      if status.state == DONE:
+        job['done_seconds'] = time.time() - start
+    self.logger.info('Local print job %s: %s, %d bytes, %s', job['job_id'],
+                     job['state'], job['bytes'], FormatTimings(job))
+    return job
+
+
+def FormatTimings(job):
+  """Format the timings of a local print job as text."""
+  parts = []
+  for key, label in [('createjob_seconds', 'createjob %.3fs'),
+                     ('first_byte_seconds', 'first byte %.3fs'),
+                     ('upload_seconds', 'upload %.3fs'),
+                     ('throughput', '%.0f bytes/s'),
+                     ('response_seconds', 'response %.3fs'),
+                     ('done_seconds', 'done %.1fs')]:
+    if job.get(key) is not None:
+      parts.append(label % job[key])
+  return ', '.join(parts)
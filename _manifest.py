@@ -0,0 +1,260 @@
+#!/usr/bin/python
+
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+A manifest of the test images, with their hash, size, type and pages.
+
+The manifest is a json file in the image directory, made with:
+
+./_manifest.py [--imagedir images]
+
+For every file it holds the sha1 and size of its content, its mime type,
+its number of pages and, for images, its width and height in pixels. Pages
+and dimensions are read from the file headers, without any image library.
+
+Check() compares Constants.IMAGES with the image directory and the manifest
+in one pass of os.stat calls (hashes are only compared when asked), so
+missing or changed images are found when the tests start.
+"""
+
+import hashlib
+import json
+import mimetypes
+import optparse
+import os
+import re
+import struct
+import sys
+import zlib
+
+from _config import Constants
+
+# Name of the manifest file in the image directory.
+MANIFEST = 'manifest.json'
+
+_PDF_COUNT = re.compile(r'/Type\s*/Pages\b[^>]*?/Count\s+(\d+)|'
+                        r'/Count\s+(\d+)[^>]*?/Type\s*/Pages\b')
+_PDF_LINEARIZED = re.compile(r'/Linearized\b[^>]*?/N\s+(\d+)')
+_PDF_PAGE = re.compile(r'/Type\s*/Page\b(?!s)')
+_PDF_STREAM = re.compile(r'stream\r?\n(.*?)endstream', re.S)
+
+
+def _PdfPages(data):
+  """Count the pages of a pdf.
+
+  The /Count of the page tree root is used if it can be read, then the page
+  count of a linearized pdf, then the number of page objects.
+  """
+  counts = [int(a or b) for a, b in _PDF_COUNT.findall(data)]
+  if counts:
+    return max(counts)
+  match = _PDF_LINEARIZED.search(data)
+  if match:
+    return int(match.group(1))
+  # Objects of pdf 1.5 and later may be in compressed object streams.
+  texts = [data]
+  for stream in _PDF_STREAM.findall(data):
+    try:
+      texts.append(zlib.decompressobj().decompress(stream))
+    except zlib.error:
+      continue
+  for text in texts[1:]:
+    counts.extend([int(a or b) for a, b in _PDF_COUNT.findall(text)])
+  if counts:
+    return max(counts)
+  return sum([len(_PDF_PAGE.findall(text)) for text in texts]) or None
+
+
+def _JpegSize(data):
+  """Return (width, height) from the first start of frame marker."""
+  i = 2
+  while i + 9 < len(data):
+    if data[i] != '\xff':
+      i += 1
+      continue
+    marker = ord(data[i + 1])
+    if marker in (0xd8, 0x01) or 0xd0 <= marker <= 0xd7 or marker == 0xff:
+      i += 1 if marker == 0xff else 2
+      continue
+    length = struct.unpack('>H', data[i + 2:i + 4])[0]
+    if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+      height, width = struct.unpack('>HH', data[i + 5:i + 9])
+      return width, height
+    i += 2 + length
+  return None, None
+
+
+def _TiffInfo(data):
+  """Return (pages, width, height) of a tiff, pages is the number of IFDs."""
+  endian = '<' if data[:2] == 'II' else '>'
+  offset = struct.unpack(endian + 'I', data[4:8])[0]
+  pages = 0
+  width = height = None
+  while offset and offset + 2 <= len(data) and pages < 1000:
+    count = struct.unpack(endian + 'H', data[offset:offset + 2])[0]
+    for n in range(count):
+      entry = data[offset + 2 + n * 12:offset + 14 + n * 12]
+      if len(entry) < 12:
+        break
+      tag, kind = struct.unpack(endian + 'HH', entry[:4])
+      value = struct.unpack(endian + ('H' if kind == 3 else 'I'),
+                            entry[8:10] if kind == 3 else entry[8:12])[0]
+      if pages == 0 and tag == 256:
+        width = value
+      elif pages == 0 and tag == 257:
+        height = value
+    pages += 1
+    end = offset + 2 + count * 12
+    offset = struct.unpack(endian + 'I', data[end:end + 4])[0]
+  return pages, width, height
+
+
+def _SvgSize(data):
+  match = re.search(r'<svg[^>]*>', data, re.S)
+  if not match:
+    return None, None
+  size = []
+  for attr in ('width', 'height'):
+    value = re.search(r'\s%s="([\d.]+)' % attr, match.group(0))
+    size.append(int(float(value.group(1))) if value else None)
+  return tuple(size)
+
+
+def Describe(pathname):
+  """Describe one file.
+
+  Args:
+    pathname: string, path of the file.
+  Returns:
+    dictionary with keys sha1, size, mime, pages, width and height (None if
+    the file has no dimensions, or they could not be read).
+  """
+  with open(pathname, 'rb') as f:
+    data = f.read()
+  info = {
+      'sha1': hashlib.sha1(data).hexdigest(),
+      'size': len(data),
+      'mime': mimetypes.guess_type(pathname)[0] or 'application/octet-stream',
+      'pages': 1,
+      'width': None,
+      'height': None,
+      }
+  if data.startswith('%PDF'):
+    info['pages'] = _PdfPages(data)
+  elif data.startswith('\x89PNG'):
+    info['width'], info['height'] = struct.unpack('>II', data[16:24])
+  elif data[:6] in ('GIF87a', 'GIF89a'):
+    info['width'], info['height'] = struct.unpack('<HH', data[6:10])
+  elif data.startswith('\xff\xd8'):
+    info['width'], info['height'] = _JpegSize(data)
+  elif data[:4] in ('II*\x00', 'MM\x00*'):
+    info['pages'], info['width'], info['height'] = _TiffInfo(data)
+  elif info['mime'] == 'image/svg+xml':
+    info['width'], info['height'] = _SvgSize(data)
+  return info
+
+
+def Build(image_dir):
+  """Describe every file of the image directory.
+
+  Args:
+    image_dir: string, path of the image directory.
+  Returns:
+    dictionary, the manifest, with the description of each file under files.
+  """
+  files = {}
+  for name in sorted(os.listdir(image_dir)):
+    pathname = os.path.join(image_dir, name)
+    if name != MANIFEST and os.path.isfile(pathname):
+      files[name] = Describe(pathname)
+  return {'files': files}
+
+
+def Load(image_dir):
+  """Read the manifest of the image directory.
+
+  Args:
+    image_dir: string, path of the image directory.
+  Returns:
+    dictionary, the manifest, or None if there is none.
+  """
+  pathname = os.path.join(image_dir, MANIFEST)
+  if not os.path.isfile(pathname):
+    return None
+  with open(pathname) as f:
+    return json.load(f)
+
+
+def Check(manifest, images=None, full=False):
+  """Check the test images against the image directory and the manifest.
+
+  Args:
+    manifest: dictionary from Load(), None = only check the files exist.
+    images: list of Constants.IMAGES keys, default is all of them.
+    full: boolean, True = compare the sha1 of every file as well.
+  Returns:
+    list of strings, one per problem, empty if all images are as expected.
+  """
+  problems = []
+  for key in sorted(images or Constants.IMAGES.keys()):
+    pathname = Constants.IMAGES[key]
+    name = os.path.basename(pathname)
+    try:
+      size = os.stat(pathname).st_size
+    except OSError:
+      problems.append('%s: %s is missing' % (key, name))
+      continue
+    if manifest is None:
+      continue
+    entry = manifest['files'].get(name)
+    if entry is None:
+      problems.append('%s: %s is not in the manifest' % (key, name))
+    elif size != entry['size']:
+      problems.append('%s: %s has %d bytes, the manifest %d' % (
+          key, name, size, entry['size']))
+    elif full and Describe(pathname)['sha1'] != entry['sha1']:
+      problems.append('%s: %s does not match its sha1' % (key, name))
+  return problems
+
+
+def main():
+  parser = optparse.OptionParser()
+  parser.add_option('--check',
+                    help='Check the images against the manifest instead of '
+                    'writing it [default: %default]',
+                    action='store_true',
+                    default=False,
+                    dest='check')
+  parser.add_option('--imagedir',
+                    help='Image directory [default: %default]',
+                    default=Constants.IMAGE_DIR,
+                    dest='imagedir')
+  options, unused_args = parser.parse_args()
+  Constants.IMAGE_DIR = options.imagedir
+  if options.check:
+    problems = Check(Load(options.imagedir), full=True)
+    for problem in problems:
+      print problem
+    return 1 if problems else 0
+  manifest = Build(options.imagedir)
+  with open(os.path.join(options.imagedir, MANIFEST), 'w') as f:
+    json.dump(manifest, f, indent=2, sort_keys=True)
+  print 'Described %d files.' % len(manifest['files'])
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -17,10 +17,16 @@ Some functions to get OAuth2 credentials.
 """
 
 import json
+import threading
+import time
 import urllib
 import urllib2
 
+from _common import ReadJsonFile
+from _common import WriteJsonFile
 from _config import Constants
+import _log
+import _transport
 
 
 def UrlEscape(text):
@@ -92,7 +98,7 @@ def GetTokens(auth_code):
   request_url = Constants.OAUTH_TOKEN
 
   request = urllib2.Request(request_url, data, headers)
-  res = urllib2.urlopen(request)
+  res = _transport.Open(request)
   response = res.read()
   return json.loads(response)
 
@@ -124,6 +130,128 @@ def RefreshToken():
   request_url = Constants.OAUTH_TOKEN
 
   request = urllib2.Request(request_url, data, headers)
-  res = urllib2.urlopen(request)
+  res = _transport.Open(request)
   response = res.read()
   return json.loads(response)
+
+
+class TokenManager(object):
+  """Keep the OAuth2 tokens of the test user valid for the whole run.
+
+  Tokens are saved in Constants.AUTH['CRED_FILE'] with the time the access
+  token expires, so a valid access token is reused on the next run. The access
+  token is refreshed when it is within Constants.AUTH['MARGIN'] seconds of
+  expiring, either on request or by a background thread. Callers that ask for
+  a refresh while one is running wait for it, instead of sending another.
+  """
+
+  def __init__(self, cred_file=None):
+    self.logger = _log.GetLogger('LogoCert')
+    self.cred_file = cred_file or Constants.AUTH['CRED_FILE']
+    self.expires_at = 0
+    self.refreshing = False
+    self.condition = threading.Condition()
+    self.stop = threading.Event()
+    self.thread = None
+
+  def Load(self):
+    """Read saved tokens into Constants.AUTH.
+
+    Returns:
+      boolean: True = a refresh token was found, False = no saved tokens.
+    """
+    creds = ReadJsonFile(self.cred_file)
+    if not creds:
+      return False
+    if 'refresh_token' in creds:
+      Constants.AUTH['REFRESH'] = creds['refresh_token']
+    if 'access_token' in creds:
+      Constants.AUTH['ACCESS'] = creds['access_token']
+    # Files written before expiry was tracked have no expires_at, so their
+    # access token is treated as expired.
+    self.expires_at = creds.get('expires_at', 0)
+    return 'REFRESH' in Constants.AUTH
+
+  def Store(self, creds):
+    """Use and save tokens from a token response.
+
+    Args:
+      creds: dictionary, decoded response of GetTokens() or RefreshToken().
+    """
+    if 'refresh_token' in creds:
+      Constants.AUTH['REFRESH'] = creds['refresh_token']
+    if 'access_token' in creds:
+      Constants.AUTH['ACCESS'] = creds['access_token']
+      self.expires_at = time.time() + int(creds.get('expires_in', 0))
+    WriteJsonFile(self.cred_file, {
+        'access_token': Constants.AUTH.get('ACCESS'),
+        'refresh_token': Constants.AUTH.get('REFRESH'),
+        'expires_at': self.expires_at,
+        })
+
+  def Valid(self):
+    """Return True if the access token is not close to expiring."""
+    return ('ACCESS' in Constants.AUTH and
+            time.time() < self.expires_at - Constants.AUTH['MARGIN'])
+
+  def GetAccessToken(self):
+    """Return a valid access token, refreshing it if needed.
+
+    Returns:
+      string, access token, or None if it could not be refreshed.
+    """
+    if not self.Valid() and not self.Refresh():
+      return None
+    return Constants.AUTH['ACCESS']
+
+  def Refresh(self):
+    """Get a new access token with the refresh token.
+
+    Returns:
+      boolean: True = access token is valid, False = errors refreshing.
+    If another thread is already refreshing, wait for its result.
+    """
+    with self.condition:
+      if self.refreshing:
+        while self.refreshing:
+          self.condition.wait()
+        return self.Valid()
+      self.refreshing = True
+    try:
+      try:
+        response = RefreshToken()
+      except (urllib2.URLError, ValueError) as e:
+        self.logger.error('Error refreshing access token.\n%s', e)
+        return False
+      if 'access_token' not in response:
+        self.logger.error('No access token in refresh response: %s',
+                          response.get('error'))
+        return False
+      self.logger.info('Got new access token.')
+      self.Store(response)
+      return True
+    finally:
+      with self.condition:
+        self.refreshing = False
+        self.condition.notify_all()
+
+  def StartAutoRefresh(self):
+    """Refresh the access token in the background before it expires."""
+    if self.thread:
+      return
+    self.stop.clear()
+    self.thread = threading.Thread(target=self._AutoRefresh)
+    self.thread.daemon = True
+    self.thread.start()
+
+  def StopAutoRefresh(self):
+    self.stop.set()
+    self.thread = None
+
+  def _AutoRefresh(self):
+    while not self.stop.is_set():
+      wait = self.expires_at - Constants.AUTH['MARGIN'] - time.time()
+      # Check again at least every minute, and retry a failed refresh soon.
+      self.stop.wait(min(max(wait, 5), 60))
+      if not self.stop.is_set() and not self.Valid():
+        self.Refresh()
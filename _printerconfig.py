@@ -0,0 +1,192 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Per-printer configuration files.
+
+A printer config is a json (or, if PyYAML is installed, yaml) file with the
+sections of _config.Constants that differ for the printer under test, like:
+
+{
+  "PRINTER": {"MODEL": "Model A", "IP": "10.0.0.5", "PORT": "80"},
+  "CAPS": {"TRAY_SENSOR": true},
+  "IMAGE_DIR": "/data/images"
+}
+
+A config is checked against Constants when it is loaded, so a misspelled
+section or key, or a value of the wrong type, stops the run at startup
+instead of in the middle of a suite. CAPS flags that are not set in the
+config can be derived from the printer CDD with ApplyCDDCaps().
+"""
+
+import json
+
+from _config import Constants
+
+try:
+  import yaml
+except ImportError:
+  yaml = None
+
+# Sections and keys set by ApplyConfig(), so derived values do not replace
+# values set on purpose.
+applied = {}
+
+
+def LoadConfig(pathname):
+  """Read and check a printer config.
+
+  Args:
+    pathname: string, path of a .json, .yaml or .yml file.
+  Returns:
+    dictionary, the config.
+  Raises:
+    ValueError: if the file can not be parsed, or the config is not valid.
+  """
+  with open(pathname) as f:
+    text = f.read()
+  if pathname.endswith(('.yaml', '.yml')):
+    if yaml is None:
+      raise ValueError('%s: install PyYAML to read yaml configs.' % pathname)
+    config = yaml.safe_load(text)
+  else:
+    config = json.loads(text)
+  errors = ValidateConfig(config)
+  if errors:
+    raise ValueError('%s: %s' % (pathname, '; '.join(errors)))
+  return config
+
+
+def _SameType(default, value):
+  if isinstance(default, bool):
+    return isinstance(value, bool)
+  if isinstance(default, (int, long, float)):
+    return (isinstance(value, (int, long, float)) and
+            not isinstance(value, bool))
+  if isinstance(default, basestring):
+    return isinstance(value, basestring)
+  return isinstance(value, type(default))
+
+
+def ValidateConfig(config):
+  """Check a config against the sections and keys of Constants.
+
+  Args:
+    config: dictionary, a printer config.
+  Returns:
+    list of strings, one per error, empty if the config is valid.
+  """
+  if not isinstance(config, dict):
+    return ['config must be a dictionary of Constants sections']
+  errors = []
+  for section in sorted(config):
+    value = config[section]
+    if not section.isupper() or not hasattr(Constants, section):
+      errors.append('unknown section %s' % section)
+      continue
+    default = getattr(Constants, section)
+    if not isinstance(default, dict):
+      if not _SameType(default, value):
+        errors.append('%s must be a %s' % (section, type(default).__name__))
+      continue
+    if not isinstance(value, dict):
+      errors.append('%s must be a dictionary' % section)
+      continue
+    for key in sorted(value):
+      if key not in default:
+        errors.append('unknown key %s.%s' % (section, key))
+      elif not _SameType(default[key], value[key]):
+        errors.append('%s.%s must be a %s' % (section, key,
+                                              type(default[key]).__name__))
+  return errors
+
+
+def ApplyConfig(config):
+  """Set the values of a config in Constants.
+
+  Args:
+    config: dictionary, a config from LoadConfig().
+  """
+  for section, value in config.iteritems():
+    if isinstance(value, dict):
+      getattr(Constants, section).update(value)
+      applied.setdefault(section, set()).update(value)
+    else:
+      setattr(Constants, section, value)
+      applied[section] = True
+
+
+def Unconfigured(sections=('PRINTER', 'USER')):
+  """List the values that still hold the <placeholder> of _config.py.
+
+  Args:
+    sections: list of Constants sections to look at.
+  Returns:
+    list of strings, like PRINTER.IP.
+  """
+  missing = []
+  for section in sections:
+    for key, value in sorted(getattr(Constants, section).iteritems()):
+      if isinstance(value, basestring) and value.startswith('<'):
+        missing.append('%s.%s' % (section, key))
+  return missing
+
+
+def _Options(cap):
+  """Return the options of a CDD capability, a list or a dict with options."""
+  if isinstance(cap, dict):
+    cap = cap.get('option', [])
+  if not isinstance(cap, list):
+    return []
+  return [o for o in cap if isinstance(o, dict)]
+
+
+def CapsFromCDD(cdd):
+  """Derive the CAPS flags the printer CDD describes.
+
+  LAYOUT_ISSUE, LOCAL_PRINT and TRAY_SENSOR are not in a CDD, so they are not
+  derived.
+
+  Args:
+    cdd: dictionary, parsed CDD (see _cddparse.ParseCDD).
+  Returns:
+    dictionary of CAPS flag to boolean.
+  """
+  caps = cdd.get('caps', {})
+  color = [o.get('type') for o in _Options(caps.get('color'))]
+  duplex = [o.get('type') for o in _Options(caps.get('duplex'))]
+  markers = [o.get('type') for o in _Options(caps.get('marker'))]
+  return {
+      'COLLATE': 'collate' in caps,
+      'COLOR': 'STANDARD_COLOR' in color or 'CUSTOM_COLOR' in color,
+      'COPIES': 'copies' in caps,
+      'COVER': bool(_Options(caps.get('cover'))),
+      'DUPLEX': 'LONG_EDGE' in duplex or 'SHORT_EDGE' in duplex,
+      'TONER': 'TONER' in markers or 'INK' in markers,
+      }
+
+
+def ApplyCDDCaps(cdd):
+  """Set the CAPS flags derived from a CDD, except those set by a config.
+
+  Args:
+    cdd: dictionary, parsed CDD (see _cddparse.ParseCDD).
+  Returns:
+    dictionary of the CAPS flags that were set.
+  """
+  derived = CapsFromCDD(cdd)
+  keep = applied.get('CAPS', set())
+  changed = dict([(k, v) for k, v in derived.iteritems() if k not in keep])
+  Constants.CAPS.update(changed)
+  return changed
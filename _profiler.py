@@ -0,0 +1,147 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Time every WebDriver command sent by the Logo Cert tool.
+
+Every WebDriver command, including commands sent by web elements and by the
+implicit waits, goes through the execute() method of the webdriver object.
+The CommandProfiler wraps that method, and records the command type, locator,
+duration, the test that was running, and the page object method (for example
+CloudPrintMgr.SelectPrinter) that sent the command.
+"""
+
+import os
+import sys
+import time
+import unittest
+
+import _log
+
+# Modules that contain the page objects we want to attribute commands to.
+PAGE_MODULES = ('_chrome.py', '_cloudprintmgr.py', '_device.py', '_gdocs.py',
+                '_sessionpool.py', '_sheets.py')
+
+# Test fixtures that send commands outside of a test method.
+FIXTURES = ('setUpModule', 'tearDownModule', 'setUpClass', 'tearDownClass',
+            'setUp', 'tearDown')
+
+
+class CommandProfiler(object):
+  """Record and summarize WebDriver commands."""
+
+  def __init__(self):
+    self.logger = _log.GetLogger('LogoCert')
+    # Each record is a tuple of (command, locator, seconds, test, method).
+    self.records = []
+
+  def Instrument(self, driver):
+    """Wrap the execute method of a webdriver object.
+
+    Args:
+      driver: webdriver object.
+    """
+    execute = driver.execute
+
+    def ProfiledExecute(driver_command, params=None):
+      start = time.time()
+      try:
+        return execute(driver_command, params)
+      finally:
+        self.Record(driver_command, params, time.time() - start)
+
+    driver.execute = ProfiledExecute
+
+  def Record(self, command, params, seconds):
+    """Record a WebDriver command.
+
+    Args:
+      command: string, WebDriver command name.
+      params: dictionary, parameters of the command.
+      seconds: float, time the command took.
+    """
+    locator = None
+    if params and 'using' in params:
+      locator = '%s=%s' % (params['using'], params.get('value'))
+    test, method = self._Caller()
+    self.records.append((command, locator, seconds, test, method))
+
+  def _Caller(self):
+    """Find the running test and the innermost page object method.
+
+    Returns:
+      tuple of strings, (test, method).
+    """
+    test = None
+    fixture = None
+    method = None
+    frame = sys._getframe(2)  # pylint: disable=protected-access
+    while frame:
+      code = frame.f_code
+      obj = frame.f_locals.get('self') or frame.f_locals.get('cls')
+      if not method and os.path.basename(code.co_filename) in PAGE_MODULES:
+        if obj is not None:
+          method = '%s.%s' % (_ClassName(obj), code.co_name)
+        else:
+          method = code.co_name
+      if code.co_name.startswith('test') and isinstance(obj,
+                                                        unittest.TestCase):
+        test = '%s.%s' % (_ClassName(obj), code.co_name)
+        break
+      if not fixture and code.co_name in FIXTURES:
+        if obj is not None:
+          fixture = '%s.%s' % (_ClassName(obj), code.co_name)
+        else:
+          fixture = code.co_name
+      frame = frame.f_back
+    return (test or fixture or 'unknown', method or 'unknown')
+
+  def Summary(self, key):
+    """Summarize the number of commands and time spent, grouped by key.
+
+    Args:
+      key: string, one of 'command', 'locator', 'test', 'method'.
+    Returns:
+      list of tuples (name, commands, seconds), sorted by most time spent.
+    """
+    index = {'command': 0, 'locator': 1, 'test': 3, 'method': 4}[key]
+    totals = {}
+    for record in self.records:
+      name = record[index]
+      if name not in totals:
+        totals[name] = [0, 0.0]
+      totals[name][0] += 1
+      totals[name][1] += record[2]
+    summary = [(k, v[0], v[1]) for k, v in totals.iteritems()]
+    summary.sort(key=lambda x: x[2], reverse=True)
+    return summary
+
+  def LogReport(self, top=25):
+    """Log the time spent per test, per page object method and per command.
+
+    Args:
+      top: integer, number of lines to log for each section.
+    """
+    total = sum([r[2] for r in self.records])
+    self.logger.info('WebDriver commands: %d, %.1fs', len(self.records), total)
+    for key in ['test', 'method', 'command']:
+      self.logger.info('WebDriver commands by %s:', key)
+      for name, commands, seconds in self.Summary(key)[:top]:
+        self.logger.info('%s: %d commands, %.1fs', name, commands, seconds)
+
+
+def _ClassName(obj):
+  if isinstance(obj, type):
+    return obj.__name__
+  return obj.__class__.__name__
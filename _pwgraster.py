@@ -0,0 +1,504 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Write PWG raster (PWG 5102.4) documents.
+
+A PWG raster document is the sync word RaS2, then for every page a 1796
+byte header and the compressed lines of the page. Each line is a repeat
+count byte (how many more times the line repeats), then runs of pixels:
+a byte n < 128 repeats the next pixel n + 1 times, n > 128 is followed by
+257 - n literal pixels, and 128 fills the rest of the line with white.
+
+PwgWriter writes pages of 8 bit gray (SGRAY_8) or 24 bit color (SRGB_8)
+pixels. Convert() renders a test document into PWG raster with Ghostscript
+(for pdf) or PIL (for images) when they are installed; neither is needed to
+use the rest of the tool.
+
+ReadPages() parses a PWG raster stream page by page, decoding the lines
+only to count them, so documents of any size are checked in fixed memory.
+Validate() checks every page header against the pwg_raster_config of a
+printer CDD, and reports the pages with their sizes.
+"""
+
+import distutils.spawn
+import os
+import struct
+import subprocess
+
+try:
+  from PIL import Image
+except ImportError:
+  Image = None
+
+SYNC = 'RaS2'
+HEADER_SIZE = 1796
+
+# Document types of pwg_raster_config, with their color space (sGray or
+# sRGB) and bytes per pixel.
+TYPES = {
+    'SGRAY_8': (18, 1),
+    'SRGB_8': (19, 3),
+    }
+
+# Document types of pwg_raster_config by (color space, bits per color).
+DOC_TYPES = {
+    (3, 1): 'BLACK_1',
+    (3, 8): 'BLACK_8',
+    (3, 16): 'BLACK_16',
+    (6, 8): 'CMYK_8',
+    (6, 16): 'CMYK_16',
+    (18, 8): 'SGRAY_8',
+    (18, 16): 'SGRAY_16',
+    (19, 8): 'SRGB_8',
+    (19, 16): 'SRGB_16',
+    (20, 8): 'ADOBE_RGB_8',
+    (20, 16): 'ADOBE_RGB_16',
+    }
+
+# Size of the buffer ReadPages reads the stream with.
+CHUNK = 65536
+
+# Offsets of the header fields the writer sets and the reader checks.
+_FIELDS = [
+    # (offset, struct format, key)
+    (0, '64s', 'sync_name'),
+    (272, '>I', 'duplex'),
+    (276, '>II', 'resolution'),
+    (340, '>I', 'copies'),
+    (352, '>II', 'page_size'),
+    (368, '>I', 'tumble'),
+    (372, '>I', 'width'),
+    (376, '>I', 'height'),
+    (384, '>I', 'bits_per_color'),
+    (388, '>I', 'bits_per_pixel'),
+    (392, '>I', 'bytes_per_line'),
+    (396, '>I', 'color_order'),
+    (400, '>I', 'color_space'),
+    (420, '>I', 'num_colors'),
+    (452, '>I', 'total_page_count'),
+    (456, '>i', 'cross_feed_transform'),
+    (460, '>i', 'feed_transform'),
+    (472, '>I', 'image_box_right'),
+    (476, '>I', 'image_box_bottom'),
+    (1732, '64s', 'page_size_name'),
+    ]
+
+
+def PackHeader(fields):
+  """Build a page header.
+
+  Args:
+    fields: dictionary of header keys (see _FIELDS) to values.
+  Returns:
+    string, the HEADER_SIZE bytes of the header.
+  """
+  header = bytearray(HEADER_SIZE)
+  for offset, fmt, key in _FIELDS:
+    if key not in fields:
+      continue
+    value = fields[key]
+    if not isinstance(value, tuple):
+      value = (value,)
+    packed = struct.pack(fmt, *value)
+    header[offset:offset + len(packed)] = packed
+  return str(header)
+
+
+def UnpackHeader(header):
+  """Read the fields of a page header.
+
+  Args:
+    header: string, the HEADER_SIZE bytes of a page header.
+  Returns:
+    dictionary of header keys (see _FIELDS) to values.
+  """
+  fields = {}
+  for offset, fmt, key in _FIELDS:
+    value = struct.unpack_from(fmt, header, offset)
+    if fmt.endswith('s'):
+      fields[key] = value[0].split('\x00', 1)[0]
+    else:
+      fields[key] = value if len(value) > 1 else value[0]
+  return fields
+
+
+def _EncodeLine(line, bpp):
+  """Compress the pixels of one line."""
+  out = []
+  pixels = [line[i:i + bpp] for i in range(0, len(line), bpp)]
+  i = 0
+  n = len(pixels)
+  while i < n:
+    run = 1
+    while i + run < n and run < 128 and pixels[i + run] == pixels[i]:
+      run += 1
+    if run > 1:
+      out.append(chr(run - 1) + pixels[i])
+      i += run
+      continue
+    start = i
+    while (i < n and i - start < 128 and
+           (i + 1 >= n or pixels[i + 1] != pixels[i])):
+      i += 1
+    if i - start == 1:
+      out.append(chr(0) + pixels[start])
+    else:
+      out.append(chr(257 - (i - start)) + ''.join(pixels[start:i]))
+  return ''.join(out)
+
+
+def EncodeLines(lines, bpp):
+  """Compress the lines of a page.
+
+  Args:
+    lines: iterable of strings, the pixels of each line.
+    bpp: integer, bytes per pixel.
+  Yields:
+    strings, the compressed lines, identical lines counted once.
+  """
+  last = None
+  repeat = 0
+  for line in lines:
+    if line == last and repeat < 255:
+      repeat += 1
+      continue
+    if last is not None:
+      yield chr(repeat) + _EncodeLine(last, bpp)
+    last = line
+    repeat = 0
+  if last is not None:
+    yield chr(repeat) + _EncodeLine(last, bpp)
+
+
+class PwgWriter(object):
+  """Write pages to a PWG raster stream."""
+
+  def __init__(self, f, dpi=300, doc_type='SGRAY_8', duplex=False,
+               tumble=False):
+    """Start a document.
+
+    Args:
+      f: file-like object to write to.
+      dpi: integer, resolution of the pages.
+      doc_type: string, SGRAY_8 or SRGB_8.
+      duplex: boolean, True = two-sided.
+      tumble: boolean, True = flip on the short edge.
+    """
+    if doc_type not in TYPES:
+      raise ValueError('Unsupported PWG document type: %s' % doc_type)
+    self.f = f
+    self.dpi = dpi
+    self.doc_type = doc_type
+    self.duplex = duplex
+    self.tumble = tumble
+    self.pages = 0
+    self.f.write(SYNC)
+
+  def WritePage(self, width, height, lines, page_size_name=''):
+    """Write one page.
+
+    Args:
+      width: integer, pixels per line.
+      height: integer, number of lines.
+      lines: iterable of height strings with the pixels of each line.
+      page_size_name: string, PWG media name, like na_letter_8.5x11in.
+    """
+    color_space, bpp = TYPES[self.doc_type]
+    self.f.write(PackHeader({
+        'sync_name': 'PwgRaster',
+        'duplex': int(self.duplex),
+        'resolution': (self.dpi, self.dpi),
+        'copies': 1,
+        'page_size': (width * 72 // self.dpi, height * 72 // self.dpi),
+        'tumble': int(self.tumble),
+        'width': width,
+        'height': height,
+        'bits_per_color': 8,
+        'bits_per_pixel': bpp * 8,
+        'bytes_per_line': width * bpp,
+        'color_order': 0,
+        'color_space': color_space,
+        'num_colors': bpp,
+        'cross_feed_transform': 1,
+        'feed_transform': 1,
+        'image_box_right': width,
+        'image_box_bottom': height,
+        'page_size_name': page_size_name,
+        }))
+    for data in EncodeLines(lines, bpp):
+      self.f.write(data)
+    self.pages += 1
+
+
+class _Stream(object):
+  """Read a file-like object in chunks, counting the bytes read."""
+
+  def __init__(self, f):
+    self.f = f
+    self.buf = ''
+    self.pos = 0
+    self.offset = 0
+
+  def Read(self, n):
+    """Return the next n bytes, or fewer at the end of the stream."""
+    if self.pos + n > len(self.buf):
+      self.buf = self.buf[self.pos:] + self.f.read(max(n, CHUNK))
+      self.pos = 0
+    data = self.buf[self.pos:self.pos + n]
+    self.pos += len(data)
+    self.offset += len(data)
+    return data
+
+  def Byte(self):
+    """Return the next byte as an integer, or None at the end."""
+    if self.pos >= len(self.buf):
+      self.buf = self.f.read(CHUNK)
+      self.pos = 0
+      if not self.buf:
+        return None
+    self.pos += 1
+    self.offset += 1
+    return ord(self.buf[self.pos - 1])
+
+  def Skip(self, n):
+    """Skip n bytes, returning False if the stream ended first."""
+    return len(self.Read(n)) == n
+
+
+def _SkipLines(stream, fields):
+  """Decode the compressed lines of a page without keeping them.
+
+  Returns:
+    string, what is wrong with the lines, or None.
+  """
+  bytes_per_line = fields['bytes_per_line']
+  unit = max(1, fields['bits_per_pixel'] // 8)
+  lines = 0
+  while lines < fields['height']:
+    repeat = stream.Byte()
+    if repeat is None:
+      return 'data ends at line %d of %d' % (lines, fields['height'])
+    filled = 0
+    while filled < bytes_per_line:
+      n = stream.Byte()
+      if n is None:
+        return 'data ends in line %d' % lines
+      if n == 128:
+        filled = bytes_per_line
+        break
+      count = n + 1 if n < 128 else 257 - n
+      if not stream.Skip(unit if n < 128 else count * unit):
+        return 'data ends in line %d' % lines
+      filled += count * unit
+    if filled > bytes_per_line:
+      return 'line %d has %d bytes, not %d' % (lines, filled, bytes_per_line)
+    lines += repeat + 1
+  if lines > fields['height']:
+    return 'line repeats run %d lines past the page' % (
+        lines - fields['height'])
+  return None
+
+
+def ReadPages(f):
+  """Parse a PWG raster stream one page at a time.
+
+  Args:
+    f: file-like object positioned at the sync word.
+  Yields:
+    dictionaries with the header fields of each page (see _FIELDS), its
+    number, doc_type, bytes (header and compressed lines), raster_bytes
+    (uncompressed) and error (None, or what is wrong with the page). The
+    stream is not read further after a page with an error.
+  Raises:
+    ValueError: if the stream does not start with the sync word.
+  """
+  stream = _Stream(f)
+  sync = stream.Read(len(SYNC))
+  if sync != SYNC:
+    raise ValueError('Not a PWG raster stream, sync word is %r' % sync)
+  number = 0
+  while True:
+    start = stream.offset
+    header = stream.Read(HEADER_SIZE)
+    if not header:
+      return
+    number += 1
+    if len(header) < HEADER_SIZE:
+      yield {'number': number, 'bytes': len(header),
+             'error': 'header is %d bytes, not %d' % (len(header),
+                                                      HEADER_SIZE)}
+      return
+    page = UnpackHeader(header)
+    page['number'] = number
+    page['doc_type'] = DOC_TYPES.get((page['color_space'],
+                                      page['bits_per_color']))
+    page['raster_bytes'] = page['bytes_per_line'] * page['height']
+    page['error'] = None
+    if page['sync_name'] != 'PwgRaster':
+      page['error'] = 'header name is %r' % page['sync_name']
+    elif page['bytes_per_line'] != (page['width'] * page['bits_per_pixel'] +
+                                    7) // 8:
+      page['error'] = '%d bytes per line for %d pixels of %d bits' % (
+          page['bytes_per_line'], page['width'], page['bits_per_pixel'])
+    else:
+      page['error'] = _SkipLines(stream, page)
+    page['bytes'] = stream.offset - start
+    yield page
+    if page['error']:
+      return
+
+
+def _Supported(config):
+  resolutions = set([(r.get('cross_feed_dir'), r.get('feed_dir')) for r in
+                     config.get('document_resolution_supported', [])])
+  return resolutions, set(config.get('document_type_supported', []))
+
+
+def Validate(f, cdd=None):
+  """Check a PWG raster stream against the pwg_raster_config of a printer.
+
+  Args:
+    f: file-like object positioned at the sync word.
+    cdd: dictionary, parsed CDD (see _cddparse.ParseCDD), None = only
+         check that the stream is well formed.
+  Returns:
+    dictionary with keys pages (list of page dictionaries from ReadPages,
+    with a problems list added to each), bytes (size of the stream read) and
+    problems (list of strings, empty if the stream is valid).
+  """
+  config = (cdd or {}).get('caps', {}).get('pwg_raster_config')
+  resolutions, types = _Supported(config or {})
+  report = {'pages': [], 'bytes': len(SYNC), 'problems': []}
+  try:
+    for page in ReadPages(f):
+      problems = []
+      if page['error']:
+        problems.append(page['error'])
+      elif config is not None:
+        if resolutions and page['resolution'] not in resolutions:
+          problems.append('resolution %dx%d is not supported' %
+                          page['resolution'])
+        if types and page['doc_type'] not in types:
+          problems.append('document type %s is not supported' %
+                          (page['doc_type'] or 'color space %d, %d bits' % (
+                              page['color_space'], page['bits_per_color'])))
+      page['problems'] = problems
+      report['pages'].append(page)
+      report['bytes'] += page['bytes']
+      report['problems'].extend(['page %d: %s' % (page['number'], problem)
+                                 for problem in problems])
+  except ValueError as e:
+    report['problems'].append(str(e))
+  if not report['pages'] and not report['problems']:
+    report['problems'].append('stream has no pages')
+  return report
+
+
+def FormatReport(report):
+  """Format a Validate report as text, one line per page."""
+  lines = ['%d pages, %d bytes' % (len(report['pages']), report['bytes'])]
+  for page in report['pages']:
+    if 'width' not in page:
+      continue
+    lines.append('page %d: %dx%d at %dx%d dpi, %s, %d bytes (%d raw)' % (
+        page['number'], page['width'], page['height'],
+        page['resolution'][0], page['resolution'][1],
+        page['doc_type'] or 'color space %d' % page['color_space'],
+        page['bytes'], page['raster_bytes']))
+  lines.extend(report['problems'])
+  return '\n'.join(lines)
+
+
+def _Lines(image):
+  width = image.size[0]
+  data = image.tobytes() if hasattr(image, 'tobytes') else image.tostring()
+  step = width * len(image.getbands())
+  for i in range(0, len(data), step):
+    yield data[i:i + step]
+
+
+def _ConvertImage(pathname, out, dpi, doc_type, page):
+  """Render an image centered on a page, scaled down to fit."""
+  if Image is None:
+    raise ValueError('Install PIL to render images into PWG raster.')
+  width = page[0] * dpi // 25400
+  height = page[1] * dpi // 25400
+  mode = 'RGB' if doc_type == 'SRGB_8' else 'L'
+  source = Image.open(pathname)
+  writer = PwgWriter(out, dpi=dpi, doc_type=doc_type)
+  frame = 0
+  while True:
+    image = source.convert(mode)
+    image.thumbnail((width, height))
+    sheet = Image.new(mode, (width, height), 'white')
+    sheet.paste(image, ((width - image.size[0]) // 2,
+                        (height - image.size[1]) // 2))
+    writer.WritePage(width, height, _Lines(sheet))
+    frame += 1
+    try:
+      source.seek(frame)
+    except EOFError:
+      break
+  return writer.pages
+
+
+def _ConvertPdf(pathname, out, dpi, doc_type, page):
+  """Render a pdf with the Ghostscript pwgraster device."""
+  gs = distutils.spawn.find_executable('gs')
+  if not gs:
+    raise ValueError('Install Ghostscript to render pdf into PWG raster.')
+  command = [gs, '-q', '-dBATCH', '-dNOPAUSE', '-dSAFER',
+             '-sDEVICE=pwgraster', '-r%d' % dpi,
+             '-dDEVICEWIDTHPOINTS=%d' % (page[0] * 72 // 25400),
+             '-dDEVICEHEIGHTPOINTS=%d' % (page[1] * 72 // 25400),
+             '-dFIXEDMEDIA', '-dPDFFitPage',
+             '-dcupsColorSpace=%d' % TYPES[doc_type][0],
+             '-dcupsBitsPerColor=8', '-sOutputFile=-', pathname]
+  process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE)
+  data, error = process.communicate()
+  if process.returncode:
+    raise ValueError('Ghostscript failed on %s: %s' % (pathname, error))
+  out.write(data)
+  return None
+
+
+def Convert(pathname, out, dpi=300, doc_type='SGRAY_8',
+            page=(215900, 279400)):
+  """Render a document into PWG raster.
+
+  Args:
+    pathname: string, path of a pdf or image file.
+    out: file-like object to write the PWG raster to.
+    dpi: integer, resolution.
+    doc_type: string, SGRAY_8 or SRGB_8.
+    page: tuple of (width, height) of the media in microns, default letter.
+  Returns:
+    integer, number of pages written, or None if not known.
+  Raises:
+    ValueError: if the document can not be rendered.
+  """
+  with open(pathname, 'rb') as f:
+    pdf = f.read(4) == '%PDF'
+  if pdf:
+    return _ConvertPdf(pathname, out, dpi, doc_type, page)
+  return _ConvertImage(pathname, out, dpi, doc_type, page)
+
+
+def CanConvert(pathname):
+  """Return True if a converter for the type of a document is installed."""
+  if os.path.splitext(pathname)[1].lower() == '.pdf':
+    return bool(distutils.spawn.find_executable('gs'))
+  return Image is not None
@@ -0,0 +1,276 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+A disk cache of the test images rendered into PWG raster.
+
+The resolutions and document types a printer accepts are read from the
+pwg_raster_config of its CDD, and every image is rendered (see
+_pwgraster.Convert) once for each of them, in a pool of processes. Each
+rendition is saved as <sha1 of image and settings>.pwg in the cache
+directory, so an image is rendered again only when its content or the
+settings change, and tests that print raster read it from disk.
+"""
+
+import glob
+import hashlib
+import multiprocessing
+import os
+
+from _config import Constants
+import _pwgraster
+
+# Default media when the CDD has none: letter, in microns.
+LETTER = (215900, 279400)
+
+
+class Setting(object):
+  """The raster settings of one rendition."""
+
+  def __init__(self, dpi, doc_type, media=LETTER):
+    self.dpi = dpi
+    self.doc_type = doc_type
+    self.media = tuple(media)
+
+  def Key(self):
+    return '%d/%s/%dx%d' % ((self.dpi, self.doc_type) + self.media)
+
+  def __eq__(self, other):
+    return isinstance(other, Setting) and self.Key() == other.Key()
+
+  def __hash__(self):
+    return hash(self.Key())
+
+  def __repr__(self):
+    return 'Setting(%s)' % self.Key()
+
+
+def _DefaultMedia(caps):
+  media = caps.get('media_size', {})
+  options = media.get('option', []) if isinstance(media, dict) else media
+  for option in options:
+    if option.get('is_default') and 'width_microns' in option:
+      return option['width_microns'], option['height_microns']
+  return LETTER
+
+
+def Settings(cdd):
+  """Return the raster settings a printer accepts.
+
+  Args:
+    cdd: dictionary, parsed CDD (see _cddparse.ParseCDD).
+  Returns:
+    list of Setting objects, for every resolution and document type of the
+    pwg_raster_config that the writer supports.
+  """
+  caps = cdd.get('caps', {})
+  config = caps.get('pwg_raster_config', {})
+  dpis = sorted(set([r.get('cross_feed_dir') for r in
+                     config.get('document_resolution_supported', [])
+                     if r.get('cross_feed_dir') == r.get('feed_dir')]))
+  if not dpis:
+    dpis = sorted(set([o['horizontal_dpi'] for o in
+                       caps.get('dpi', {}).get('option', [])
+                       if o.get('horizontal_dpi') == o.get('vertical_dpi')]))
+  types = [t for t in config.get('document_type_supported', ['SGRAY_8'])
+           if t in _pwgraster.TYPES]
+  media = _DefaultMedia(caps)
+  return [Setting(dpi, t, media) for dpi in dpis or [300]
+          for t in types or ['SGRAY_8']]
+
+
+def AcceptsRaster(cdd):
+  """Return True if the printer of a CDD takes PWG raster documents."""
+  types = cdd.get('caps', {}).get('supported_content_type', [])
+  return 'image/pwg-raster' in [t.get('content_type') for t in types]
+
+
+def Pick(cdd, color=None):
+  """Return the raster setting to print with.
+
+  Args:
+    cdd: dictionary, parsed CDD (see _cddparse.ParseCDD).
+    color: string, "Color" or "Monochrome", None = color if supported.
+  Returns:
+    Setting object, the lowest resolution of the document type for color.
+  """
+  settings = Settings(cdd)
+  doc_type = 'SGRAY_8' if color == 'Monochrome' else 'SRGB_8'
+  for setting in settings:
+    if setting.doc_type == doc_type:
+      return setting
+  return settings[0]
+
+
+def _Render(job):
+  """Render one image with one setting, in a worker process.
+
+  Args:
+    job: tuple of (image key, pathname, setting, cache pathname).
+  Returns:
+    tuple of (image key, setting, cache pathname or None, error or None).
+  """
+  image, pathname, setting, cached = job
+  if os.path.isfile(cached):
+    return image, setting, cached, None
+  partial = '%s.%d' % (cached, os.getpid())
+  try:
+    with open(partial, 'wb') as f:
+      _pwgraster.Convert(pathname, f, dpi=setting.dpi,
+                         doc_type=setting.doc_type, page=setting.media)
+    os.rename(partial, cached)
+  except (IOError, OSError, ValueError) as e:
+    if os.path.exists(partial):
+      os.remove(partial)
+    return image, setting, None, str(e)
+  return image, setting, cached, None
+
+
+class RenditionCache(object):
+  """Render test images into PWG raster, and find the saved renditions."""
+
+  def __init__(self, cache_dir=None, manifest=None):
+    """Open a cache directory.
+
+    Args:
+      cache_dir: string, directory of the renditions, default is
+                 Constants.RENDITIONS.
+      manifest: dictionary, image manifest (see _manifest.py) to take the
+                image hashes from, None = hash the images.
+    """
+    self.cache_dir = cache_dir or Constants.RENDITIONS
+    self.manifest = manifest
+    self.pool = None
+    self.pending = None
+    self.errors = {}
+    if not os.path.isdir(self.cache_dir):
+      os.makedirs(self.cache_dir)
+
+  def _ImageHash(self, pathname):
+    name = os.path.basename(pathname)
+    if self.manifest and name in self.manifest['files']:
+      return self.manifest['files'][name]['sha1']
+    with open(pathname, 'rb') as f:
+      return hashlib.sha1(f.read()).hexdigest()
+
+  def Path(self, image, setting):
+    """Return the cache pathname of the rendition of an image.
+
+    Args:
+      image: string, key of the image in Constants.IMAGES.
+      setting: Setting object.
+    Returns:
+      string, pathname of the rendition, which may not exist yet.
+    """
+    return self._Path(Constants.IMAGES[image], setting)
+
+  def _Path(self, pathname, setting):
+    key = hashlib.sha1('%s %s' % (self._ImageHash(pathname),
+                                  setting.Key())).hexdigest()
+    return os.path.join(self.cache_dir, '%s.pwg' % key)
+
+  def Start(self, images, settings, processes=None):
+    """Render the missing renditions in the background.
+
+    Args:
+      images: list of Constants.IMAGES keys.
+      settings: list of Setting objects.
+      processes: integer, number of worker processes, default is one per CPU.
+    """
+    jobs = []
+    for image in images:
+      pathname = Constants.IMAGES[image]
+      if not os.path.isfile(pathname) or not _pwgraster.CanConvert(pathname):
+        continue
+      for setting in settings:
+        cached = self.Path(image, setting)
+        if not os.path.isfile(cached):
+          jobs.append((image, pathname, setting, cached))
+    if not jobs:
+      return
+    self.pool = multiprocessing.Pool(processes)
+    self.pending = self.pool.map_async(_Render, jobs)
+    self.pool.close()
+
+  def Wait(self, timeout=None):
+    """Wait for the background renditions to finish.
+
+    Args:
+      timeout: integer, most seconds to wait, None = no limit.
+    Returns:
+      dictionary of (image, Setting) to error, for renditions that failed.
+    """
+    if self.pending is not None:
+      self.pending.wait(timeout)
+      if self.pending.ready():
+        for image, setting, unused_cached, error in self.pending.get():
+          if error:
+            self.errors[(image, setting)] = error
+        self.pool.join()
+        self.pool = None
+        self.pending = None
+    return self.errors
+
+  def Build(self, images, settings, processes=None):
+    """Render all missing renditions, and wait for them.
+
+    Args:
+      images: list of Constants.IMAGES keys.
+      settings: list of Setting objects.
+      processes: integer, number of worker processes, default is one per CPU.
+    Returns:
+      dictionary of (image, Setting) to error, for renditions that failed.
+    """
+    self.Start(images, settings, processes)
+    return self.Wait()
+
+  def Get(self, image, setting):
+    """Return the pathname of a rendition, if it has been rendered.
+
+    Args:
+      image: string, key of the image in Constants.IMAGES.
+      setting: Setting object.
+    Returns:
+      string, pathname of the rendition, or None.
+    """
+    pathname = self.Path(image, setting)
+    if os.path.isfile(pathname):
+      return pathname
+    return None
+
+  def Find(self, pathname, setting):
+    """Return the pathname of the rendition of a file, if it was rendered.
+
+    Args:
+      pathname: string, pathname of a test image.
+      setting: Setting object.
+    Returns:
+      string, pathname of the rendition, or None.
+    """
+    if not os.path.isfile(pathname):
+      return None
+    rendition = self._Path(pathname, setting)
+    if os.path.isfile(rendition):
+      return rendition
+    return None
+
+  def Close(self):
+    """Stop the background renditions, and remove the unfinished ones."""
+    if self.pool is not None:
+      self.pool.terminate()
+      self.pool.join()
+      self.pool = None
+      self.pending = None
+    for partial in glob.glob(os.path.join(self.cache_dir, '*.pwg.*')):
+      os.remove(partial)
@@ -0,0 +1,151 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Keep the results of a test run in a json file.
+
+Every result logged with LogoCert.LogTest is added to a ResultStore. The
+store is written to disk after each result, so the results survive a crash,
+and the results of several runs (for example one per printer of a fleet run)
+can be merged into one report.
+"""
+
+import threading
+import time
+
+from _common import ReadJsonFile
+from _common import WriteJsonFile
+
+# Test results, in the order they are shown in reports.
+RESULTS = ['Passed', 'Failed', 'Blocked', 'Skipped', 'Not Run']
+
+
+class ResultStore(object):
+  """Hold the results of one test run."""
+
+  def __init__(self, pathname=None, device=None):
+    """Start an empty store.
+
+    Args:
+      pathname: string, json file to write the results to, None = memory only.
+      device: string, name of the device under test.
+    """
+    self.pathname = pathname
+    self.device = device
+    self.results = []
+    self.lock = threading.Lock()
+
+  def Add(self, test_id, test_name, result, notes=None, suite=None):
+    """Add a test result, and save the store.
+
+    Args:
+      test_id: string, test id in the TestTracker application.
+      test_name: string, name of the test.
+      result: string, one of RESULTS.
+      notes: string, notes to include with the test result.
+      suite: string, name of the test suite.
+    """
+    with self.lock:
+      self.results.append({
+          'test_id': test_id,
+          'test_name': test_name,
+          'result': result,
+          'notes': notes or '',
+          'suite': suite,
+          'time': time.time(),
+          })
+    self.Save()
+
+  def Save(self):
+    """Write the store to its json file.
+
+    Returns:
+      boolean: True = saved (or nothing to save to), False = errors.
+    """
+    if not self.pathname:
+      return True
+    with self.lock:
+      data = {'device': self.device, 'results': list(self.results)}
+    return WriteJsonFile(self.pathname, data)
+
+  def Load(self):
+    """Read the results saved in the json file of the store.
+
+    Returns:
+      boolean: True = results read, False = no saved results.
+    """
+    data = ReadJsonFile(self.pathname) if self.pathname else None
+    if not isinstance(data, dict):
+      return False
+    with self.lock:
+      self.device = data.get('device', self.device)
+      self.results = data.get('results', [])
+    return True
+
+  def Counts(self):
+    """Count the results of each kind.
+
+    Returns:
+      dictionary of result to number of tests.
+    """
+    counts = dict([(r, 0) for r in RESULTS])
+    with self.lock:
+      for r in self.results:
+        counts[r['result']] = counts.get(r['result'], 0) + 1
+    return counts
+
+
+def MergeStores(stores):
+  """Merge the results of several runs into one report.
+
+  Args:
+    stores: list of ResultStore objects, one per device.
+  Returns:
+    dictionary with keys devices (device name to its counts and results) and
+    totals (result to number of tests over all devices).
+  """
+  report = {'devices': {}, 'totals': dict([(r, 0) for r in RESULTS])}
+  for store in stores:
+    counts = store.Counts()
+    report['devices'][store.device] = {'counts': counts,
+                                       'results': store.results}
+    for k, v in counts.iteritems():
+      report['totals'][k] = report['totals'].get(k, 0) + v
+  return report
+
+
+def FormatReport(report):
+  """Format a merged report as a table with one row per device.
+
+  Args:
+    report: dictionary returned by MergeStores().
+  Returns:
+    string, the table, followed by the failed and blocked tests of each device.
+  """
+  rows = [['Device'] + RESULTS]
+  for device in sorted(report['devices']):
+    counts = report['devices'][device]['counts']
+    rows.append([device] + ['%d' % counts.get(r, 0) for r in RESULTS])
+  rows.append(['Total'] + ['%d' % report['totals'].get(r, 0)
+                           for r in RESULTS])
+  width = [max([len(row[i]) for row in rows]) for i in range(len(rows[0]))]
+  lines = ['  '.join([cell.ljust(width[i])
+                      for i, cell in enumerate(row)]).rstrip()
+           for row in rows]
+  for device in sorted(report['devices']):
+    for r in report['devices'][device]['results']:
+      if r['result'] in ('Failed', 'Blocked'):
+        lines.append('%s: %s %s: %s' % (device, r['result'], r['test_name'],
+                                        r['notes']))
+  return '\n'.join(lines)
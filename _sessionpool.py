@@ -0,0 +1,246 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+A pool of warm Chrome sessions for the Logo Cert tool.
+
+Some tests need a second Chrome session, signed in as another user, as a guest,
+or not signed in at all. Starting Chrome and signing in takes a long time, so
+the pool keeps these sessions open. Tests lease a session for a profile, and
+return it when they are finished. Returned sessions are reset and kept for the
+next test that needs the same profile.
+"""
+
+import threading
+
+import _chrome
+import _chromedriver
+from _config import Constants
+import _log
+
+from selenium.common.exceptions import WebDriverException
+
+
+class Session(object):
+  """A Chrome session that belongs to one profile."""
+
+  def __init__(self, profile, chromedriver, chrome):
+    """Hold the objects of one Chrome session.
+
+    Args:
+      profile: string, name of the profile this session uses.
+      chromedriver: an initialized chromedriver object.
+      chrome: a Chrome page object using chromedriver.
+    """
+    self.profile = profile
+    self.cd = chromedriver
+    self.chrome = chrome
+
+
+class SessionPool(object):
+  """Lease and return Chrome sessions keyed by profile."""
+
+  def __init__(self, timeout, headless=False, chrome_logging=False,
+               profiler=None, instance=None):
+    """Set up the known profiles. No sessions are started yet.
+
+    Args:
+      timeout: integer, number of seconds to wait for web pages to load.
+      headless: boolean, True = start sessions in headless Chrome.
+      chrome_logging: boolean, True = enable verbose Chrome logging.
+      profiler: CommandProfiler object to record WebDriver commands with.
+      instance: string, added to the data directories, so that concurrent
+                runs (one per printer) do not share Chrome profiles.
+    """
+    self.logger = _log.GetLogger('LogoCert')
+    self.timeout = timeout
+    self.headless = headless
+    self.chrome_logging = chrome_logging
+    self.profiler = profiler
+    # The main Chrome session already uses the data directory of USER, and
+    # two Chrome instances can not share one data directory.
+    self.profiles = {
+        'USER': {
+            'data_dir': '%s_pool' % Constants.USER['EMAIL'].split('@')[0],
+            'email': Constants.USER['EMAIL'],
+            'pw': Constants.USER['PW'],
+            },
+        'USER2': {
+            'data_dir': Constants.USER2['EMAIL'].split('@')[0],
+            'email': Constants.USER2['EMAIL'],
+            'pw': Constants.USER2['PW'],
+            },
+        'guest': {
+            'data_dir': 'guest_user',
+            'email': None,
+            'pw': None,
+            },
+        'NotSignedIn': {
+            'data_dir': 'NotSignedIn',
+            'email': None,
+            'pw': None,
+            },
+        }
+    if instance:
+      for settings in self.profiles.itervalues():
+        settings['data_dir'] = '%s_%s' % (settings['data_dir'], instance)
+    self.idle = {}
+    self.starting = {}
+    for profile in self.profiles:
+      self.idle[profile] = []
+      self.starting[profile] = 0
+    self.leased = []
+    self.condition = threading.Condition()
+
+  def Warm(self, profiles):
+    """Start sessions in the background, so they are ready when leased.
+
+    Args:
+      profiles: list of profile names to start a session for.
+    Returns:
+      boolean: True = sessions are starting, False = unknown profile.
+    """
+    for profile in profiles:
+      if profile not in self.profiles:
+        self.logger.error('Unknown session profile: %s', profile)
+        return False
+    for profile in profiles:
+      with self.condition:
+        self.starting[profile] += 1
+      t = threading.Thread(target=self._WarmSession, args=(profile,))
+      t.daemon = True
+      t.start()
+    return True
+
+  def _WarmSession(self, profile):
+    """Start a session and add it to the idle sessions of profile."""
+    session = None
+    try:
+      session = self._StartSession(profile)
+    finally:
+      # Lease waits while sessions are starting, so always count this one out.
+      with self.condition:
+        self.starting[profile] -= 1
+        if session:
+          self.idle[profile].append(session)
+        self.condition.notify_all()
+
+  def _StartSession(self, profile):
+    """Start Chrome for profile, and sign in if the profile has a user.
+
+    Args:
+      profile: string, name of profile.
+    Returns:
+      Session object, or None if Chrome could not be started or signed in.
+    """
+    settings = self.profiles[profile]
+    self.logger.info('Starting Chrome session for profile %s', profile)
+    try:
+      cd = _chromedriver.ChromeDriver(settings['data_dir'], self.timeout,
+                                      headless=self.headless,
+                                      chrome_logging=self.chrome_logging,
+                                      profiler=self.profiler)
+    except (OSError, WebDriverException) as e:
+      self.logger.error('Error starting Chrome for %s\n%s', profile, e)
+      return None
+    chrome = _chrome.Chrome(cd)
+    if settings['email']:
+      if not chrome.SignIn(settings['email'], settings['pw']):
+        self.logger.error('Error signing in %s', settings['email'])
+        cd.CloseChrome()
+        return None
+    return Session(profile, cd, chrome)
+
+  def Lease(self, profile):
+    """Lease a session, starting a new one if none are idle.
+
+    Args:
+      profile: string, one of 'USER', 'USER2', 'guest', 'NotSignedIn'.
+    Returns:
+      Session object, or None if no session could be started.
+    """
+    if profile not in self.profiles:
+      self.logger.error('Unknown session profile: %s', profile)
+      return None
+    with self.condition:
+      # Wait for a session that is still warming up, instead of starting
+      # another Chrome for the same profile.
+      while not self.idle[profile] and self.starting[profile]:
+        self.condition.wait()
+      if self.idle[profile]:
+        session = self.idle[profile].pop()
+        self.leased.append(session)
+        return session
+    session = self._StartSession(profile)
+    if session:
+      with self.condition:
+        self.leased.append(session)
+    return session
+
+  def Release(self, session):
+    """Return a leased session to the pool.
+
+    Args:
+      session: Session object returned from Lease().
+    The session is reset, and closed if the reset fails.
+    """
+    with self.condition:
+      if session in self.leased:
+        self.leased.remove(session)
+    if self.Reset(session):
+      with self.condition:
+        self.idle[session.profile].append(session)
+        self.condition.notify_all()
+    else:
+      self.logger.warning('Closing %s session, reset failed.', session.profile)
+      self._Close(session)
+
+  def Reset(self, session):
+    """Close extra windows and dialogs, and leave a blank main window.
+
+    Args:
+      session: Session object.
+    Returns:
+      boolean: True = session reset, False = errors detected.
+    """
+    cd = session.cd
+    try:
+      for handle in cd.driver.window_handles:
+        if handle != cd.window['main']:
+          cd.driver.switch_to_window(handle)
+          cd.driver.close()
+      cd.driver.switch_to_window(cd.window['main'])
+      cd.driver.get('about:blank')
+    except WebDriverException as e:
+      self.logger.error('Error resetting Chrome session.\n%s', e)
+      return False
+    cd.window['logocert'] = None
+    return True
+
+  def _Close(self, session):
+    try:
+      session.cd.CloseChrome()
+    except WebDriverException:
+      self.logger.warning('Error closing %s session.', session.profile)
+
+  def CloseAll(self):
+    """Close all idle and leased sessions."""
+    with self.condition:
+      sessions = list(self.leased)
+      for profile in self.idle:
+        sessions.extend(self.idle[profile])
+        self.idle[profile] = []
+      self.leased = []
+    for session in sessions:
+      self._Close(session)
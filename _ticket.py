@@ -0,0 +1,213 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+A print ticket holds all of the options of one print job.
+
+The option values are the strings shown in the Cloud Print web print dialog,
+for example "Landscape" or "Long Edge", so the same ticket can be used by the
+Chrome page object to configure the web print dialog, or converted to a Cloud
+Job Ticket (CJT) for the Cloud Print submit API. CJT is described here:
+https://developers.google.com/cloud-print/docs/cdd#cjt
+"""
+
+import re
+
+import _log
+
+
+class PrintTicket(object):
+  """The options of a print job."""
+
+  # Web print dialog drop down menus, keyed by ticket attribute.
+  SELECTS = [
+      ('color', 'color'),
+      ('dpi', 'dpi'),
+      ('duplex', 'duplex'),
+      ('layout', 'orientation'),
+      ('pagefit', 'fittopage'),
+      ('size', 'media-size'),
+      ]
+
+  # Web print dialog checkboxes, keyed by ticket attribute.
+  CHECKBOXES = [
+      ('collate', 'collate'),
+      ('reverse', 'reverse-order'),
+      ]
+
+  DUPLEX = {
+      'Long Edge': 'LONG_EDGE',
+      'Short Edge': 'SHORT_EDGE',
+      }
+
+  def __init__(self, collate=False, color=None, copies=None, dpi=None,
+               duplex=None, layout=None, pagefit=None, pagerange=None,
+               reverse=False, size=None):
+    """Set the print options. Options that are None are not changed.
+
+    Args:
+      collate: boolean, True = collate, False = do not collate.
+      color: string ["Color" or "Monochrome"]
+      copies: integer, number of copies to print.
+      dpi: string, dpi settings to use.
+      duplex: string, should equal "Long Edge" or "Short Edge".
+      layout: string, one of ["Auto", "Portrait", "Landscape"].
+      pagefit: string, ["No Fitting", "Shrink to Page", "Grow to Page",
+                        "Fit to Page", "Fill Page"]
+      pagerange: string, range of pages to print.
+      reverse: boolean, True = reverse order, False = regular order.
+      size: string, paper size to use.
+    """
+    self.collate = collate
+    self.color = color
+    self.copies = copies
+    self.dpi = dpi
+    self.duplex = duplex
+    self.layout = layout
+    self.pagefit = pagefit
+    self.pagerange = pagerange
+    self.reverse = reverse
+    self.size = size
+
+  def WebDialogSettings(self):
+    """List the settings of the web print dialog this ticket changes.
+
+    Returns:
+      list of dictionaries with the keys kind, option and value. kind is one
+      of 'select', 'checkbox', 'copies' or 'range', and option is the name of
+      the capability in the web print dialog.
+    Checkboxes are only listed when they are turned on, which matches the
+    defaults of the web print dialog.
+    """
+    settings = []
+    for attr, option in self.CHECKBOXES:
+      if getattr(self, attr):
+        settings.append({'kind': 'checkbox', 'option': option, 'value': True})
+    for attr, option in self.SELECTS:
+      if getattr(self, attr):
+        settings.append({'kind': 'select', 'option': option,
+                         'value': getattr(self, attr)})
+    if self.copies and self.copies > 1:
+      settings.append({'kind': 'copies', 'option': 'copies',
+                       'value': self.copies})
+    if self.pagerange:
+      settings.append({'kind': 'range', 'option': 'pagerange',
+                       'value': self.pagerange})
+    return settings
+
+  def CJT(self, caps=None):
+    """Convert the ticket into a Cloud Job Ticket.
+
+    Args:
+      caps: dictionary, printer capabilities from the CDD (Device.cdd['caps']).
+    Returns:
+      dictionary, the CJT to send with a print job.
+    dpi and media size are looked up in caps, as the CJT needs the exact
+    values the printer advertised. They are left out, with a warning, if caps
+    has no match, and the printer prints with its default.
+    """
+    logger = _log.GetLogger('LogoCert')
+    caps = caps or {}
+    ticket = {}
+    if self.collate:
+      ticket['collate'] = {'collate': True}
+    if self.color:
+      if self.color == 'Color':
+        color_type = 'STANDARD_COLOR'
+      else:
+        color_type = 'STANDARD_MONOCHROME'
+      ticket['color'] = {'type': color_type}
+      option = _FindOption(caps, 'color', lambda o: o.get('type') == color_type)
+      if option and 'vendor_id' in option:
+        ticket['color']['vendor_id'] = option['vendor_id']
+    if self.copies:
+      ticket['copies'] = {'copies': int(self.copies)}
+    if self.dpi:
+      values = [int(n) for n in re.findall(r'\d+', self.dpi)]
+      if values:
+        horizontal = values[0]
+        vertical = values[-1]
+        option = _FindOption(
+            caps, 'dpi', lambda o: (o.get('horizontal_dpi') == horizontal and
+                                    o.get('vertical_dpi') == vertical))
+        if option:
+          ticket['dpi'] = {'horizontal_dpi': horizontal,
+                           'vertical_dpi': vertical}
+          if 'vendor_id' in option:
+            ticket['dpi']['vendor_id'] = option['vendor_id']
+        else:
+          logger.warning('Printer capabilities have no dpi %s, printing '
+                         'with the default dpi.', self.dpi)
+    if self.duplex:
+      ticket['duplex'] = {'type': self.DUPLEX.get(self.duplex, 'NO_DUPLEX')}
+    if self.layout:
+      ticket['page_orientation'] = {'type': self.layout.upper()}
+    if self.pagefit:
+      ticket['fit_to_page'] = {
+          'type': self.pagefit.upper().replace(' ', '_')}
+    if self.pagerange:
+      ticket['page_range'] = {'interval': PageRangeIntervals(self.pagerange)}
+    if self.reverse:
+      ticket['reverse_order'] = {'reverse_order': True}
+    if self.size:
+      name = self.size.upper().replace(' ', '_')
+      names = [name, 'ISO_' + name, 'NA_' + name]
+      option = _FindOption(
+          caps, 'media_size',
+          lambda o: (self.size == o.get('custom_display_name') or
+                     o.get('name') in names))
+      if option:
+        ticket['media_size'] = {}
+        for k in ['width_microns', 'height_microns', 'is_continuous_feed',
+                  'vendor_id']:
+          if k in option:
+            ticket['media_size'][k] = option[k]
+      else:
+        logger.warning('Printer capabilities have no media size %s, printing '
+                       'with the default size.', self.size)
+
+    return {'version': '1.0', 'print': ticket}
+
+
+def PageRangeIntervals(pagerange):
+  """Convert a page range string into CJT page range intervals.
+
+  Args:
+    pagerange: string, pages to print (i.e. 3-5, 4, 7-10).
+  Returns:
+    list of dictionaries with start and (optional) end page.
+  """
+  intervals = []
+  for part in pagerange.split(','):
+    part = part.strip()
+    if not part:
+      continue
+    if '-' in part:
+      start, end = part.split('-', 1)
+      interval = {'start': int(start)}
+      if end.strip():
+        interval['end'] = int(end)
+    else:
+      interval = {'start': int(part), 'end': int(part)}
+    intervals.append(interval)
+  return intervals
+
+
+def _FindOption(caps, capability, match):
+  """Return the first option of a CDD capability that matches."""
+  if capability in caps and 'option' in caps[capability]:
+    for option in caps[capability]['option']:
+      if match(option):
+        return option
+  return None
@@ -32,6 +32,26 @@ from _config import Constants
 from _jsonparser import JsonParser
 import _log
 
+# Cassette (see _cassette.py) that records or replays all requests, if any.
+cassette = None
+
+
+def UseCassette(new_cassette):
+  """Record or replay the requests of every Transport with a cassette.
+
+  Args:
+    new_cassette: _cassette.Cassette object, None = use the network.
+  """
+  global cassette  # pylint: disable=global-statement
+  cassette = new_cassette
+
+
+def Open(request):
+  """Send a request, through the cassette if one is in use."""
+  if cassette:
+    return cassette.Open(request)
+  return urllib2.urlopen(request)
+
 
 class Transport(object):
   """Send and receive network messages and communication."""
@@ -100,7 +120,7 @@ class Transport(object):
       self.logger.debug('Adding print data.')
 
     try:
-      r = urllib2.urlopen(request)
+      r = Open(request)
     except urllib2.URLError as e:  # This includes the HTTPError subclass.
       if hasattr(e, 'code'):
         response['code'] = e.code
@@ -149,10 +169,59 @@ class Transport(object):
     request.add_header('Cache-Control', 'no-cache')
     request.add_header('Content-Length', '%d' % length)
     request.add_header('Content-Type', content_type)
-    response = urllib2.urlopen(request).read().strip()
+    response = Open(request).read().strip()
     self.LogData(response)
     return response
 
+  def SendStream(self, url, stream, length, content_type, headers=None):
+    """Send a HTTP Post request with a body that is read while sending.
+
+    Args:
+      url: string, url to send request to.
+      stream: file-like object with the body of the request.
+      length: integer, number of bytes in the body.
+      content_type: string, Content-Type of the body.
+      headers: dict, key/value pairs of HTTP header.
+    Returns:
+      dict: response with keys code, headers, and data.
+    """
+    response = {'code': None,
+                'headers': None,
+                'data': None,
+               }
+
+    self.logger.debug('Streaming %d bytes to URL: %s', length, url)
+    request = urllib2.Request(url)
+    if headers:
+      for header in headers:
+        self.logger.debug('Using header: %s:%s', header, headers[header])
+        request.add_header(header, headers[header])
+    request.add_header('Content-Length', '%d' % length)
+    request.add_header('Content-Type', content_type)
+    request.add_data(stream)
+
+    try:
+      r = Open(request)
+    except urllib2.URLError as e:  # This includes the HTTPError subclass.
+      if hasattr(e, 'code'):
+        response['code'] = e.code
+        self.logger.warning('Return Code: %s', e.code)
+      if hasattr(e, 'reason'):
+        response['data'] = e.reason
+        self.logger.warning(e.reason)
+      return response
+    finally:
+      if hasattr(stream, 'close'):
+        stream.close()
+
+    response['code'] = r.getcode()
+    response['headers'] = r.info()
+    response['data'] = r.read()
+    self.LogData(response)
+    r.close()
+
+    return response
+
   def LogData(self, response):
     """Log all response headers and data.
 
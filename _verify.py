@@ -0,0 +1,228 @@
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Queue manual verifications of printouts, and resolve them all at the end.
+
+Instead of stopping after every print test to ask if the printout is right,
+the tests add an entry to a VerifyQueue and go on printing. When the suites
+are done, the operator goes through the queue once, at the console or in a
+web form served on localhost, and each decision is logged as the result of
+its test.
+
+The queue is saved to a json file after every change, so decisions are not
+lost if the run stops, and a resumed run keeps the entries of the first one.
+"""
+
+import BaseHTTPServer
+import cgi
+import threading
+import time
+import urlparse
+
+from _common import ReadJsonFile
+from _common import WriteJsonFile
+import _log
+
+
+class VerifyQueue(object):
+  """Printouts waiting to be verified."""
+
+  def __init__(self, pathname=None):
+    """Start an empty queue.
+
+    Args:
+      pathname: string, json file to save the queue to, None = memory only.
+    """
+    self.logger = _log.GetLogger('LogoCert')
+    self.pathname = pathname
+    self.items = []
+    self.lock = threading.Lock()
+
+  def Add(self, test_id, test_name, expected, job=None, suite=None):
+    """Queue a printout to verify, and save the queue.
+
+    Args:
+      test_id: string, test id in the TestTracker application.
+      test_name: string, name of the test.
+      expected: string, what the printout should look like.
+      job: string, title or id of the print job, if known.
+      suite: string, name of the test suite.
+    """
+    with self.lock:
+      self.items.append({
+          'number': len(self.items) + 1,
+          'test_id': test_id,
+          'test_name': test_name,
+          'expected': expected,
+          'job': job,
+          'suite': suite,
+          'time': time.time(),
+          'result': None,
+          'notes': '',
+          })
+    self.Save()
+
+  def Pending(self):
+    """Return the entries without a result yet."""
+    with self.lock:
+      return [item for item in self.items if item['result'] is None]
+
+  def Resolve(self, number, passed, notes=None):
+    """Set the result of an entry, and save the queue.
+
+    Args:
+      number: integer, number of the entry.
+      passed: boolean, True = printout is right.
+      notes: string, notes of the operator.
+    Returns:
+      dictionary, the entry, or None if there is no such pending entry.
+    """
+    with self.lock:
+      for item in self.items:
+        if item['number'] == number and item['result'] is None:
+          item['result'] = 'Passed' if passed else 'Failed'
+          item['notes'] = notes or ''
+          break
+      else:
+        return None
+    self.Save()
+    return item
+
+  def Save(self):
+    """Write the queue to its json file.
+
+    Returns:
+      boolean: True = saved (or nothing to save to), False = errors.
+    """
+    if not self.pathname:
+      return True
+    with self.lock:
+      items = list(self.items)
+    if WriteJsonFile(self.pathname, {'items': items}):
+      return True
+    self.logger.error('Could not save the verify queue %s, --resume will not '
+                      'ask for its checks.', self.pathname)
+    return False
+
+  def Load(self):
+    """Read the entries saved in the json file of the queue.
+
+    Returns:
+      boolean: True = entries read, False = no saved queue.
+    """
+    data = ReadJsonFile(self.pathname) if self.pathname else None
+    if not isinstance(data, dict):
+      return False
+    with self.lock:
+      self.items = data.get('items', [])
+    return True
+
+
+def _Describe(item):
+  when = time.strftime('%H:%M:%S', time.localtime(item['time']))
+  text = '#%d %s (queued %s)' % (item['number'], item['test_name'], when)
+  if item.get('job'):
+    text += ', job %s' % item['job']
+  return text
+
+
+def ConsoleSession(queue, resolved):
+  """Ask the operator about every pending entry at the console.
+
+  Args:
+    queue: VerifyQueue object.
+    resolved: function called with each entry once it has a result.
+  """
+  pending = queue.Pending()
+  if pending:
+    print 'Verify the following %d printouts.' % len(pending)
+  for item in pending:
+    print _Describe(item)
+    print 'Expected: %s' % item['expected']
+    answer = raw_input('Is the printout correct? Enter "y" or "n"\n')
+    notes = ''
+    if answer != 'y':
+      print 'Additional notes for test failure: \n'
+      notes = raw_input('Hit return when finished\n')
+    resolved(queue.Resolve(item['number'], answer == 'y', notes))
+
+
+class _FormHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+  """Serves the verification form, and takes its answers."""
+
+  def log_message(self, fmt, *args):  # pylint: disable=arguments-differ
+    _log.GetLogger('LogoCert').debug('Verify form: ' + fmt, *args)
+
+  def _Reply(self, body):
+    body = body.encode('utf-8')
+    self.send_response(200)
+    self.send_header('Content-Type', 'text/html; charset=utf-8')
+    self.send_header('Content-Length', str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def do_GET(self):  # pylint: disable=invalid-name
+    rows = []
+    for item in self.server.queue.Pending():
+      n = item['number']
+      rows.append(
+          '<tr><td>%s</td><td>%s</td><td>'
+          '<label><input type="radio" name="r%d" value="y">Pass</label> '
+          '<label><input type="radio" name="r%d" value="n">Fail</label>'
+          '</td><td><input name="n%d" size="40"></td></tr>' % (
+              cgi.escape(_Describe(item)), cgi.escape(item['expected']),
+              n, n, n))
+    if not rows:
+      self._Reply(u'<html><body>All printouts are verified.</body></html>')
+      return
+    self._Reply(
+        u'<html><body><form method="post"><table border="1">'
+        u'<tr><th>Print job</th><th>Expected</th><th>Result</th>'
+        u'<th>Notes</th></tr>%s</table>'
+        u'<input type="submit" value="Save"></form></body></html>' %
+        u''.join(rows))
+
+  def do_POST(self):  # pylint: disable=invalid-name
+    length = int(self.headers.getheader('Content-Length') or 0)
+    form = urlparse.parse_qs(self.rfile.read(length))
+    for item in self.server.queue.Pending():
+      n = item['number']
+      answer = form.get('r%d' % n, [None])[0]
+      if answer in ('y', 'n'):
+        notes = form.get('n%d' % n, [''])[0].decode('utf-8')
+        self.server.resolved(self.server.queue.Resolve(n, answer == 'y',
+                                                       notes))
+    self.do_GET()
+
+
+def FormSession(queue, resolved, port=0):
+  """Serve a form on localhost until every pending entry has a result.
+
+  Args:
+    queue: VerifyQueue object.
+    resolved: function called with each entry once it has a result.
+    port: integer, port to serve the form on, 0 = any free port.
+  """
+  server = BaseHTTPServer.HTTPServer(('localhost', port), _FormHandler)
+  server.queue = queue
+  server.resolved = resolved
+  try:
+    if queue.Pending():
+      print 'Verify %d printouts at http://localhost:%d/' % (
+          len(queue.Pending()), server.server_address[1])
+    while queue.Pending():
+      server.handle_request()
+  finally:
+    server.server_close()
@@ -0,0 +1,169 @@
+#!/usr/bin/python
+
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Offline tools for saved printer CDDs.
+
+These commands do not need a printer, Chrome or a Cloud Print account.
+
+Check a directory of .json files, or a .jsonl file, against the CDD rules of
+the Printer suite, and print which rules each printer model fails:
+
+./cddtool.py check <directory or file.jsonl> [--processes N]
+
+Compare the capabilities of two saved CDDs, for example before and after a
+firmware update, and print the options that were added, removed or changed:
+
+./cddtool.py diff <old.json> <new.json>
+
+Render the test images into PWG raster at every resolution and document type
+of a saved CDD, into the rendition cache (see _renditions.py), so the tests
+that print raster do not wait for it:
+
+./cddtool.py render <cdd.json> [--processes N]
+
+Check a PWG raster file, like a document a printer received, and print its
+pages; with a saved CDD, check the pages against its pwg_raster_config too:
+
+./cddtool.py pwg <file.pwg> [<cdd.json>]
+"""
+
+import json
+import optparse
+import sys
+
+import _cddbatch
+import _cdddiff
+from _cddparse import ParseCDD
+from _config import Constants
+import _pwgraster
+import _renditions
+
+USAGE = """%prog check <directory or file.jsonl> [options]
+       %prog diff <old.json> <new.json>
+       %prog render <cdd.json> [options]
+       %prog pwg <file.pwg> [<cdd.json>]"""
+
+
+def _ParseArgs():
+  """Parse command line options."""
+
+  parser = optparse.OptionParser(usage=USAGE)
+
+  parser.add_option('--processes',
+                    help='Number of worker processes, 0 = one per CPU '
+                    '[default: %default]',
+                    default=0,
+                    type='int',
+                    dest='processes')
+
+  return parser.parse_args()
+
+
+def Check(options, args):
+  if len(args) != 1:
+    print 'check needs one directory or .jsonl file.'
+    return 2
+  summary = _cddbatch.CheckCorpus(args[0], processes=options.processes or None)
+  print _cddbatch.FormatSummary(summary)
+  failed = [m for m in summary['models'].itervalues() if m['failed']]
+  if failed or summary['errors']:
+    return 1
+  return 0
+
+
+def _LoadCDD(pathname):
+  """Read a saved CDD, and parse it if it is a GCP printer response."""
+  with open(pathname) as f:
+    info = json.load(f)
+  if 'caps' in info:
+    return info
+  return ParseCDD(info)
+
+
+def Diff(unused_options, args):
+  if len(args) != 2:
+    print 'diff needs two CDD files.'
+    return 2
+  old = _LoadCDD(args[0])
+  new = _LoadCDD(args[1])
+  if old is None or new is None:
+    print 'Could not parse CDD.'
+    return 2
+  changes = _cdddiff.DiffCaps(old, new)
+  print _cdddiff.FormatDiff(changes)
+  if changes:
+    return 1
+  return 0
+
+
+def Render(options, args):
+  if len(args) != 1:
+    print 'render needs one CDD file.'
+    return 2
+  cdd = _LoadCDD(args[0])
+  if cdd is None:
+    print 'Could not parse CDD.'
+    return 2
+  settings = _renditions.Settings(cdd)
+  cache = _renditions.RenditionCache()
+  errors = cache.Build(Constants.IMAGES.keys(), settings,
+                       processes=options.processes or None)
+  for (image, setting), error in sorted(errors.iteritems()):
+    print '%s %s: %s' % (image, setting.Key(), error)
+  print 'Renditions at %s are in %s.' % (
+      ', '.join([s.Key() for s in settings]), cache.cache_dir)
+  if errors:
+    return 1
+  return 0
+
+
+def Pwg(unused_options, args):
+  if len(args) not in (1, 2):
+    print 'pwg needs a PWG raster file, and optionally a CDD file.'
+    return 2
+  cdd = None
+  if len(args) == 2:
+    cdd = _LoadCDD(args[1])
+    if cdd is None:
+      print 'Could not parse CDD.'
+      return 2
+  with open(args[0], 'rb') as f:
+    report = _pwgraster.Validate(f, cdd)
+  print _pwgraster.FormatReport(report)
+  if report['problems']:
+    return 1
+  return 0
+
+
+COMMANDS = {
+    'check': Check,
+    'diff': Diff,
+    'pwg': Pwg,
+    'render': Render,
+    }
+
+
+def main():
+  options, args = _ParseArgs()
+  if not args or args[0] not in COMMANDS:
+    print 'Usage: %s' % USAGE.replace('%prog', sys.argv[0])
+    return 2
+  return COMMANDS[args[0]](options, args[1:])
+
+
+if __name__ == '__main__':
+  sys.exit(main())
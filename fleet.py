@@ -0,0 +1,302 @@
+#!/usr/bin/python
+
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Run the non-interactive test suites against many printers at once.
+
+The fleet file is json, with one entry per printer:
+
+{
+  "suites": ["Privet", "Printer"],
+  "printers": [
+    {"name": "modelA-fw1",
+     "config": "configs/modelA.json",
+     "settings": {"PRINTER": {"FIRMWARE": "1.0", "IP": "10.0.0.5"}},
+     "args": ["--jobsource", "api", "--autocaps"]}
+  ]
+}
+
+config is a printer config file (see _printerconfig.py), settings override
+sections of _config.Constants on top of it, and args are extra testcert.py
+options. All configs and settings are checked before any printer starts.
+Each printer is tested in its own process, with its own Chrome data
+directories and log directory, and the results of all printers are merged
+into one report:
+
+./fleet.py <fleet.json> [--resultdir DIR] [--output FILE]
+
+With --bench, each printer is also stressed with local print jobs after its
+suites (see privetbench.py), and its load report is added to the merged
+report. The load is set by an optional "bench" entry of the fleet file, and
+of each printer, with the keys jobs, concurrency, mix, nowait and seed:
+
+  "bench": {"jobs": 50, "concurrency": 8, "mix": "PDF9:3,JPG1"}
+"""
+
+import json
+import multiprocessing
+import optparse
+import os
+import sys
+import unittest
+
+from _config import Constants
+import _loadgen
+import _printerconfig
+from _privet import Privet
+from _results import FormatReport
+from _results import MergeStores
+from _results import ResultStore
+
+USAGE = '%prog <fleet.json> [options]'
+
+# Load of --bench, when the fleet file does not set it.
+DEFAULT_BENCH = {'jobs': 20, 'concurrency': 4, 'nowait': False, 'seed': None,
+                 'mix': ','.join(['%s:%d' % item for item in
+                                  sorted(_loadgen.DEFAULT_MIX.items())])}
+
+# Suites that run without manual input, used when the fleet file has none.
+DEFAULT_SUITES = ['Privet', 'Printer']
+
+
+def _ParseArgs():
+  """Parse command line options."""
+
+  parser = optparse.OptionParser(usage=USAGE)
+
+  parser.add_option('--bench',
+                    help='Stress each printer with local print jobs after '
+                    'its suites, see privetbench.py [default: %default]',
+                    action='store_true',
+                    default=False,
+                    dest='bench')
+  parser.add_option('--output',
+                    help='Json file to write the merged report to '
+                    '[default: %default]',
+                    default='fleet_results.json',
+                    dest='output')
+  parser.add_option('--resume',
+                    help='Skip the tests each printer finished in the last '
+                    'run [default: %default]',
+                    action='store_true',
+                    default=False,
+                    dest='resume')
+  parser.add_option('--resultdir',
+                    help='Directory for the results and test output of each '
+                    'printer [default: %default]',
+                    default='fleet',
+                    dest='resultdir')
+
+  return parser.parse_args()
+
+
+def RunBench(name, bench, resultdir):
+  """Stress a printer with local print jobs, as privetbench.py does.
+
+  Args:
+    name: string, name of the printer in the fleet file.
+    bench: dictionary, the load, with the keys of DEFAULT_BENCH.
+    resultdir: string, directory to write the load report to.
+  Returns:
+    dictionary, the load report (see _loadgen.LoadGenerator.Report), or one
+    with only an error key if the printer could not be reached.
+  """
+  # privetbench is a script, so only import it in the worker process.
+  from privetbench import PrivetToken
+  try:
+    port = int(Constants.PRINTER['PORT'])
+  except ValueError:
+    return {'error': 'Privet port is not configured: %s' %
+                     Constants.PRINTER['PORT']}
+  urls = Privet().SetPrivetUrls(Constants.PRINTER['IP'], port)
+  headers = PrivetToken(urls['info'])
+  if not headers:
+    return {'error': 'Could not read the Privet info of %s:%d' %
+                     (Constants.PRINTER['IP'], port)}
+  generator = _loadgen.LoadGenerator(urls, headers,
+                                     concurrency=bench['concurrency'],
+                                     wait=not bench['nowait'])
+  report = generator.Run(_loadgen.DrawJobs(_loadgen.ParseMix(bench['mix']),
+                                           bench['jobs'], bench['seed']))
+  with open(os.path.join(resultdir, '%s_bench.json' % name), 'w') as f:
+    json.dump(report, f, indent=2, sort_keys=True)
+  return report
+
+
+def BenchSettings(fleet, printer):
+  """Return the --bench load of a printer.
+
+  Args:
+    fleet: dictionary, the parsed fleet file.
+    printer: dictionary, printer entry of the fleet file.
+  Returns:
+    dictionary with the keys of DEFAULT_BENCH, from DEFAULT_BENCH, then the
+    bench entry of the fleet file, then the bench entry of the printer.
+  """
+  bench = dict(DEFAULT_BENCH)
+  bench.update(fleet.get('bench', {}))
+  bench.update(printer.get('bench', {}))
+  return bench
+
+
+def RunPrinter(job):
+  """Run the test suites against one printer, in a worker process.
+
+  Args:
+    job: tuple of (printer entry of the fleet file, suites, result directory,
+         boolean True = resume the last run, dictionary of the --bench load
+         or None = no load test).
+  Returns:
+    tuple of (printer name, results pathname, boolean True = all tests passed,
+    dictionary of the load report or None).
+  """
+  printer, suites, resultdir, resume, bench = job
+  if printer.get('config'):
+    _printerconfig.ApplyConfig(_printerconfig.LoadConfig(printer['config']))
+  _printerconfig.ApplyConfig(printer.get('settings', {}))
+  name = printer['name']
+  results = os.path.join(resultdir, '%s.json' % name)
+  sys.argv = ['testcert.py', '--instance', name, '--results', results,
+              '--printer', Constants.PRINTER['MODEL'],
+              '--suites', ','.join(suites)] + printer.get('args', [])
+  if resume:
+    sys.argv.append('--resume')
+  # setUpModule of testcert reads its options from sys.argv.
+  import testcert
+  with open(os.path.join(resultdir, '%s.txt' % name), 'w') as f:
+    runner = unittest.TextTestRunner(stream=f, verbosity=2)
+    result = runner.run(testcert.BuildSuite(','.join(suites)))
+  report = None
+  if bench:
+    report = RunBench(name, bench, resultdir)
+  return name, results, result.wasSuccessful(), report
+
+
+def CheckFleet(fleet, bench=False):
+  """Check the names, configs and settings of every printer of a fleet.
+
+  Args:
+    fleet: dictionary, the parsed fleet file.
+    bench: boolean, True = also check the --bench load of every printer.
+  Raises:
+    ValueError: if a printer has no unique name, an invalid config, or an
+                invalid load.
+  """
+  printers = fleet['printers']
+  names = [p.get('name') for p in printers]
+  if None in names or len(set(names)) != len(names):
+    raise ValueError('Every printer in the fleet file needs a unique name.')
+  for printer in printers:
+    if printer.get('config'):
+      _printerconfig.LoadConfig(printer['config'])
+    errors = _printerconfig.ValidateConfig(printer.get('settings', {}))
+    if errors:
+      raise ValueError('%s: %s' % (printer['name'], '; '.join(errors)))
+    if bench:
+      settings = BenchSettings(fleet, printer)
+      unknown = sorted(set(settings) - set(DEFAULT_BENCH))
+      if unknown:
+        raise ValueError('%s: unknown bench settings: %s' %
+                         (printer['name'], ', '.join(unknown)))
+      try:
+        _loadgen.ParseMix(settings['mix'])
+      except ValueError as e:
+        raise ValueError('%s: %s' % (printer['name'], e))
+
+
+def RunFleet(fleet, resultdir, resume=False, bench=False):
+  """Test every printer of a fleet, one process per printer.
+
+  Args:
+    fleet: dictionary, the parsed fleet file.
+    resultdir: string, directory for the results of each printer.
+    resume: boolean, True = skip the tests finished in the last run.
+    bench: boolean, True = also stress each printer with local print jobs.
+  Returns:
+    dictionary, the merged report of all printers (see _results.MergeStores),
+    with the load report of each printer as bench in its device entry.
+  Raises:
+    ValueError: if a printer has no unique name, an invalid config, or an
+                invalid load.
+  """
+  suites = fleet.get('suites') or DEFAULT_SUITES
+  printers = fleet['printers']
+  CheckFleet(fleet, bench)
+  if not os.path.isdir(resultdir):
+    os.makedirs(resultdir)
+  # One task per process, so no printer sees the settings of another.
+  pool = multiprocessing.Pool(len(printers), maxtasksperchild=1)
+  try:
+    runs = pool.map(RunPrinter,
+                    [(p, suites, resultdir, resume,
+                      BenchSettings(fleet, p) if bench else None)
+                     for p in printers])
+  finally:
+    pool.close()
+    pool.join()
+  stores = []
+  for name, pathname, unused_passed, unused_bench in runs:
+    store = ResultStore(pathname, device=name)
+    store.Load()
+    stores.append(store)
+  report = MergeStores(stores)
+  for name, unused_pathname, unused_passed, load in runs:
+    if load is not None:
+      report['devices'][name]['bench'] = load
+  return report
+
+
+def FormatBench(report):
+  """Format the load reports of a merged report, one section per device."""
+  lines = []
+  for device in sorted(report['devices']):
+    load = report['devices'][device].get('bench')
+    if load is None:
+      continue
+    lines.append('')
+    lines.append('%s load:' % device)
+    if 'error' in load:
+      lines.append(load['error'])
+    else:
+      lines.append(_loadgen.FormatReport(load))
+  return '\n'.join(lines)
+
+
+def main():
+  options, args = _ParseArgs()
+  if len(args) != 1:
+    print 'Usage: %s' % USAGE.replace('%prog', sys.argv[0])
+    return 2
+  with open(args[0]) as f:
+    fleet = json.load(f)
+  report = RunFleet(fleet, options.resultdir, resume=options.resume,
+                    bench=options.bench)
+  with open(options.output, 'w') as f:
+    json.dump(report, f, indent=2, sort_keys=True)
+  print FormatReport(report)
+  if options.bench:
+    print FormatBench(report)
+  if report['totals'].get('Failed') or report['totals'].get('Blocked'):
+    return 1
+  for entry in report['devices'].itervalues():
+    load = entry.get('bench', {})
+    if 'error' in load or load.get('failed'):
+      return 1
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
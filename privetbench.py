@@ -0,0 +1,185 @@
+#!/usr/bin/python
+
+"""Copyright 2015 Google Inc. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+
+Stress the local printing interfaces of a printer with many jobs at once.
+
+The jobs are sent with the Privet createjob, submitdoc and jobstate
+interfaces (see _loadgen.py), and need neither Chrome nor a Cloud Print
+account. Print 50 jobs, 8 at a time, three PDF9 for every JPG1:
+
+./privetbench.py --jobs 50 --concurrency 8 --mix PDF9:3,JPG1
+
+The printer address is read from _config.py or a --config file, and can be
+given with --ip and --port. Run it with growing --concurrency to find where
+the printer starts rejecting jobs or answering 503.
+"""
+
+import json
+import optparse
+import sys
+
+from _config import Constants
+from _jsonparser import JsonParser
+import _loadgen
+import _log
+import _manifest
+from _privet import Privet
+import _printerconfig
+from _transport import Transport
+
+USAGE = '%prog [options]'
+
+
+def _ParseArgs():
+  """Parse command line options."""
+
+  parser = optparse.OptionParser(usage=USAGE)
+
+  parser.add_option('--concurrency',
+                    help='Number of jobs sent at the same time '
+                    '[default: %default]',
+                    default=4,
+                    type='int',
+                    dest='concurrency')
+  parser.add_option('--config',
+                    help='Json or yaml file with the _config.py settings of '
+                    'the printer [default: %default]',
+                    default=None,
+                    dest='config')
+  parser.add_option('--debug',
+                    help='Specify debug log level [default: %default]',
+                    default='info',
+                    type='choice',
+                    choices=['debug', 'info', 'warning', 'error', 'critical'],
+                    dest='debug')
+  parser.add_option('--interval',
+                    help='Seconds between reads of the printer state '
+                    '[default: %default]',
+                    default=1.0,
+                    type='float',
+                    dest='interval')
+  parser.add_option('--ip',
+                    help='IP address of the printer [default: %default]',
+                    default=Constants.PRINTER['IP'],
+                    dest='ip')
+  parser.add_option('--jobs',
+                    help='Number of jobs to print [default: %default]',
+                    default=20,
+                    type='int',
+                    dest='jobs')
+  parser.add_option('--logdir',
+                    help='Directory for the log file [default: %default]',
+                    default=Constants.LOGFILES,
+                    dest='logdir')
+  parser.add_option('--mix',
+                    help='Comma separated test images to print, each with '
+                    'an optional weight, like PDF9:3,JPG1 '
+                    '[default: %default]',
+                    default=','.join(['%s:%d' % item for item in
+                                      sorted(_loadgen.DEFAULT_MIX.items())]),
+                    dest='mix')
+  parser.add_option('--nowait',
+                    help='Send the next job as soon as the printer takes a '
+                    'job, instead of when it is done [default: %default]',
+                    action='store_true',
+                    default=False,
+                    dest='nowait')
+  parser.add_option('--output',
+                    help='Json file to write the report to '
+                    '[default: %default]',
+                    default='privetbench.json',
+                    dest='output')
+  parser.add_option('--port',
+                    help='Privet port of the printer [default: %default]',
+                    default=Constants.PRINTER['PORT'],
+                    dest='port')
+  parser.add_option('--seed',
+                    help='Seed of the random draw of the documents '
+                    '[default: a different draw each run]',
+                    default=None,
+                    type='int',
+                    dest='seed')
+  parser.add_option('--timeout',
+                    help='Seconds to wait for each job to be done '
+                    '[default: %default]',
+                    default=Constants.JOBS['TIMEOUT'],
+                    type='int',
+                    dest='timeout')
+
+  return parser.parse_args()
+
+
+def PrivetToken(info_url):
+  """Read the X-Privet-Token of a printer from its Privet info.
+
+  Args:
+    info_url: string, url of the Privet info interface.
+  Returns:
+    dictionary, the X-Privet-Token header, or None if it could not be read.
+  """
+  response = Transport().HTTPReq(info_url, cloudprint=False,
+                                 headers=Privet().headers_empty)
+  if response['code'] != 200:
+    return None
+  info = JsonParser().Read(response['data'])
+  if not info['json'] or 'x-privet-token' not in info:
+    return None
+  return {'X-Privet-Token': str(info['x-privet-token'])}
+
+
+def main():
+  options, unused_args = _ParseArgs()
+  if options.config:
+    _printerconfig.ApplyConfig(_printerconfig.LoadConfig(options.config))
+    # Option defaults come from Constants, so read them again.
+    options, unused_args = _ParseArgs()
+  _log.GetLogger('LogoCert', logdir=options.logdir, loglevel=options.debug)
+  try:
+    port = int(options.port)
+  except ValueError:
+    print 'Privet port is not configured: %s' % options.port
+    return 2
+  try:
+    mix = _loadgen.ParseMix(options.mix)
+  except ValueError as e:
+    print e
+    return 2
+  problems = _manifest.Check(None, images=mix.keys())
+  if problems:
+    print '\n'.join(problems)
+    return 2
+  urls = Privet().SetPrivetUrls(options.ip, port)
+  headers = PrivetToken(urls['info'])
+  if not headers:
+    print 'Could not read the Privet info of %s:%d' % (options.ip, port)
+    return 2
+  generator = _loadgen.LoadGenerator(urls, headers,
+                                     concurrency=options.concurrency,
+                                     wait=not options.nowait,
+                                     interval=options.interval,
+                                     timeout=options.timeout)
+  report = generator.Run(_loadgen.DrawJobs(mix, options.jobs, options.seed))
+  with open(options.output, 'w') as f:
+    json.dump(report, f, indent=2, sort_keys=True)
+  print _loadgen.FormatReport(report)
+  if report['failed']:
+    return 1
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -34,22 +34,58 @@ test_id corresponds to an internal database used by Google, so don't change
 those IDs. These IDs are used when submitting test results to our database.
 """
 
+import inspect
 import optparse
+import os
+import re
+import shutil
 import time
 import unittest
 
+from _cassette import Cassette
+import _cddrules
+from _checkpoint import Checkpoint
 import _chrome
 import _chromedriver
 import _cloudprintmgr
-from _common import ReadJsonFile
-from _common import WriteJsonFile
+from _common import LogRetryStats
 from _config import Constants
 from _device import Device
+from _gcpapi import CloudPrintApi
+from _jobwatcher import ApiJobSource
+from _jobwatcher import JobWatcher
+from _jobwatcher import MgtPageJobSource
+import _jobwatcher
+from _localprint import LocalPrint
 import _log
+import _manifest
 import _mdns
 import _oauth2
+import _printerconfig
+from _profiler import CommandProfiler
+from _renditions import RenditionCache
+import _renditions
+from _results import ResultStore
+from _sessionpool import SessionPool
 import _sheets
+from _ticket import PrintTicket
 from _transport import Transport
+import _transport
+from _verify import VerifyQueue
+import _verify
+
+# The test suites, in the order they run.
+SUITES = ['SystemUnderTest', 'Privet', 'PreRegistration', 'Registration',
+          'PostRegistration', 'LocalDiscovery', 'LocalPrinting',
+          'ChromePrinting', 'Printer', 'PrinterState', 'JobState', 'Printing',
+          'RunAfter24Hours', 'Unregister', 'PostUnregister']
+
+# Secondary Chrome sessions each suite leases from the session pool.
+POOL_PROFILES = {
+    'LocalPrinting': ['USER2', 'guest'],
+    'PreRegistration': ['NotSignedIn', 'guest'],
+    'Registration': ['USER2'],
+    }
 
 
 def _ParseArgs():
@@ -57,10 +93,49 @@ def _ParseArgs():
 
   parser = optparse.OptionParser()
 
+  parser.add_option('--apiprint',
+                    help='Submit Printing suite jobs with the GCP submit API '
+                    'instead of the web print dialog [default: %default]',
+                    action='store_true',
+                    default=False,
+                    dest='apiprint')
+  parser.add_option('--autocaps',
+                    help='Derive the CAPS flags not set in the --config file '
+                    'from the printer CDD [default: %default]',
+                    action='store_true',
+                    default=False,
+                    dest='autocaps')
   parser.add_option('--autorun',
                     help='Set if tests need manual input [default: %default]',
                     default=Constants.AUTOMODE,
                     dest='autorun')
+  parser.add_option('--checkpoint',
+                    help='Json file the run state is saved to after every '
+                    'test [default: checkpoint.json in the log directory]',
+                    default=None,
+                    dest='checkpoint')
+  parser.add_option('--chromelog',
+                    help='Enable verbose Chrome logging [default: %default]',
+                    action='store_true',
+                    default=False,
+                    dest='chromelog')
+  parser.add_option('--config',
+                    help='Json or yaml file with the _config.py settings of '
+                    'the printer under test [default: %default]',
+                    default=None,
+                    dest='config')
+  parser.add_option('--deferverify',
+                    help='Queue the manual checks of printouts and ask for '
+                    'them all when the tests are done [default: %default]',
+                    action='store_true',
+                    default=False,
+                    dest='deferverify')
+  parser.add_option('--demo',
+                    help='Pause so print options can be seen before printing '
+                    '[default: %default]',
+                    action='store_true',
+                    default=False,
+                    dest='demo')
   parser.add_option('--debug',
                     help='Specify debug log level [default: %default]',
                     default='info',
@@ -71,6 +146,24 @@ def _ParseArgs():
                     help='Email account to use [default: %default]',
                     default=Constants.USER['EMAIL'],
                     dest='email')
+  parser.add_option('--gcpapi',
+                    help='Base url of the GCP interfaces [default: %default]',
+                    default=Constants.GCP['API'],
+                    dest='gcpapi')
+  parser.add_option('--instance',
+                    help='Name of this run, added to Chrome data directories '
+                    'and the log directory, which also holds its credentials '
+                    'and CDD cache, so runs for several printers can run at '
+                    'once [default: %default]',
+                    default=None,
+                    dest='instance')
+  parser.add_option('--jobsource',
+                    help='Where to read print job state from '
+                    '[default: %default]',
+                    default='mgt',
+                    type='choice',
+                    choices=['api', 'mgt'],
+                    dest='jobsource')
   parser.add_option('--loadtime',
                     help='Seconds for web pages to load [default: %default]',
                     default=10,
@@ -79,6 +172,12 @@ def _ParseArgs():
                     help='Relative directory for logfiles [default: %default]',
                     default=Constants.LOGFILES,
                     dest='logdir')
+  parser.add_option('--noimagecheck',
+                    help='Do not check the test images against the image '
+                    'manifest at startup [default: %default]',
+                    action='store_true',
+                    default=False,
+                    dest='noimagecheck')
   parser.add_option('--passwd',
                     help='Email account password [default: %default]',
                     default=Constants.USER['PW'],
@@ -87,10 +186,86 @@ def _ParseArgs():
                     help='Name of printer [default: %default]',
                     default=Constants.PRINTER['MODEL'],
                     dest='printer')
+  parser.add_option('--privetprint',
+                    help='Print files straight to the printer with the Privet '
+                    'local printing API, and log the timings of each job '
+                    '[default: %default]',
+                    action='store_true',
+                    default=False,
+                    dest='privetprint')
+  parser.add_option('--purgedryrun',
+                    help='Only log the jobs --purgeolder and --purgematch '
+                    'would delete [default: %default]',
+                    action='store_true',
+                    default=False,
+                    dest='purgedryrun')
+  parser.add_option('--purgematch',
+                    help='Delete jobs with titles matching this regular '
+                    'expression at startup [default: %default]',
+                    default=None,
+                    dest='purgematch')
+  parser.add_option('--purgeolder',
+                    help='Delete jobs older than this many hours at startup '
+                    '[default: %default]',
+                    default=None,
+                    type='float',
+                    dest='purgeolder')
+  parser.add_option('--record',
+                    help='Record every HTTP request to this cassette file '
+                    '[default: %default]',
+                    default=None,
+                    dest='record')
+  parser.add_option('--renditions',
+                    help='Render the test images into PWG raster for the '
+                    'printer in the background, into the rendition cache '
+                    '[default: %default]',
+                    action='store_true',
+                    default=False,
+                    dest='renditions')
+  parser.add_option('--replay',
+                    help='Replay the HTTP responses of this cassette file '
+                    'instead of using the network [default: %default]',
+                    default=None,
+                    dest='replay')
+  parser.add_option('--results',
+                    help='Json file to save test results to '
+                    '[default: %default]',
+                    default=None,
+                    dest='results')
+  parser.add_option('--resume',
+                    help='Skip the tests finished in the --checkpoint run '
+                    '[default: %default]',
+                    action='store_true',
+                    default=False,
+                    dest='resume')
   parser.add_option('--stdout',
                     help='Send output to stdout [default: %default]',
                     default=True,
                     dest='stdout')
+  parser.add_option('--wdprofile',
+                    help='Time every WebDriver command and log a summary '
+                    '[default: %default]',
+                    action='store_true',
+                    default=False,
+                    dest='wdprofile')
+  parser.add_option('--suites',
+                    help='Comma separated test suites to run, in the order '
+                    'they are listed [default: all suites]',
+                    default=None,
+                    dest='suites')
+  parser.add_option('--verifyport',
+                    help='With --deferverify, serve a web form on this '
+                    'localhost port for the checks, 0 = any free port '
+                    '[default: ask at the console]',
+                    default=None,
+                    type='int',
+                    dest='verifyport')
+  parser.add_option('--visible',
+                    help='Run all suites in a visible Chrome window, even '
+                    'suites that prefer headless mode [default: %default]',
+                    action='store_true',
+                    default=False,
+                    dest='visible')
 
   return parser.parse_args()
 # The setUpModule will run one time, before any of the tests are run. One main
@@ -105,38 +280,169 @@ def _ParseArgs():
 
 def setUpModule():
   # pylint: disable=global-variable-undefined
+  global checkpoint
   global chrome
   global chromedriver
+  global gcpapi
   global gcpmgr
+  global localprint
+  global bad_images
   global logger
+  global manifest
   global mdns_browser
+  global pool
+  global profiler
+  global renditions
+  global results
+  global tokens
   global transport
   global device
+  global verify
 
   options, unused_args = _ParseArgs()
+  if options.config:
+    _printerconfig.ApplyConfig(_printerconfig.LoadConfig(options.config))
+    # Option defaults come from Constants, so read them again.
+    options, unused_args = _ParseArgs()
   data_dir = options.email.split('@')[0]
-  logger = _log.GetLogger('LogoCert', logdir=options.logdir,
+  logdir = options.logdir
+  if options.instance:
+    data_dir = '%s_%s' % (data_dir, options.instance)
+    logdir = os.path.join(logdir, options.instance)
+  # The logger is set up when _common is imported, so it does not make logdir.
+  if not os.path.isdir(logdir):
+    os.makedirs(logdir)
+  logger = _log.GetLogger('LogoCert', logdir=logdir,
                           loglevel=options.debug, stdout=options.stdout)
-  chromedriver = _chromedriver.ChromeDriver(data_dir, options.loadtime)
-  chrome = _chrome.Chrome(chromedriver)
-  chrome.SignIn(options.email, options.passwd)
-  CheckCredentials()
+  if options.instance:
+    # Runs for several printers at once each keep their own tokens, started
+    # from the shared ones, and their own CDD cache.
+    cred_file = os.path.join(logdir,
+                             os.path.basename(Constants.AUTH['CRED_FILE']))
+    if (not os.path.isfile(cred_file) and
+        os.path.isfile(Constants.AUTH['CRED_FILE'])):
+      shutil.copyfile(Constants.AUTH['CRED_FILE'], cred_file)
+    Constants.AUTH['CRED_FILE'] = cred_file
+    Constants.CDD_CACHE = os.path.join(logdir,
+                                       os.path.basename(Constants.CDD_CACHE))
+  results = ResultStore(options.results,
+                        device=options.instance or options.printer)
+  checkpoint = Checkpoint(options.checkpoint or
+                          os.path.join(logdir, 'checkpoint.json'))
+  checkpoint_dir = os.path.dirname(os.path.abspath(checkpoint.pathname))
+  if not os.path.isdir(checkpoint_dir):
+    os.makedirs(checkpoint_dir)
+  resumed = options.resume and checkpoint.Load()
+  if resumed:
+    logger.info('Resuming run, %d tests already finished.',
+                len(checkpoint.completed))
+    results.results = list(checkpoint.results)
+  done = checkpoint.Completed() if resumed else set()
+  # Only the suites with tests left need their state set up.
+  pending = [name for name in SuiteNames(options.suites)
+             if set(SuiteTests(name)) - done]
+  manifest = _manifest.Load(Constants.IMAGE_DIR)
+  bad_images = set()
+  if not options.noimagecheck:
+    # Find bad images now, instead of hours later when one is printed.
+    images = set()
+    for suite in pending:
+      for test in set(SuiteTests(suite)) - done:
+        images.update(TestSource(test)[1])
+    if images and manifest is None:
+      logger.warning('No image manifest, make one with _manifest.py')
+    for key in sorted(images):
+      problems = _manifest.Check(manifest, images=[key])
+      for problem in problems:
+        logger.error(problem)
+      if problems:
+        bad_images.add(key)
+    if bad_images:
+      logger.error('Tests that print %s will be blocked.',
+                   ', '.join(sorted(bad_images)))
+  renditions = None
+  if options.renditions:
+    renditions = RenditionCache(manifest=manifest)
+  verify = None
+  if options.deferverify:
+    verify = VerifyQueue(os.path.join(logdir, 'verify.json'))
+    if resumed:
+      verify.Load()
+  for name in _printerconfig.Unconfigured():
+    logger.warning('%s is not configured.', name)
+  if options.replay:
+    _transport.UseCassette(Cassette(options.replay, replay=True))
+  elif options.record:
+    _transport.UseCassette(Cassette(options.record))
+  profiler = None
+  if options.wdprofile:
+    profiler = CommandProfiler()
+  chromedriver = _chromedriver.ChromeDriver(data_dir, options.loadtime,
+                                            chrome_logging=options.chromelog,
+                                            profiler=profiler)
+  chrome = _chrome.Chrome(chromedriver, demo=options.demo)
+  tokens = _oauth2.TokenManager()
+  if options.replay:
+    # Replayed responses do not depend on the sign-in or the access token.
+    Constants.AUTH.setdefault('ACCESS', 'replay')
+  else:
+    chrome.SignIn(options.email, options.passwd)
+    if resumed:
+      checkpoint.RestoreTokens(tokens)
+    CheckCredentials()
+    # Long suites outlast the access token, so keep it fresh in the
+    # background.
+    tokens.StartAutoRefresh()
   gcpmgr = _cloudprintmgr.CloudPrintMgr(chromedriver)
-  mdns_browser = _mdns.MDnsListener()
-  mdns_browser.add_listener('privet')
-  # Wait to receive Privet printer advertisements.
-  time.sleep(30)
+  Constants.GCP['API'] = options.gcpapi
+  gcpapi = CloudPrintApi()
+  if not options.replay and (options.purgeolder is not None or
+                             options.purgematch):
+    # A short jobs list keeps the management page fast for the whole run.
+    gcpapi.PurgeJobs(older_than=options.purgeolder,
+                     pattern=options.purgematch,
+                     dry_run=options.purgedryrun)
+  # Start the secondary Chrome sessions while waiting for mDNS messages.
+  pool = SessionPool(options.loadtime, chrome_logging=options.chromelog,
+                     profiler=profiler, instance=options.instance)
+  profiles = set()
+  for suite in pending:
+    profiles.update(POOL_PROFILES.get(suite, []))
+  if not options.replay:
+    pool.Warm(sorted(profiles))
   privet_port = None
-  for k in mdns_browser.listener.discovered:
-    logger.debug('Found printer in Privet advertisements.')
-    if Constants.PRINTER['MODEL'] in k:
-      pinfo = str(mdns_browser.listener.discovered[k]['info']).split(',') 
-      for item in pinfo:
-        if 'port' in item:
-          privet_port = int(item.split('=')[1])
-          logger.debug('Privet advertises port: %d', privet_port)
+  if options.replay:
+    # The recorded Privet urls hold the port, from the checkpoint or config.
+    mdns_browser = None
+    privet_port = checkpoint.device.get('privet_port') if resumed else None
+    if 'LocalDiscovery' in pending:
+      logger.warning('LocalDiscovery needs mDNS, it does not run in replay.')
+  elif (resumed and 'LocalDiscovery' not in pending and
+        checkpoint.device.get('privet_port')):
+    # The Privet port is known, and no remaining suite needs mDNS.
+    mdns_browser = None
+    privet_port = checkpoint.device['privet_port']
+  else:
+    mdns_browser = _mdns.MDnsListener()
+    mdns_browser.add_listener('privet')
+    # Wait to receive Privet printer advertisements.
+    time.sleep(30)
+    for k in mdns_browser.listener.discovered:
+      logger.debug('Found printer in Privet advertisements.')
+      if Constants.PRINTER['MODEL'] in k:
+        pinfo = str(mdns_browser.listener.discovered[k]['info']).split(',')
+        for item in pinfo:
+          if 'port' in item:
+            privet_port = int(item.split('=')[1])
+            logger.debug('Privet advertises port: %d', privet_port)
   device = Device(chromedriver, privet_port=privet_port)
+  if resumed and checkpoint.device.get('id'):
+    device.id = checkpoint.device['id']
   transport = Transport()
+  localprint = None
+  if options.privetprint:
+    localprint = LocalPrint(device.privet_url, device.headers,
+                            transport=transport)
   time.sleep(2)
 
   if Constants.TEST['SPREADSHEET']:
@@ -147,35 +453,158 @@ def setUpModule():
 
 
 def tearDownModule():
+  if verify:
+    VerifyDeferred()
+  pool.CloseAll()
   chromedriver.CloseChrome()
+  LogRetryStats()
+  tokens.StopAutoRefresh()
+  if profiler:
+    profiler.LogReport()
+  if _transport.cassette:
+    _transport.cassette.Close()
+  if renditions:
+    renditions.Close()
+
+
+def LogResult(test_id, test_name, result, notes=None, suite=None):
+  """Log a test result, and add it to the results and the spreadsheet.
+
+  Args:
+    test_id: integer, test id in the TestTracker application.
+    test_name: string, name of the test.
+    result: string, ["Passed", "Failed", "Blocked", "Skipped", "Not Run"]
+    notes: string, notes to include with the test result.
+    suite: string, name of the test suite.
+  """
+  logger.info('test_id: %s: %s', test_id, result)
+  logger.info('%s: %s', test_id, test_name)
+  if notes:
+    logger.info('%s: %s', test_id, notes)
+  else:
+    notes = ''
+  results.Add(test_id, test_name, result, notes, suite=suite)
+  if Constants.TEST['SPREADSHEET']:
+    row = [str(test_id), test_name, result, notes]
+    sheet.AddRow(row)
 
 
-def CheckCredentials():
-  """Check for credentials."""
-  if 'REFRESH' in Constants.AUTH:
-    RefreshToken()
+def VerifyDeferred():
+  """Ask for the queued printout checks, and log their results."""
+  options, unused_args = _ParseArgs()
+
+  def Resolved(item):
+    LogResult(item['test_id'], item['test_name'], item['result'],
+              item['notes'], suite=item['suite'])
+
+  if options.verifyport is None:
+    _verify.ConsoleSession(verify, Resolved)
   else:
-    credentials = ReadJsonFile(Constants.AUTH['CRED_FILE'])
-    if credentials:
-      if 'refresh_token' in credentials:
-        Constants.AUTH['REFRESH'] = credentials['refresh_token']
-      if 'access_token' in credentials:
-        Constants.AUTH['ACCESS'] = credentials['access_token']
-      RefreshToken()
-    else:
-      GetNewTokens()
+    _verify.FormSession(verify, Resolved, port=options.verifyport)
+  checkpoint.results = list(results.results)
+  checkpoint.Save()
+
+
+def TestSource(test):
+  """Read the test id and the test images of a test from its source.
+
+  Args:
+    test: string, name of the test, like Printing.testPrintJpg2Copies.
+  Returns:
+    tuple of (test id or None, set of the Constants.IMAGES keys it prints).
+  """
+  suite, name = test.split('.')
+  try:
+    source = inspect.getsource(getattr(globals()[suite], name))
+  except (IOError, TypeError):
+    return None, set()
+  test_id = re.search(r"test_id = '([^']+)'", source)
+  return (test_id.group(1) if test_id else None,
+          set(re.findall(r"(?:IMAGES\[|ExpectedPages\()'([^']+)'", source)))
+
+
+def TestName(test):
+  """Return the name of a test, like Privet.testPrivetInfoAPI."""
+  return '%s.%s' % (test.__class__.__name__, test._testMethodName)
+
+
+def SuiteTests(suite):
+  """Return the names of the tests of a suite.
+
+  Args:
+    suite: string, name of the suite.
+  Returns:
+    list of test names, like Privet.testPrivetInfoAPI.
+  """
+  loader = unittest.TestLoader()
+  return ['%s.%s' % (suite, name)
+          for name in loader.getTestCaseNames(globals()[suite])]
+
+
+def SuiteNames(suites=None):
+  """Return the names of the suites to run, in the order they run.
+
+  Args:
+    suites: string, comma separated suite names, None = all suites.
+  Returns:
+    list of suite names.
+  Raises:
+    ValueError: if a suite name is not known.
+  """
+  if not suites:
+    return list(SUITES)
+  names = [s.strip() for s in suites.split(',') if s.strip()]
+  for name in names:
+    if name not in SUITES:
+      raise ValueError('Unknown suite: %s' % name)
+  return [name for name in SUITES if name in names]
+
+
+def SetChromeMode(headless):
+  """Restart the main Chrome session if it is not in the requested mode.
+
+  Args:
+    headless: boolean, True = headless Chrome, False = visible Chrome.
+  The Chrome profile is kept in the user data directory, so the new session
+  is still signed in.
+  """
+  # pylint: disable=global-variable-undefined
+  global chrome
+  global chromedriver
+  global gcpmgr
 
+  if chromedriver.headless == headless:
+    return
+  logger.info('Restarting Chrome with headless mode set to %s', headless)
+  data_dir = chromedriver.user_data_dir
+  timeout = chromedriver.timeout
+  chrome_logging = chromedriver.chrome_logging
+  cd_profiler = chromedriver.profiler
+  demo = chrome.demo
+  chromedriver.CloseChrome()
+  chromedriver = _chromedriver.ChromeDriver(data_dir, timeout,
+                                            headless=headless,
+                                            chrome_logging=chrome_logging,
+                                            profiler=cd_profiler)
+  chrome = _chrome.Chrome(chromedriver, demo=demo)
+  gcpmgr = _cloudprintmgr.CloudPrintMgr(chromedriver)
+  device.SetChromeDriver(chromedriver)
+  # pylint: enable=global-variable-undefined
 
-def RefreshToken():
-  """Get a new access token with an existing refresh token."""
-  response = _oauth2.RefreshToken()
-  # If there is an error in the response, it means the current access token
-  # has not yet expired.
-  if 'access_token' in response:
-    logger.info('Got new access token.')
-    Constants.AUTH['ACCESS'] = response['access_token']
+
+def CheckCredentials():
+  """Check for credentials.
+
+  The saved access token is only refreshed if it is close to expiring.
+  """
+  if 'REFRESH' in Constants.AUTH or tokens.Load():
+    if tokens.GetAccessToken():
+      logger.info('Using access token valid for %d seconds.',
+                  tokens.expires_at - time.time())
+    else:
+      GetNewTokens()
   else:
-    logger.info('Using current access token.')
+    GetNewTokens()
 
 
 def GetNewTokens():
@@ -199,33 +628,64 @@ def GetNewTokens():
   auth_code = code.get_attribute('value')
 
   if auth_code:
-    creds = _oauth2.GetTokens(auth_code)
-    if 'refresh_token' in creds:
-      Constants.AUTH['REFRESH'] = creds['refresh_token']
-    if 'access_token' in creds:
-      Constants.AUTH['ACCESS'] = creds['access_token']
-    WriteJsonFile(Constants.AUTH['CRED_FILE'], creds)
+    tokens.Store(_oauth2.GetTokens(auth_code))
   else:
     logger.error('Error getting authorization code.')
 
 
 class LogoCert(unittest.TestCase):
-  """Base Class to drive Logo Certification tests."""
+  """Base Class to drive Logo Certification tests.
+
+  Suites set headless to True if they only scrape the management and simulate
+  pages, to False if they need a visible Chrome (for example the print
+  dialog), or leave it as None if they do not use Chrome at all.
+  """
+
+  headless = False
 
   @classmethod
   def setUpClass(cls):
     options, unused_args = _ParseArgs()
+    if not set(SuiteTests(cls.__name__)) - checkpoint.Completed():
+      raise unittest.SkipTest('All tests finished in an earlier run.')
+    if cls.headless is not None:
+      SetChromeMode(cls.headless and not options.visible)
     cls.loadtime = options.loadtime
     cls.username = options.email
     cls.pw = options.passwd
     cls.autorun = options.autorun
     cls.printer = options.printer
+    cls.apiprint = options.apiprint
+    cls.privetprint = options.privetprint
+    cls.autocaps = options.autocaps
+    cls.deferverify = options.deferverify
+    time.sleep(2)
 
+  @property
+  def color(self):
+    """Color of the print jobs, read when used so --autocaps can set it."""
     if Constants.CAPS['COLOR']:
-      cls.color = 'Color'
-    else:
-      cls.color = 'Monochrome'
-    time.sleep(2)
+      return 'Color'
+    return 'Monochrome'
+
+  def setUp(self):
+    if TestName(self) in checkpoint.Completed():
+      self.skipTest('Finished in an earlier run.')
+    self.logged = False
+    self.last_job = None
+    test_id, images = TestSource(TestName(self))
+    missing = sorted(images & bad_images)
+    if missing:
+      self.LogTest(test_id, self._testMethodName, 'Blocked',
+                   'Test images missing or changed: %s' % ', '.join(missing))
+      # tearDown does not run when setUp stops the test.
+      checkpoint.Complete(TestName(self), results.results, device, tokens)
+      self.skipTest('Test images missing or changed.')
+
+  def tearDown(self):
+    # Tests that stopped before logging a result run again on --resume.
+    if self.logged:
+      checkpoint.Complete(TestName(self), results.results, device, tokens)
 
   def ManualPass(self, test_id, test_name, print_test=True):
     """Take manual input to determine if a test passes.
@@ -237,7 +697,15 @@ class LogoCert(unittest.TestCase):
     Returns:
       boolean: True = Pass, False = Fail.
     If self.autorun is set to true, then this method will pause and return True.
+    With --deferverify, the check is queued (see _verify.py) and its result is
+    logged when all suites are done.
     """
+    if self.deferverify and print_test:
+      verify.Add(test_id, test_name, self.shortDescription() or test_name,
+                 job=self.last_job, suite=self.__class__.__name__)
+      logger.info('%s: printout queued for verification.', test_id)
+      self.logged = True
+      return True
     if self.autorun:
       if print_test:
         notes = 'Manually examine printout to verify correctness.'
@@ -268,19 +736,75 @@ class LogoCert(unittest.TestCase):
       result: string, ["Passed", "Failed", "Blocked", "Skipped", "Not Run"]
       notes: string, notes to include with the test result.
     """
-    logger.info('test_id: %s: %s', test_id, result)
-    logger.info('%s: %s', test_id, test_name)
-    if notes:
-      logger.info('%s: %s', test_id, notes)
-    else:
-      notes = ''
-    if Constants.TEST['SPREADSHEET']:
-      row = [str(test_id), test_name, result, notes]
-      sheet.AddRow(row)
+    LogResult(test_id, test_name, result, notes,
+              suite=self.__class__.__name__)
+    self.logged = True
 
   def SignIn(self):
     chrome.SignIn(self.username, self.pw)
 
+  def ExpectedPages(self, image):
+    """Return the number of pages of a test image.
+
+    Args:
+      image: string, key of the image in Constants.IMAGES.
+    Returns:
+      integer, pages from the image manifest, or read from the image if it
+      is not in the manifest.
+    """
+    pathname = Constants.IMAGES[image]
+    entry = None
+    if manifest:
+      entry = manifest['files'].get(os.path.basename(pathname))
+    return (entry or _manifest.Describe(pathname))['pages']
+
+  def PrintFile(self, filename, **kwargs):
+    """Print a file with the web print dialog, or the GCP submit API.
+
+    Args:
+      filename: string, full path of file to print.
+      kwargs: print options, see PrintTicket.
+    Returns:
+      boolean: True = print job submitted, False = errors.
+    The submit API is used if the --apiprint option is set. It sends the file
+    and a CJT built from the same options, without driving the print dialog.
+    With --privetprint the file is sent to the printer itself instead.
+    """
+    self.last_job = os.path.basename(filename)
+    if self.privetprint:
+      return self.PrivetPrintFile(filename, PrintTicket(**kwargs))
+    if not self.apiprint:
+      return chrome.PrintFile(self.printer, filename, **kwargs)
+    job = gcpapi.Submit(device.details['Printer ID'], filename,
+                        PrintTicket(**kwargs), caps=device.cdd.get('caps'))
+    if job:
+      logger.info('Submitted job %s', job.get('id'))
+      return True
+    return False
+
+  def PrivetPrintFile(self, filename, ticket):
+    """Print a file with the Privet local printing API.
+
+    Args:
+      filename: string, full path of file to print.
+      ticket: PrintTicket object.
+    Returns:
+      boolean: True = printer took the job, False = errors.
+    The PWG raster rendition of the file is sent instead if the printer takes
+    PWG raster and the rendition cache (--renditions) has one.
+    """
+    content_type = None
+    if renditions and _renditions.AcceptsRaster(device.cdd):
+      raster = renditions.Find(filename,
+                               _renditions.Pick(device.cdd, ticket.color))
+      if raster:
+        logger.info('Sending PWG raster rendition of %s', filename)
+        filename = raster
+        content_type = 'image/pwg-raster'
+    job = localprint.Print(filename, ticket, caps=device.cdd.get('caps'),
+                           content_type=content_type, job_name=self.last_job)
+    return job['error'] is None and job['state'] != _jobwatcher.ERROR
+
   @classmethod
   def GetDeviceDetails(cls):
     device.GetDeviceDetails()
@@ -300,11 +824,16 @@ class LogoCert(unittest.TestCase):
         logger.info(k)
         logger.info(device.cdd[k])
         logger.info('===============================')
+      if cls.autocaps:
+        for k, v in sorted(_printerconfig.ApplyCDDCaps(device.cdd).items()):
+          logger.info('CAPS %s from printer CDD: %s', k, v)
 
 
 class SystemUnderTest(LogoCert):
   """Record details about the system under test and test environment."""
 
+  headless = None
+
   def testRecordTestEnv(self):
     """Record test environment details."""
     test_id = '5e5e44cd-4e37-4f16-b1ec-1874912c7449'
@@ -363,6 +892,8 @@ class Privet(LogoCert):
   These tests should be run before a device is registered.
   """
 
+  headless = None
+
   def testPrivetInfoAPI(self):
     """Verify device responds to PrivetInfo API requests."""
     test_id = '612051fb-f156-4846-8924-e62f70273643'
@@ -818,10 +1349,31 @@ class Privet(LogoCert):
 class Printer(LogoCert):
   """Verify printer provides necessary details."""
 
+  headless = True
+
   @classmethod
   def setUpClass(cls):
-    LogoCert.setUpClass()
+    super(Printer, cls).setUpClass()
     LogoCert.GetDeviceDetails()
+    # Check the CDD against every rule once, the tests log the results.
+    cls.cdd_results = _cddrules.Validate(device.cdd)
+
+  def CheckCDDRule(self, test_id, test_name, rule):
+    """Log and assert the result of a CDD rule, see _cddrules.py.
+
+    Args:
+      test_id: integer, test id in the TestTracker application.
+      test_name: string, name of the test.
+      rule: string, name of the rule.
+    """
+    result = self.cdd_results[rule]
+    try:
+      self.assertTrue(result.passed)
+    except AssertionError:
+      self.LogTest(test_id, test_name, 'Failed', result.notes)
+      raise
+    else:
+      self.LogTest(test_id, test_name, 'Passed', result.notes)
 
   def testPrinterName(self):
     """Verify printer provides a name."""
@@ -1189,199 +1741,73 @@ class Printer(LogoCert):
     """Verify the printer contains local settings."""
     test_id = 'cede3eec-41fb-43de-b1f1-76d17443b6f3'
     test_name = 'testLocalSettings'
-    try:
-      self.assertIn('local_settings', device.cdd)
-    except AssertionError:
-      notes = 'local_settings not found in printer CDD.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    try:
-      self.assertIn('current', device.cdd['local_settings'])
-    except AssertionError:
-      notes = 'No current settings found in local_settings.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'Local settings: %s' % device.cdd['local_settings']
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'local_settings')
 
   def testCaps(self):
     """Verify the printer contains capabilities."""
     test_id = '1977ab77-27af-4702-a6f3-5b66fc1b5720'
     test_name = 'testCaps'
-    try:
-      self.assertIn('caps', device.cdd)
-    except AssertionError:
-      notes = 'No capabilities found in printer CDD.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    try:
-      self.assertGreaterEqual(len(device.cdd['caps']), 10)
-    except AssertionError:
-      notes = 'Capabilities does not have required entries.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      self.LogTest(test_id, test_name, 'Passed')
+    self.CheckCDDRule(test_id, test_name, 'caps')
 
   def testUuid(self):
     """Verify the printer contains a UUID."""
     test_id = 'e53df4c2-d208-41d0-bb62-ec6be6ebac9f'
     test_name = 'testUuid'
-    try:
-      self.assertIn('uuid', device.cdd)
-    except AssertionError:
-      notes = 'uuid not found in printer CDD.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    try:
-      self.assertGreaterEqual(len(device.cdd['uuid']), 1)
-    except AssertionError:
-      notes = 'uuid is not a valid value.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'UUID: %s' % device.cdd['uuid']
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'uuid')
 
   def testDefaultDisplayName(self):
     """Verify Default Display Name is present."""
     test_id = '1cb52261-cf01-45ed-b447-8ec8902b36f2'
     test_name = 'testDefaultDisplayName'
-    try:
-      self.assertIn('defaultDisplayName', device.cdd)
-    except AssertionError:
-      notes = 'defaultDisplayName not found in printer CDD'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      self.LogTest(test_id, test_name, 'Passed')
+    self.CheckCDDRule(test_id, test_name, 'defaultDisplayName')
 
   def testCapsSupportedContentType(self):
     """Verify supported_content_type contains needed types."""
     test_id = 'aa7c157e-bd0a-4048-a8a9-88ce3e9a96b8'
     test_name = 'testCapsSupportedContentType'
-    try:
-      self.assertIn('supported_content_type', device.cdd['caps'])
-    except AssertionError:
-      notes = 'supported_content_type missing from printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    content_types = []
-    for item in device.cdd['caps']['supported_content_type']:
-      for k in item:
-        if k == 'content_type':
-          content_types.append(item[k])
-    try:
-      self.assertIn('image/pwg-raster', content_types)
-    except AssertionError:
-      s = 'image/pwg-raster not found in supported content types.'
-      notes = s + '\nFound: %s' % content_types
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'Supported content types: %s' % (
-          device.cdd['caps']['supported_content_type'])
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'supported_content_type')
 
   def testCapsPwgRasterConfig(self):
     """Verify printer CDD contains a pwg_raster_config parameter."""
     test_id = 'e3565806-2320-48ef-8eab-2f48fbcffc33'
     test_name = 'testCapsPwgRasterConfig'
-    try:
-      self.assertIn('pwg_raster_config', device.cdd['caps'])
-    except AssertionError:
-      notes = 'pwg_raster_config parameter not found in printer cdd.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'pwg_raster_config: %s' % (
-          device.cdd['caps']['pwg_raster_config'])
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'pwg_raster_config')
 
   def testCapsInputTrayUnit(self):
     """Verify input_tray_unit is in printer capabilities."""
     test_id = 'e10b7314-fc04-4a4a-ae59-8bf4a3ae165d'
     test_name = 'testCapsInputTrayUnit'
-    try:
-      self.assertIn('input_tray_unit', device.cdd['caps'])
-    except AssertionError:
-      notes = 'input_tray_unit not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'input_tray_unit: %s' % device.cdd['caps']['input_tray_unit']
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'input_tray_unit')
 
   def testCapsOutputBinUnit(self):
     """Verify output_bin_unit is in printer capabilities."""
     test_id = '0f329dba-75c3-45f0-a3a1-4d63f5d195b0'
     test_name = 'testCapsOutputBinUnit'
-    try:
-      self.assertIn('output_bin_unit', device.cdd['caps'])
-    except AssertionError:
-      notes = 'output_bin_unit not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'output_bin_unit: %s' % device.cdd['caps']['output_bin_unit']
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'output_bin_unit')
 
   def testCapsMarker(self):
     """Verify marker is in printer capabilities."""
     test_id = '35005c07-3b18-48b2-a3a2-20fe78bedff2'
     test_name = 'testCapsMarker'
-    try:
-      self.assertIn('marker', device.cdd['caps'])
-    except AssertionError:
-      notes = 'marker not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'marker: %s' % device.cdd['caps']['marker']
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'marker')
 
   def testCapsCover(self):
     """Verify cover is in printer capabilities."""
     test_id = 'c5564d8b-d811-4510-b031-b761bb094631'
     test_name = 'testCapsCover'
-    try:
-      self.assertIn('cover', device.cdd['caps'])
-    except AssertionError:
-      notes = 'cover not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'cover: %s' % device.cdd['caps']['cover']
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'cover')
 
   def testCapsColor(self):
     """Verify color is in printer capabilities."""
     test_id = '01bd068d-0b8f-41a4-82ea-39ef5fb09994'
     test_name = 'testCapsColor'
-    try:
-      self.assertIn('color', device.cdd['caps'])
-    except AssertionError:
-      notes = 'color not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'color: %s' % device.cdd['caps']['color']
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'color')
 
   def testCapsDuplex(self):
     """Verify duplex is in printer capabilities."""
     test_id = '7bda6263-a629-4e1a-84e9-28e84fa2b014'
     test_name = 'testCapsDuplex'
-    try:
-      self.assertIn('duplex', device.cdd['caps'])
-    except AssertionError:
-      notes = 'duplex not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'duplex: %s' % device.cdd['caps']['duplex']
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'duplex')
 
   def testCapsCopies(self):
     """Verify copies is in printer capabilities."""
@@ -1390,43 +1816,19 @@ class Printer(LogoCert):
     if not Constants.CAPS['COPIES']:
       self.LogTest(test_id, test_name, 'Skipped', 'Copies not supported')
       return
-    try:
-      self.assertIn('copies', device.cdd['caps'])
-    except AssertionError:
-      notes = 'copies not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'copies: %s' % device.cdd['caps']['copies']
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'copies')
 
   def testCapsDpi(self):
     """Verify dpi is in printer capabilities."""
     test_id = 'cd4c9dbc-da9d-4de7-a5b7-74e4618ce1b7'
     test_name = 'testCapsDpi'
-    try:
-      self.assertIn('dpi', device.cdd['caps'])
-    except AssertionError:
-      notes = 'dpi not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'dpi: %s' % device.cdd['caps']['dpi']
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'dpi')
 
   def testCapsMediaSize(self):
     """Verify media_size is in printer capabilities."""
     test_id = 'dae470da-ac50-47cb-8ef7-073cc856cfed'
     test_name = 'testCapsMediaSize'
-    try:
-      self.assertIn('media_size', device.cdd['caps'])
-    except AssertionError:
-      notes = 'media_size not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'media_size: %s' % device.cdd['caps']['media_size']
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'media_size')
 
   def testCapsCollate(self):
     """Verify collate is in printer capabilities."""
@@ -1436,15 +1838,7 @@ class Printer(LogoCert):
       notes = 'Printer does not support collate.'
       self.LogTest(test_id, test_name, 'Skipped', notes)
       return
-    try:
-      self.assertIn('collate', device.cdd['caps'])
-    except AssertionError:
-      notes = 'collate not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'collate: %s' % device.cdd['caps']['collate']
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'collate')
 
   def testCapsPageOrientation(self):
     """Verify page_orientation is not in printer capabilities."""
@@ -1454,122 +1848,49 @@ class Printer(LogoCert):
       notes = 'Chrome issue in local printing requires orientation in caps.'
       self.LogTest(test_id, test_name, 'Skipped', notes)
     else:
-      try:
-        self.assertIsNot('page_orientation', device.cdd['caps'])
-      except AssertionError:
-        notes = 'page_orientation found in printer capabilities.'
-        self.LogTest(test_id, test_name, 'Failed', notes)
-        raise
-      else:
-        notes = 'page_orientation not found in printer capabilities.'
-        self.LogTest(test_id, test_name, 'Passed', notes)
+      self.CheckCDDRule(test_id, test_name, 'page_orientation')
 
   def testCapsMargins(self):
     """Verify margin is not in printer capabilities."""
     test_id = '674b3b1a-282a-4e41-a4d2-046ce65e7403'
     test_name = 'testCapsMargins'
-    try:
-      self.assertIsNot('margins', device.cdd['caps'])
-    except AssertionError:
-      notes = 'margins found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'margins not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'margins')
 
   def testCapsFitToPage(self):
     """Verify fit_to_page is not in printer capabilities."""
     test_id = '86c99c63-1581-470f-b771-94e389a5fc32'
     test_name = 'testCapsFitToPage'
-    try:
-      self.assertIsNot('fit_to_page', device.cdd['caps'])
-    except AssertionError:
-      notes = 'fit_to_page found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'fit_to_page not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'fit_to_page')
 
   def testCapsPageRange(self):
     """Verify page_range is not in printer capabilities."""
     test_id = 'f80b2077-2ed2-4fc1-a2d6-2fa3b90e9c9f'
     test_name = 'testCapsPageRange'
-    try:
-      self.assertIsNot('page_range', device.cdd['caps'])
-    except AssertionError:
-      notes = 'page_range found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'page_range not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'page_range')
 
   def testCapsReverseOrder(self):
     """Verify reverse_order is not in printer capabilities."""
     test_id = 'f24797e4-090c-42fd-98e7-f19ea3d39ebf'
     test_name = 'testCapsReverseOrder'
-    try:
-      self.assertIsNot('reverse_order', device.cdd['caps'])
-    except AssertionError:
-      notes = 'reverse_order found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'reverse_order not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'reverse_order')
 
   def testCapsHash(self):
     """Verify printer CDD contains a capsHash."""
     test_id = 'd39db864-3e18-46f3-8c16-d367f155c1e0'
     test_name = 'testCapsHash'
-    try:
-      self.assertIn('capsHash', device.cdd)
-    except AssertionError:
-      notes = 'capsHash not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'capsHash found in printer cdd.'
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'capsHash')
 
   def testCapsCertificationID(self):
     """Verify printer has a certificaionID and it is correct."""
     test_id = '8885e5c7-50a1-4667-aa25-4f40588e396f'
     test_name = 'testCapsCertificationID'
-    try:
-      self.assertIn('certificationId', device.cdd)
-    except AssertionError:
-      notes = 'certificationId not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      try:
-        self.assertEqual(Constants.PRINTER['CERTID'],
-                         device.cdd['certificationId'])
-      except AssertionError:
-        notes = 'Certification ID: %s, expected %s' % (
-            device.cdd['certificationId'], Constants.PRINTER['CERTID'])
-        self.LogTest(test_id, test_name, 'Failed', notes)
-        raise
-      else:
-        notes = 'Certification ID: %s' % device.cdd['certificationId']
-        self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'certificationId')
 
   def testCapsResolvedIssues(self):
     """Verify printer contains resolvedIssues in printer capabilities."""
     test_id = '5a1ef1e7-26ba-458b-a72f-a5ebf26e437c'
     test_name = 'testCapsResolvedIssues'
-    try:
-      self.assertIn('resolvedIssues', device.cdd)
-    except AssertionError:
-      notes = 'resolvedIssues not found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Failed', notes)
-      raise
-    else:
-      notes = 'resolvedIssues found in printer capabilities.'
-      self.LogTest(test_id, test_name, 'Passed', notes)
+    self.CheckCDDRule(test_id, test_name, 'resolvedIssues')
 
 
 class PreRegistration(LogoCert):
@@ -1577,15 +1898,16 @@ class PreRegistration(LogoCert):
 
   @classmethod
   def setUpClass(cls):
-    LogoCert.setUpClass()
-    data_dir = 'NotSignedIn'
-    cls.cd3 = _chromedriver.ChromeDriver(data_dir, cls.loadtime)
-    cls.chrome3 = _chrome.Chrome(cls.cd3)
+    super(PreRegistration, cls).setUpClass()
+    cls.session3 = pool.Lease('NotSignedIn')
+    if not cls.session3:
+      raise unittest.SkipTest('Could not start a signed out Chrome session.')
+    cls.chrome3 = cls.session3.chrome
 
   @classmethod
   def tearDownClass(cls):
     LogoCert.tearDownClass()
-    cls.cd3.CloseChrome()
+    pool.Release(cls.session3)
 
   def testDeviceAdvertisePrivet(self):
     """Verify printer under test advertises itself using Privet."""
@@ -1702,9 +2024,12 @@ class PreRegistration(LogoCert):
     """Verify local print for unregistered printer is correct."""
     test_id = '6e75edff-2512-4c7b-b5f0-79d2ef17d922'
     test_name = 'testLocalPrintGuestUserUnregisteredPrinter'
-    data_dir = 'guest_user'
-    cd3 = _chromedriver.ChromeDriver(data_dir, self.loadtime)
-    chrome3 = _chrome.Chrome(cd3)
+    session = pool.Lease('guest')
+    if not session:
+      notes = 'Error starting Chrome session for guest user.'
+      self.LogTest(test_id, test_name, 'Blocked', notes)
+      return
+    chrome3 = session.chrome
     found = chrome3.SelectPrinterFromPrintDialog(self.printer, localprint=True)
     if found:
       notes = 'Printer found in Local Destinations'
@@ -1721,7 +2046,7 @@ class PreRegistration(LogoCert):
     else:
       self.LogTest(test_id, test_name, 'Passed', notes)
     finally:
-      cd3.CloseChrome()
+      pool.Release(session)
 
 
 class Registration(LogoCert):
@@ -1781,10 +2106,12 @@ class Registration(LogoCert):
     """Verify multiple registration attempts are not allowed by device."""
     test_id = '923ee7f2-c337-49d4-aa4d-8f8e3b43621a'
     test_name = 'testMultipleRegistrationAttempt'
-    data_dir = Constants.USER2['EMAIL'].split('@')[0]
-    cd2 = _chromedriver.ChromeDriver(data_dir, self.loadtime)
-    chrome2 = _chrome.Chrome(cd2)
-    chrome2.SignIn(Constants.USER2['EMAIL'], Constants.USER2['PW'])
+    session = pool.Lease('USER2')
+    if not session:
+      notes = 'Error starting Chrome session for %s' % Constants.USER2['EMAIL']
+      self.LogTest(test_id, test_name, 'Blocked', notes)
+      return
+    chrome2 = session.chrome
     if chrome2.RegisterPrinter(self.printer):
       registered = chrome2.ConfirmPrinterRegistration(self.printer)
       try:
@@ -1797,11 +2124,12 @@ class Registration(LogoCert):
         notes = 'Simultaneous registration request was not successful.'
         self.LogTest(test_id, test_name, 'Passed', notes)
       finally:
-        cd2.CloseChrome()
+        pool.Release(session)
     else:
       notes = 'Error attempting to register printer by %s' % (
           Constants.USER2['EMAIL'])
       self.LogTest(test_id, test_name, 'Blocked', notes)
+      pool.Release(session)
 
 
 class LocalDiscovery(LogoCert):
@@ -1809,7 +2137,7 @@ class LocalDiscovery(LogoCert):
 
   @classmethod
   def setUpClass(cls):
-    LogoCert.setUpClass()
+    super(LocalDiscovery, cls).setUpClass()
     LogoCert.GetDeviceDetails()
 
   @classmethod
@@ -2012,8 +2340,12 @@ class LocalPrinting(LogoCert):
 
   @classmethod
   def setUpClass(cls):
-    LogoCert.setUpClass()
+    super(LocalPrinting, cls).setUpClass()
     LogoCert.GetDeviceDetails()
+    if renditions:
+      # Render while the Chrome print dialog tests run.
+      renditions.Start(Constants.IMAGES.keys(),
+                       _renditions.Settings(device.cdd))
 
   def testLocalPrintEnabled(self):
     """Verify local print is available from Chrome Print Dialog."""
@@ -2037,10 +2369,12 @@ class LocalPrinting(LogoCert):
     """Verify local print available to non owner of printer."""
     test_id = 'ea9b1e01-f792-4627-bf84-2db5db513da4'
     test_name = 'testLocalPrintNotOwner'
-    data_dir = Constants.USER2['EMAIL'].split('@')[0]
-    cd2 = _chromedriver.ChromeDriver(data_dir, self.loadtime)
-    chrome2 = _chrome.Chrome(cd2)
-    chrome2.SignIn(Constants.USER2['EMAIL'], Constants.USER2['PW'])
+    session = pool.Lease('USER2')
+    if not session:
+      notes = 'Error starting Chrome session for %s' % Constants.USER2['EMAIL']
+      self.LogTest(test_id, test_name, 'Blocked', notes)
+      return
+    chrome2 = session.chrome
     chrome2.Print()
     found = chrome2.SelectPrinterFromPrintDialog(self.printer, localprint=True)
     try:
@@ -2053,15 +2387,18 @@ class LocalPrinting(LogoCert):
       notes = 'Found printer in local destinations.'
       self.LogTest(test_id, test_name, 'Passed', notes)
     finally:
-      cd2.CloseChrome()
+      pool.Release(session)
 
   def testLocalPrintGuestUser(self):
     """Verify local print available to guest user."""
     test_id = '8ba6f1ba-66cc-4d9e-aa3c-1d2e611ddb38'
     test_name = 'testLocalPrintGuestUser'
-    data_dir = 'guest_user'
-    cd3 = _chromedriver.ChromeDriver(data_dir, self.loadtime)
-    chrome3 = _chrome.Chrome(cd3)
+    session = pool.Lease('guest')
+    if not session:
+      notes = 'Error starting Chrome session for guest user.'
+      self.LogTest(test_id, test_name, 'Blocked', notes)
+      return
+    chrome3 = session.chrome
     chrome3.Print()
     found = chrome3.SelectPrinterFromPrintDialog(self.printer, localprint=True)
     try:
@@ -2074,7 +2411,7 @@ class LocalPrinting(LogoCert):
       notes = 'Found printer in Local Destinations.'
       self.LogTest(test_id, test_name, 'Passed', notes)
     finally:
-      cd3.CloseChrome()
+      pool.Release(session)
 
   def testLocalPrintingToggle(self):
     """Verify printer respects GCP Mgt page when local printing toggled."""
@@ -2589,7 +2926,7 @@ class ChromePrinting(LogoCert):
 
   @classmethod
   def setUpClass(cls):
-    LogoCert.setUpClass()
+    super(ChromePrinting, cls).setUpClass()
     LogoCert.GetDeviceDetails()
 
   def testChromePrintPageRange(self):
@@ -2912,9 +3249,11 @@ class ChromePrinting(LogoCert):
 class PostRegistration(LogoCert):
   """Tests to run after device is registered."""
 
+  headless = True
+
   @classmethod
   def setUpClass(cls):
-    LogoCert.setUpClass()
+    super(PostRegistration, cls).setUpClass()
     LogoCert.GetDeviceDetails()
 
   def testDeviceDetails(self):
@@ -3009,7 +3348,7 @@ class PrinterState(LogoCert):
 
   @classmethod
   def setUpClass(cls):
-    LogoCert.setUpClass()
+    super(PrinterState, cls).setUpClass()
     LogoCert.GetDeviceDetails()
 
   def testLostNetworkConnection(self):
@@ -3297,14 +3636,21 @@ class JobState(LogoCert):
 
   @classmethod
   def setUpClass(cls):
-    LogoCert.setUpClass()
+    super(JobState, cls).setUpClass()
     LogoCert.GetDeviceDetails()
+    options, unused_args = _ParseArgs()
+    if options.jobsource == 'api':
+      source = ApiJobSource(gcpapi, device.details['Printer ID'])
+    else:
+      source = MgtPageJobSource(gcpmgr)
+    cls.watcher = JobWatcher(source)
 
   def testOnePagePrintJob(self):
     """Verify a 1 page print job is reported correctly."""
     test_id = '345f2083-ec94-4548-9c01-ad7d8f1840ec'
     test_name = 'testOnePagePrintJobState'
     print 'Wait for this one page print job to finish.'
+    pages = self.ExpectedPages('JPG6')
     output = chrome.PrintFile(self.printer, Constants.IMAGES['JPG6'])
     try:
       self.assertTrue(output)
@@ -3313,14 +3659,12 @@ class JobState(LogoCert):
       self.LogTest(test_id, test_name, 'Blocked', notes)
       raise
     else:
-      raw_input('Select enter once image has finished printing.')
-      # Now give the printer time to update our service.
-      time.sleep(10)
-      pages_printed = gcpmgr.GetPagesPrinted('GoogleGlass.jpg')
+      job = self.watcher.WaitForState('GoogleGlass.jpg',
+                                      [_jobwatcher.DONE, _jobwatcher.ERROR])
       try:
-        self.assertEqual(pages_printed, 1)
+        self.assertEqual(job.pages, pages)
       except AssertionError:
-        notes = 'Pages printed is not equal to 1.'
+        notes = 'Pages printed is not equal to %d.' % pages
         self.LogTest(test_id, test_name, 'Failed', notes)
         raise
       else:
@@ -3331,36 +3675,34 @@ class JobState(LogoCert):
     """Verify a multi-page print job is reported with correct state."""
     test_id = '7bbf3e1f-c972-4414-ad7c-e6054aa7416f'
     test_name = 'testMultiPageJobState'
-    print 'Wait until job starts printing 7 page PDF file...'
+    pages = self.ExpectedPages('PDF1.7')
+    print 'Wait until job starts printing %d page PDF file...' % pages
     output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF1.7'])
     try:
       self.assertTrue(output)
     except AssertionError:
-      notes = 'Error while printing 7 page PDF file.'
+      notes = 'Error while printing %d page PDF file.' % pages
       self.LogTest(test_id, test_name, 'Blocked', notes)
       raise
     else:
-      raw_input('Select enter once 1st page is printed...')
-      job_state = gcpmgr.GetJobStatus('PDF1.7.pdf')
+      job = self.watcher.WaitForState('PDF1.7.pdf', [_jobwatcher.IN_PROGRESS])
       try:
-        self.assertEqual(job_state, 'In progress')
+        self.assertEqual(job.state, _jobwatcher.IN_PROGRESS)
       except AssertionError:
         notes = 'Job is no "In progress" while job is still printing.'
         self.LogTest(test_id, test_name, 'Failed', notes)
         raise
       else:
-        raw_input('Select enter once all 7 pages are printed...')
-        # Give the printer time to update our service.
-        time.sleep(10)
-        pages_printed = gcpmgr.GetPagesPrinted('PDF1.7.pdf')
+        job = self.watcher.WaitForState('PDF1.7.pdf', [_jobwatcher.DONE])
         try:
-          self.assertEqual(pages_printed, 7)
+          self.assertEqual(job.pages, pages)
         except AssertionError:
-          notes = 'Pages printed is not equal to 7.'
+          notes = 'Pages printed is not equal to %d.' % pages
           self.LogTest(test_id, test_name, 'Failed', notes)
           raise
         else:
-          notes = 'Printed 7 pages, and job state correctly updated.'
+          notes = ('Printed %d pages, and job state correctly updated.' %
+                   pages)
           self.LogTest(test_id, test_name, 'Passed', notes)
 
   def testJobDeletionRecovery(self):
@@ -3401,11 +3743,9 @@ class JobState(LogoCert):
     print 'Empty the input tray of all paper.'
     raw_input('Select enter once input tray has been emptied.')
     if chrome.PrintFile(self.printer, Constants.IMAGES['PDF1.7']):
-      # give printer time to update our service.
-      time.sleep(10)
-      job_state = gcpmgr.GetJobStatus('PDF1.7.pdf')
+      job = self.watcher.WaitForState('PDF1.7.pdf', [_jobwatcher.ERROR])
       try:
-        self.assertEqual(job_state, 'Error')
+        self.assertEqual(job.state, _jobwatcher.ERROR)
       except AssertionError:
         notes = 'Print Job is not in Error state.'
         self.LogTest(test_id, test_name, 'Failed', notes)
@@ -3423,30 +3763,26 @@ class JobState(LogoCert):
           raise
         else:
           print 'Now place paper back in the input tray.'
-          raw_input('Once paper starts printing, select enter...')
-          time.sleep(10)
-          job_state = gcpmgr.GetJobStatus('PDF1.7.pdf')
+          job = self.watcher.WaitForState('PDF1.7.pdf',
+                                          [_jobwatcher.IN_PROGRESS])
           try:
-            self.assertEqual(job_state, 'In progress')
+            self.assertEqual(job.state, _jobwatcher.IN_PROGRESS)
           except AssertionError:
-            notes = 'Job is not in progress: %s' % job_state
+            notes = 'Job is not in progress: %s' % job.state
             logger.error(notes)
             self.LogTest(test_id, test_name, 'Failed', notes)
             raise
           else:
-            print 'Wait for the print job to finish.'
-            raw_input('Select enter once the job completes printing...')
-            time.sleep(10)
-            job_state = gcpmgr.GetJobStatus('PDF1.7.pdf')
+            job = self.watcher.WaitForState('PDF1.7.pdf', [_jobwatcher.DONE])
             try:
-              self.assertEqual(job_state, 'Printed')
+              self.assertEqual(job.state, _jobwatcher.DONE)
             except AssertionError:
-              notes = 'Job is not in Printed state: %s' % job_state
+              notes = 'Job is not in Printed state: %s' % job.state
               logger.error(notes)
               self.LogTest(test_id, test_name, 'Failed', notes)
               raise
             else:
-              notes = 'Job state: %s' % job_state
+              notes = 'Job state: %s' % job.state
               self.LogTest(test_id, test_name, 'Passed', notes)
     else:
       notes = 'Error printing PDF file.'
@@ -3735,24 +4071,25 @@ class JobState(LogoCert):
     test_id = 'e078c865-738a-44a7-bf32-cff5c47d0857'
     test_name = 'testPagesPrinted'
 
+    pages = self.ExpectedPages('PDF10')
     output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF10'])
-    raw_input('Select enter when the 3 page print job is completed.')
+    raw_input('Select enter when the %d page print job is completed.' % pages)
     pages_printed = gcpmgr.GetPagesPrinted('rosemary.pdf')
     try:
       self.assertTrue(output)
     except AssertionError:
-      notes = 'Error printing 3 page PDF file.'
+      notes = 'Error printing %d page PDF file.' % pages
       self.LogTest(test_id, test_name, 'Blocked', notes)
       raise
     else:
       try:
-        self.assertEqual(pages_printed, 3)
+        self.assertEqual(pages_printed, pages)
       except AssertionError:
-        notes = 'Printer reports pages printed not equal to 3.'
+        notes = 'Printer reports pages printed not equal to %d.' % pages
         self.LogTest(test_id, test_name, 'Failed', notes)
         raise
       else:
-        notes = 'Printer reports pages printed = 3.'
+        notes = 'Printer reports pages printed = %d.' % pages
         self.LogTest(test_id, test_name, 'Passed', notes)
 
 
@@ -3761,7 +4098,7 @@ class RunAfter24Hours(LogoCert):
 
   @classmethod
   def setUpClass(cls):
-    LogoCert.setUpClass()
+    super(RunAfter24Hours, cls).setUpClass()
     logger.info('Sleeping for 1 day before running additional tests.')
     print 'Sleeping for 1 day before running additional tests.'
     time.sleep(86400)
@@ -3844,7 +4181,7 @@ class Printing(LogoCert):
 
   @classmethod
   def setUpClass(cls):
-    LogoCert.setUpClass()
+    super(Printing, cls).setUpClass()
     LogoCert.GetDeviceDetails()
 
   def testPrintJpg2Copies(self):
@@ -3855,8 +4192,8 @@ class Printing(LogoCert):
       self.LogTest(test_id, test_name, 'Skipped', notes)
       return
     logger.info('Setting copies to 2...')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['JPG12'],
-                              color=self.color, copies=2)
+    output = self.PrintFile(Constants.IMAGES['JPG12'],
+                            color=self.color, copies=2)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -3870,8 +4207,8 @@ class Printing(LogoCert):
     test_id = '2b7c81a9-9014-4236-8a1f-5daf4824a41a'
     test_name = 'testPrintJpgLandscape'
     logger.info('Setting orientation to landscape...')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['JPG7'],
-                              color=self.color, layout='Landscape')
+    output = self.PrintFile(Constants.IMAGES['JPG7'],
+                            color=self.color, layout='Landscape')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -3889,8 +4226,8 @@ class Printing(LogoCert):
       self.LogTest(test_id, test_name, 'Skipped', notes)
       return
     logger.info('Setting duplex to long edge...')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF10'],
-                              duplex='Long Edge')
+    output = self.PrintFile(Constants.IMAGES['PDF10'],
+                            duplex='Long Edge')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -3908,8 +4245,8 @@ class Printing(LogoCert):
       self.LogTest(test_id, test_name, 'Skipped', notes)
       return
     logger.info('Setting duplex to short edge...')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF10'],
-                              duplex='Short Edge')
+    output = self.PrintFile(Constants.IMAGES['PDF10'],
+                            duplex='Short Edge')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -3928,8 +4265,8 @@ class Printing(LogoCert):
       self.LogTest(test_id, test_name, 'Skipped', notes)
       return
     logger.info('Printing with color selected.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF13'],
-                              color='Color')
+    output = self.PrintFile(Constants.IMAGES['PDF13'],
+                            color='Color')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -3944,8 +4281,8 @@ class Printing(LogoCert):
     test_name = 'testPrintMediaSizeSelect'
     logger.info('Testing the selection of A4 media size.')
     raw_input('Load printer with A4 size paper. Select return when ready.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG1'],
-                              size='A4')
+    output = self.PrintFile(Constants.IMAGES['PNG1'],
+                            size='A4')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -3960,8 +4297,8 @@ class Printing(LogoCert):
     test_id = '1c2610c9-4f16-42ca-9d4a-018f127c4b58'
     test_name = 'testPrintPdfReverseOrder'
     logger.info('Print with reverse order flag set...')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF10'],
-                              reverse=True)
+    output = self.PrintFile(Constants.IMAGES['PDF10'],
+                            reverse=True)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -3975,8 +4312,8 @@ class Printing(LogoCert):
     test_id = '4f274ec1-28f0-4201-b769-65467f7abcfd'
     test_name = 'testPrintPdfPageRangePage2'
     logger.info('Setting page range to page 2...')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF1'],
-                              pagerange='2')
+    output = self.PrintFile(Constants.IMAGES['PDF1'],
+                            pagerange='2')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -3994,8 +4331,8 @@ class Printing(LogoCert):
       self.LogTest(test_id, test_name, 'Skipped', notes)
       return
     logger.info('Setting color option to Color...')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG1'],
-                              color='Color')
+    output = self.PrintFile(Constants.IMAGES['PNG1'],
+                            color='Color')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4011,8 +4348,8 @@ class Printing(LogoCert):
     dpi_settings = chrome.GetOptions('dpi', self.printer)
     for dpi_option in dpi_settings:
       logger.info('Setting dpi to %s', dpi_option)
-      output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG8'],
-                                dpi=dpi_option)
+      output = self.PrintFile(Constants.IMAGES['PNG8'],
+                              dpi=dpi_option)
       try:
         self.assertTrue(output)
       except AssertionError:
@@ -4025,8 +4362,8 @@ class Printing(LogoCert):
     test_id = '0f911f5f-7001-4d87-933f-c15f42823da6'
     test_name = 'testPrintPngFillPage'
     logger.info('Setting print option to Fill Page...')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG3'],
-                              pagefit='Fill Page')
+    output = self.PrintFile(Constants.IMAGES['PNG3'],
+                            pagefit='Fill Page')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4040,8 +4377,8 @@ class Printing(LogoCert):
     test_id = '5f2ab7d7-663b-4b86-b4e5-c38979baad11'
     test_name = 'testPrintPngFitToPage'
     logger.info('Setting print option to Fit to Page...')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG3'],
-                              pagefit='Fit to Page')
+    output = self.PrintFile(Constants.IMAGES['PNG3'],
+                            pagefit='Fit to Page')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4055,8 +4392,8 @@ class Printing(LogoCert):
     test_id = '09532b30-f853-458e-99bf-5c1c532573c8'
     test_name = 'testPrintPngGrowToPage'
     logger.info('Setting print option to Grow to Page...')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG3'],
-                              pagefit='Grow to Page')
+    output = self.PrintFile(Constants.IMAGES['PNG3'],
+                            pagefit='Grow to Page')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4070,8 +4407,8 @@ class Printing(LogoCert):
     test_id = '3309482d-d23a-4ad7-8161-8c474ab1e6de'
     test_name = 'testPrintPngShrinkToPage'
     logger.info('Setting print option to Shrink to Page...')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG3'],
-                              pagefit='Shrink to Page')
+    output = self.PrintFile(Constants.IMAGES['PNG3'],
+                            pagefit='Shrink to Page')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4085,8 +4422,8 @@ class Printing(LogoCert):
     test_id = '0c8c1bd5-7d2a-4f51-9219-36d1f6957b57'
     test_name = 'testPrintPngNoFitting'
     logger.info('Setting print option to No Fitting...')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG3'],
-                              pagefit='No Fitting')
+    output = self.PrintFile(Constants.IMAGES['PNG3'],
+                            pagefit='No Fitting')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4100,8 +4437,8 @@ class Printing(LogoCert):
     test_id = '6e36efd8-fb5b-4fce-8d24-2cc1097a88f5'
     test_name = 'testPrintJpgPortrait'
     logger.info('Print simple JPG file with portrait orientation.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['JPG14'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['JPG14'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4115,8 +4452,8 @@ class Printing(LogoCert):
     test_id = '1d97a167-bc37-4e24-adf9-7e4bdbfff553'
     test_name = 'testPrintJpgLandscape'
     logger.info('Print simple JPG file with landscape orientation.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['JPG7'],
-                              color=self.color, layout='Landscape')
+    output = self.PrintFile(Constants.IMAGES['JPG7'],
+                            color=self.color, layout='Landscape')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4130,8 +4467,8 @@ class Printing(LogoCert):
     test_id = 'bbd3c533-fcc2-4bf1-adc9-9cd63cc35a80'
     test_name = 'testPrintJpgBlacknWhite'
     logger.info('Print black and white JPG file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['JPG1'],
-                              color='Monochrome')
+    output = self.PrintFile(Constants.IMAGES['JPG1'],
+                            color='Monochrome')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4145,8 +4482,8 @@ class Printing(LogoCert):
     test_id = '26076864-6aad-44e5-96a6-4f455e751fe7'
     test_name = 'testPrintJpgColorTestLandscape'
     logger.info('Print color test JPG file with landscape orientation.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['JPG2'],
-                              color=self.color, layout='Landscape')
+    output = self.PrintFile(Constants.IMAGES['JPG2'],
+                            color=self.color, layout='Landscape')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4160,8 +4497,8 @@ class Printing(LogoCert):
     test_id = '1f0e4b40-a164-4441-b3cb-182e2a5a5cdb'
     test_name = 'testPrintJpgPhoto'
     logger.info('Print JPG photo in landscape orientation.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['JPG5'],
-                              color=self.color, layout='Landscape')
+    output = self.PrintFile(Constants.IMAGES['JPG5'],
+                            color=self.color, layout='Landscape')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4175,8 +4512,8 @@ class Printing(LogoCert):
     test_id = '03a22a19-8089-4150-8f1b-ceb78180713e'
     test_name = 'testPrintJpgSingleObject'
     logger.info('Print JPG file single object in landscape.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['JPG7'],
-                              color=self.color, layout='Landscape')
+    output = self.PrintFile(Constants.IMAGES['JPG7'],
+                            color=self.color, layout='Landscape')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4190,8 +4527,8 @@ class Printing(LogoCert):
     test_id = '8ce44d03-ba45-40c5-af0f-2aacb8a6debf'
     test_name = 'testPrintJpgProgressive'
     logger.info('Print a Progressive JPG file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['JPG8'],
-                              color=self.color, layout='Landscape')
+    output = self.PrintFile(Constants.IMAGES['JPG8'],
+                            color=self.color, layout='Landscape')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4205,8 +4542,8 @@ class Printing(LogoCert):
     test_id = '2d7ba1af-917b-467b-9e09-72f77cf58a56'
     test_name = 'testPrintJpgMultiImageWithText'
     logger.info('Print multi image with text JPG file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['JPG9'],
-                              color=self.color, layout='Landscape')
+    output = self.PrintFile(Constants.IMAGES['JPG9'],
+                            color=self.color, layout='Landscape')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4220,8 +4557,8 @@ class Printing(LogoCert):
     test_id = 'c8208125-e720-406a-9308-bc80d461b08e'
     test_name = 'testPrintJpgMaxComplex'
     logger.info('Print complex JPG file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['JPG10'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['JPG10'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4235,8 +4572,8 @@ class Printing(LogoCert):
     test_id = '3ff201de-77f3-4be1-9cf2-60dc29698f0b'
     test_name = 'testPrintJpgMultiTargetPortrait'
     logger.info('Print multi-target JPG file with portrait orientation.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['JPG11'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['JPG11'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4250,8 +4587,8 @@ class Printing(LogoCert):
     test_id = 'f2f2cae4-e835-48e0-8632-953dd50be0ca'
     test_name = 'testPrintJpgStepChartLandscape'
     logger.info('Print step chart JPG file in landscape orientation.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['JPG13'],
-                              color=self.color, layout='Landscape')
+    output = self.PrintFile(Constants.IMAGES['JPG13'],
+                            color=self.color, layout='Landscape')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4265,8 +4602,8 @@ class Printing(LogoCert):
     test_id = 'c45e7ebf-241b-4fdf-8d0b-4d7f850a2b1a'
     test_name = 'testPrintJpgLarge'
     logger.info('Print large JPG file with landscape orientation.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['JPG3'],
-                              color=self.color, layout='Landscape')
+    output = self.PrintFile(Constants.IMAGES['JPG3'],
+                            color=self.color, layout='Landscape')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4280,8 +4617,8 @@ class Printing(LogoCert):
     test_id = 'e30fefe9-1a32-4b22-9088-0af5fe2ffd57'
     test_name = 'testPrintJpgLargePhoto'
     logger.info('Print large photo JPG file with landscape orientation.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['JPG4'],
-                              color=self.color, layout='Landscape')
+    output = self.PrintFile(Constants.IMAGES['JPG4'],
+                            color=self.color, layout='Landscape')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4296,8 +4633,8 @@ class Printing(LogoCert):
     test_id = '0d4d0d33-b170-414d-a722-00e848bede10'
     test_name = 'testPrintFilePdf'
     logger.info('Printing a black and white 1 page PDF file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF4'],
-                              color='Monochrome')
+    output = self.PrintFile(Constants.IMAGES['PDF4'],
+                            color='Monochrome')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4312,8 +4649,8 @@ class Printing(LogoCert):
     test_id = 'd81fe624-c6ec-4e72-9535-9cead873a4fa'
     test_name = 'testPrintFileColorPdf'
     logger.info('Printing a color, 1 page PDF file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF13'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['PDF13'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4328,8 +4665,8 @@ class Printing(LogoCert):
     test_id = '84e4d761-594d-4930-8a91-b43d037a7422'
     test_name = 'testPrintFileMultiPagePdf'
     logger.info('Printing a 3 page, color PDF file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF10'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['PDF10'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4344,8 +4681,8 @@ class Printing(LogoCert):
     test_id = '005a9954-b55e-40f9-8a66-aa06b5528a78'
     test_name = 'testPrintFileLargeColorPdf'
     logger.info('Printing a 20 page, color PDF file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF1'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['PDF1'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4360,7 +4697,7 @@ class Printing(LogoCert):
     test_id = '7cd98a62-d209-4d5a-934d-f951e0db9666'
     test_name = 'testPrintFilePdfV1_2'
     logger.info('Printing a PDF v1.2 file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF1.2'])
+    output = self.PrintFile(Constants.IMAGES['PDF1.2'])
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4375,7 +4712,7 @@ class Printing(LogoCert):
     test_id = 'dec3eebc-75b3-47c2-8619-0451e172cb08'
     test_name = 'testPrintFilePdfV1_3'
     logger.info('Printing a PDF v1.3 file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF1.3'])
+    output = self.PrintFile(Constants.IMAGES['PDF1.3'])
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4390,7 +4727,7 @@ class Printing(LogoCert):
     test_id = '881cdd22-49e8-4560-ae13-b8c79741f7d1'
     test_name = 'testPrintFilePdfV1_4'
     logger.info('Printing a PDF v1.4 file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF1.4'])
+    output = self.PrintFile(Constants.IMAGES['PDF1.4'])
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4405,7 +4742,7 @@ class Printing(LogoCert):
     test_id = '518c3a4b-1335-4979-b1e6-2b06acad8905'
     test_name = 'testPrintFilePdfV1_5'
     logger.info('Printing a PDF v1.5 file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF1.5'])
+    output = self.PrintFile(Constants.IMAGES['PDF1.5'])
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4420,7 +4757,7 @@ class Printing(LogoCert):
     test_id = '94dbee8a-e02c-4926-ad7e-a83dbff716dd'
     test_name = 'testPrintFilePdfV1_6'
     logger.info('Printing a PDF v1.6 file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF1.6'])
+    output = self.PrintFile(Constants.IMAGES['PDF1.6'])
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4435,7 +4772,7 @@ class Printing(LogoCert):
     test_id = '2ee12493-eeaf-43cd-a136-d01227d63e9a'
     test_name = 'testPrintFilePdfV1_7'
     logger.info('Printing a PDF v1.7 file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF1.7'])
+    output = self.PrintFile(Constants.IMAGES['PDF1.7'])
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4450,8 +4787,8 @@ class Printing(LogoCert):
     test_id = '4bddcf56-984b-4c4d-9c39-63459b295247'
     test_name = 'testPrintFilePdfColorTicket'
     logger.info('Printing PDF Color ticket in with landscape orientation.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF2'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['PDF2'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4466,7 +4803,7 @@ class Printing(LogoCert):
     test_id = 'a7328247-84ab-4a8f-865a-f8f30ed20fc2'
     test_name = 'testPrintFilePdfLetterMarginTest'
     logger.info('Printing PDF Letter Margin Test.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF3'])
+    output = self.PrintFile(Constants.IMAGES['PDF3'])
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4481,7 +4818,7 @@ class Printing(LogoCert):
     test_id = '215a7db8-ae4b-4784-b49a-49c30cf82b53'
     test_name = 'testPrintFilePdfMarginTest2'
     logger.info('Printing PDF Margin Test 2 file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF6'])
+    output = self.PrintFile(Constants.IMAGES['PDF6'])
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4496,8 +4833,8 @@ class Printing(LogoCert):
     test_id = '2aaa222a-7d35-4f88-bfc0-8cf2eb5f8373'
     test_name = 'testPrintFilePdfSimpleLandscape'
     logger.info('Printing simple PDF file in landscape.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF8'],
-                              layout='Landscape')
+    output = self.PrintFile(Constants.IMAGES['PDF8'],
+                            layout='Landscape')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4512,8 +4849,8 @@ class Printing(LogoCert):
     test_id = 'ae2a075b-ee7c-409c-8d2d-d08f5c2e868b'
     test_name = 'testPrintFilePdfCupsTestPage'
     logger.info('Printing PDF CUPS test page.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF9'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['PDF9'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4528,8 +4865,8 @@ class Printing(LogoCert):
     test_id = '882efbf9-47f2-43cd-9ee9-d4b026679406'
     test_name = 'testPrintFilePdfColorTest'
     logger.info('Printing PDF Color Test page.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF11'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['PDF11'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4544,8 +4881,8 @@ class Printing(LogoCert):
     test_id = 'b38c0113-095e-4e73-8efe-7352852cafb7'
     test_name = 'testPrintFilePdfBarCodeTicket'
     logger.info('Printing PDF Bar coded ticket.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF12'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['PDF12'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4560,8 +4897,8 @@ class Printing(LogoCert):
     test_id = '12555398-4e1f-4305-bcc6-b2b82d665634'
     test_name = 'testPrintFilePdfComplexTicket'
     logger.info('Printing PDF of complex ticket.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PDF14'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['PDF14'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4576,8 +4913,8 @@ class Printing(LogoCert):
     test_id = '7c346ab2-d8b4-407b-b477-755a0432ace5'
     test_name = 'testPrintFileSimpleGIF'
     logger.info('Printing simple GIF file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['GIF2'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['GIF2'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4592,8 +4929,8 @@ class Printing(LogoCert):
     test_id = '2e81decf-e364-4651-af1b-a516ac51f4bb'
     test_name = 'testPrintFileSmallGIF'
     logger.info('Printing small GIF file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['GIF4'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['GIF4'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4608,8 +4945,8 @@ class Printing(LogoCert):
     test_id = '72ed6bc4-1b42-4bc1-921c-4ab205dd56cd'
     test_name = 'testPrintFileLargeGIF'
     logger.info('Printing large GIF file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['GIF1'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['GIF1'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4624,8 +4961,8 @@ class Printing(LogoCert):
     test_id = '7fa69496-542e-4f71-8538-7f67b907a2ec'
     test_name = 'testPrintBlackNWhiteGIF'
     logger.info('Printing black and white GIF file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['GIF3'],
-                              color='Monochrome')
+    output = self.PrintFile(Constants.IMAGES['GIF3'],
+                            color='Monochrome')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4640,7 +4977,7 @@ class Printing(LogoCert):
     test_id = '46164630-7c6e-4b37-b829-5edac13888ac'
     test_name = 'testPrintFileHTML'
     logger.info('Printing HTML file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['HTML1'])
+    output = self.PrintFile(Constants.IMAGES['HTML1'])
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4655,8 +4992,8 @@ class Printing(LogoCert):
     test_id = '4c1e7474-3471-46b2-8e0d-2e605f89c129'
     test_name = 'testPrintFilePngA4Test'
     logger.info('Printing A4 Test PNG file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG1'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['PNG1'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4671,8 +5008,8 @@ class Printing(LogoCert):
     test_id = '7f1e0a95-767e-4302-8225-61d93e127a41'
     test_name = 'testPrintFilePngPortrait'
     logger.info('Printing PNG portrait file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG8'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['PNG8'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4687,8 +5024,8 @@ class Printing(LogoCert):
     test_id = '6b386438-d5cd-46c5-9b25-4ac50faf169c'
     test_name = 'testPrintFileColorPngLandscape'
     logger.info('Printing Color PNG file in landscape.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG2'],
-                              color=self.color, layout='Landscape')
+    output = self.PrintFile(Constants.IMAGES['PNG2'],
+                            color=self.color, layout='Landscape')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4703,8 +5040,8 @@ class Printing(LogoCert):
     test_id = '213b84ed-6ddb-4d9b-ab27-be8d5f6d8370'
     test_name = 'testPrintFileSmallPng'
     logger.info('Printing a small PNG file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG3'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['PNG3'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4719,8 +5056,8 @@ class Printing(LogoCert):
     test_id = '83b38406-74f2-4b2e-a74c-54998956ee18'
     test_name = 'testPrintFilePngWithLetters'
     logger.info('Printing PNG file with letters.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG4'],
-                              color=self.color, layout='Landscape')
+    output = self.PrintFile(Constants.IMAGES['PNG4'],
+                            color=self.color, layout='Landscape')
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4735,8 +5072,8 @@ class Printing(LogoCert):
     test_id = '8f66270d-64df-49c7-bb49-01705b65d089'
     test_name = 'testPrintFilePngColorTest'
     logger.info('Printing PNG Color Test file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG5'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['PNG5'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4751,8 +5088,8 @@ class Printing(LogoCert):
     test_id = '931f1994-eebf-4fa6-9549-f8811b4ed641'
     test_name = 'testPrintFilePngColorImageWithText'
     logger.info('Printing color images with text PNG file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG6'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['PNG6'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4767,8 +5104,8 @@ class Printing(LogoCert):
     test_id = '055898ba-25f7-4b4b-b116-ff7d499c8994'
     test_name = 'testPrintFilePngCupsTest'
     logger.info('Printing Cups Test PNG file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG7'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['PNG7'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4783,8 +5120,8 @@ class Printing(LogoCert):
     test_id = '852fab66-af6b-4f06-b94f-9d04508be3c6'
     test_name = 'testPrintFileLargePng'
     logger.info('Printing large PNG file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['PNG9'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['PNG9'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4799,7 +5136,7 @@ class Printing(LogoCert):
     test_id = 'f10c0c3c-0d44-440f-8058-a0643235e2f8'
     test_name = 'testPrintFileSvgSimple'
     logger.info('Printing simple SVG file.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['SVG2'])
+    output = self.PrintFile(Constants.IMAGES['SVG2'])
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4814,8 +5151,8 @@ class Printing(LogoCert):
     test_id = '613e3f50-365f-4d4e-be72-d04202f74de4'
     test_name = 'testPrintFileSvgWithImages'
     logger.info('Printing SVG file with images.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['SVG1'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['SVG1'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4830,7 +5167,7 @@ class Printing(LogoCert):
     test_id = 'ff85ffb1-7032-4006-948d-1725d93c5c5a'
     test_name = 'testPrintFileTiffRegLink'
     logger.info('Printing TIFF file of GCP registration link.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['TIFF1'])
+    output = self.PrintFile(Constants.IMAGES['TIFF1'])
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4845,8 +5182,8 @@ class Printing(LogoCert):
     test_id = '983ba7b4-ced0-4144-81cc-6abe89e63f78'
     test_name = 'testPrintFileTiffPhoto'
     logger.info('Printing TIFF file of photo.')
-    output = chrome.PrintFile(self.printer, Constants.IMAGES['TIFF2'],
-                              color=self.color)
+    output = self.PrintFile(Constants.IMAGES['TIFF2'],
+                            color=self.color)
     try:
       self.assertTrue(output)
     except AssertionError:
@@ -4857,22 +5194,20 @@ class Printing(LogoCert):
       self.ManualPass(test_id, test_name)
 
 
+def BuildSuite(suites=None):
+  """Build the test suite to run.
+
+  Args:
+    suites: string, comma separated suite names, None = all suites.
+  Returns:
+    unittest.TestSuite of the suites, in the order of SUITES.
+  """
+  suite = unittest.TestSuite()
+  for name in SuiteNames(suites):
+    suite.addTest(unittest.makeSuite(globals()[name]))
+  return suite
+
+
 if __name__ == '__main__':
   runner = unittest.TextTestRunner(verbosity=2)
-  suite = unittest.TestSuite()
-  suite.addTest(unittest.makeSuite(SystemUnderTest))
-  suite.addTest(unittest.makeSuite(Privet))
-  suite.addTest(unittest.makeSuite(PreRegistration))
-  suite.addTest(unittest.makeSuite(Registration))
-  suite.addTest(unittest.makeSuite(PostRegistration))
-  suite.addTest(unittest.makeSuite(LocalDiscovery))
-  suite.addTest(unittest.makeSuite(LocalPrinting))
-  suite.addTest(unittest.makeSuite(ChromePrinting))
-  suite.addTest(unittest.makeSuite(Printer))
-  suite.addTest(unittest.makeSuite(PrinterState))
-  suite.addTest(unittest.makeSuite(JobState))
-  suite.addTest(unittest.makeSuite(Printing))
-  suite.addTest(unittest.makeSuite(RunAfter24Hours))
-  suite.addTest(unittest.makeSuite(Unregister))
-  suite.addTest(unittest.makeSuite(PostUnregister))
-  runner.run(suite)
+  runner.run(BuildSuite(_ParseArgs()[0].suites))